@@ -12,6 +12,7 @@ Alice Ke alk248
 from consts import *
 from game2d import *
 from level import *
+from replay import *
 import introcs
 
 from kivy.logger import Logger
@@ -87,6 +88,29 @@ class Froggit(GameApp):
     #Attribute _hitbox: The contents of the loaded 'objects.json' file
     #Invariant: _hitbox is a nested dictionary
 
+    #Attribute _pinned: The images pinned in the texture cache for the level
+    #Invariant: _pinned is a list of strings (empty if no level is loaded)
+
+    #Attribute _next: The compiled level to play next, and its object data
+    #Invariant: _next is a (level, objects) pair from load_level, or None
+
+    #Attribute _preloader: The background loader for the images and sounds of
+    #the next level
+    #Invariant: _preloader is a Preloader, or None if there is no next level
+
+    #Attribute _file: The level file that is played
+    #Invariant: _file is a string
+
+    #Attribute _replay: The recording played instead of the keyboard
+    #Invariant: _replay is a ReplayInput, or None if playing from the keyboard
+
+    #Attribute _player: The input that plays the game
+    #Invariant: _player is input, or _replay if it is not None
+
+    #Attribute _recording: The recording of this game's input (see RECORD_FILE)
+    #Invariant: _recording is a Recording, or None if the game is not recorded
+    #(or the recording is saved)
+
     # DO NOT MAKE A NEW INITIALIZER!
 
     # THREE MAIN GAMEAPP METHODS
@@ -112,6 +136,16 @@ class Froggit(GameApp):
         self._text = GLabel(text = "Press 's' to start", font_name = ALLOY_FONT,\
         font_size = ALLOY_MEDIUM, x = self.width//2, top = self._title.bottom)
         self._last = 0
+        self._pinned = []
+        self._next = None
+        self._preloader = None
+        self._file = DEFAULT_LEVEL
+        self._replay = None
+        self._recording = None
+        if not REPLAY_FILE is None:
+            self._startReplay(REPLAY_FILE)
+        self._player = self.input if self._replay is None else self._replay
+        self._preloadLevel(self._file)
         self._Pausetext = GLabel(text = "Press 'c' to continue", font_size = \
             ALLOY_SMALL,font_name = ALLOY_FONT, x = 0, y = 0, fillcolor = \
             'forest green', linecolor = 'white')
@@ -173,9 +207,16 @@ class Froggit(GameApp):
         You are allowed to add more states if you wish. Should you do so, you should
         describe them here.
 
+        When replaying (see REPLAY_FILE), the keys and the time step come from
+        the recording instead.  When recording (see RECORD_FILE), the keys of
+        every frame from the one that starts the level are recorded, and saved
+        when the game is complete.
+
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
+        if not self._replay is None:
+            dt = self._replay.getDt(dt)
         self._determineState()
         self._isSTATE_LOADING()
         self._determineContinue()
@@ -183,7 +224,7 @@ class Froggit(GameApp):
 
         if self._state == STATE_ACTIVE:
             self._text = None
-            self._level.update(self.input, dt, self.view)
+            self._level.update(self._player, dt, self.view)
         elif self._state in [STATE_LOADING,STATE_PAUSED,STATE_CONTINUE,\
         STATE_COMPLETE]:
             self._title = None
@@ -197,6 +238,12 @@ class Froggit(GameApp):
                     self._Pausetext.y = (self.height-GRID_SIZE)/2
             if self._level.getWin():
                 self._gameWin()
+        if not self._recording is None:
+            self._recording.record(self._player, dt)
+            if self._state == STATE_COMPLETE:
+                self._saveRecording()
+        if not self._replay is None:
+            self._replay.refresh()
 
     def draw(self):
         """
@@ -210,6 +257,11 @@ class Froggit(GameApp):
         getters for these attributes or you need to add a draw method to
         those two classes.  We suggest the latter.  See the example subcontroller.py
         from the lesson videos.
+
+        The level is drawn as it was at the end of the last time step, so alpha
+        (see GameApp.alpha) is not used yet.  Interpolating would mean moving the
+        frog sprite between steps, but the sprite is also the frog state that the
+        rules read, so it is left for a later change.
         """
         if not (self._title is None) and not (self._text is None):
             self._title.draw(self.view)
@@ -227,17 +279,32 @@ class Froggit(GameApp):
         if self._state == STATE_COMPLETE and self._level.getWin():
             self._Wintext.draw(self.view)
 
+    def on_stop(self):
+        """
+        Saves the recording of an unfinished game when the window is closed.
+
+        This is a Kivy method, called when the application stops.  It may be
+        called before start, if the window is closed right away.
+        """
+        if hasattr(self, '_recording'):
+            self._saveRecording()
+
     # HELPER METHODS FOR THE STATES GO HERE
     def _determineState(self):
         """
         Takes input for the first screen and checks user input. If conditions
         are satisfied (i.e user presses 's'), state is changed to STATE_LOADING.
 
-        Dismisses the welcome screen when user presses down the 'S' key.
+        Dismisses the welcome screen when user presses down the 'S' key. Until
+        then, it hands the preloaded images and sounds over to the game as soon
+        as the preloader is done with them, so that loading takes no work.
         """
         if self._state == STATE_INACTIVE:
+            if not self._preloader is None:
+                self._preloader.finish(False)
+
             # Determine the current number of keys pressed
-            curr_keys = self.input.is_key_down('s')
+            curr_keys = self._player.is_key_down('s')
 
             # Only change if we have just pressed the keys this animation frame
             press = curr_keys > 0 and self._last == 0
@@ -256,7 +323,7 @@ class Froggit(GameApp):
         mode after the game is paused.
         """
         if self._state is STATE_PAUSED and not self._level.noLivesLeft():
-            curr_keys = self.input.is_key_down('c')
+            curr_keys = self._player.is_key_down('c')
 
             # Only change if we have just pressed the keys this animation frame
             press = curr_keys > 0 and self._last == 0
@@ -283,17 +350,88 @@ class Froggit(GameApp):
         """
         Checks if the state is STATE_LOADING.
 
-        If state is STATE_LOADING, load jsons and resize view window.
+        If state is STATE_LOADING, load jsons and resize view window. The level
+        and its images and sounds were loaded in the background while the title
+        was shown (see _preloadLevel), so this only has to wait for that to end
+        (it normally has) and make the level.
         """
         if self._state == STATE_LOADING:
-            new_dict = self.load_json(DEFAULT_LEVEL)
-            hitbox = self.load_json('objects.json')
+            if self._next is None:
+                self._preloadLevel(self._file)
+            (new_dict, hitbox) = self._next
+            self._preloader.finish()
+            self._next = None
+            self._preloader = None
             self._hitbox = hitbox
             values = new_dict['size']
             self.width = values[0] * GRID_SIZE
             self.height = (values[1]+1) * GRID_SIZE
             self._level = Level(new_dict, self._hitbox)
+            self._level.show(self.view)
             self._state = STATE_ACTIVE
+            if not RECORD_FILE is None:
+                self._recording = Recording(self._file)
+
+    def _preloadLevel(self, name):
+        """
+        Starts loading the given level, and its images and sounds, in the
+        background.
+
+        The level itself is compiled (or read from the compiled cache) right
+        away, as that is quick.  Its images are pinned in the texture cache and
+        then decoded, with its sounds, by a Preloader on a worker thread.
+
+        Parameter name: The level file name
+        Precondition: name is a string naming a level in the JSON folder
+        """
+        self._next = load_level(name, OBJECT_DATA, self)
+        (level, objects) = self._next
+        images = level_images(level, objects)
+        self._pinImages(images)
+        self._preloader = Preloader(images, level_sounds(level))
+
+    def _startReplay(self, path):
+        """
+        Replays the recording in the given file instead of the keyboard.
+
+        The level played is the level of the recording.  As the recording
+        starts on the frame that started the level, the title screen is
+        dismissed on the first frame.
+
+        Parameter path: The recording file
+        Precondition: path is a string naming a file made by Recording.save
+        """
+        recording = load_recording(path)
+        if recording.getSpeed() != FROG_SPEED:
+            Logger.warning('Froggit: %s was recorded with FROG_SPEED %s, not %s' %
+                (path, recording.getSpeed(), FROG_SPEED))
+        self._file = recording.getLevel()
+        self._replay = ReplayInput(recording)
+
+    def _saveRecording(self):
+        """
+        Saves the recording of this game to RECORD_FILE, if there is one.
+
+        The recording is only saved once.
+        """
+        if not self._recording is None:
+            self._recording.save(RECORD_FILE)
+            Logger.info('Froggit: Recorded %d frames to %s' %
+                (len(self._recording), RECORD_FILE))
+            self._recording = None
+
+    def _pinImages(self, images):
+        """
+        Pins the given images in the texture cache, and unpins the old ones.
+
+        Parameter images: The image files to pin
+        Precondition: images is a list of strings
+        """
+        for name in images:
+            self.TEXTURE_CACHE.pin(name)
+        for name in self._pinned:
+            self.TEXTURE_CACHE.unpin(name)
+        self._pinned = list(images)
 
     def _gameLose(self):
         """
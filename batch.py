@@ -0,0 +1,460 @@
+"""
+Batch runner for Froggit
+
+This module plays many headless games at once, spread over every core with a process
+pool, so that we can check every level after each change.  A job is a level file, a
+policy that decides the keys held down on each frame, and a random seed.  A job can
+also be a recording (see replay.py), which plays back the keys that were recorded.
+
+A policy is a function policy(seed, dt) that returns a script for one game, and a
+script is a function script(tick, game) that returns the keys to hold down on frame
+tick of the game.  The policies in BATCH_POLICIES are
+
+    idle:       never press a key
+    random:     hold down a new random direction every FROG_SPEED seconds
+    lookahead:  try each move on a fork of the level (see Level.fork) before making it
+
+Results come back as each game ends, and are added to a BatchSummary, which only keeps
+the totals for each level (games won and lost, frames played, and deaths in each lane).
+So a batch of any size needs little memory.  The summary also has a digest of the final
+state hash of every game, which is the same for two runs of the same jobs unless the
+game rules have changed.
+
+You can run this module on its own, with the level files (or recordings) to play:
+
+    python batch.py
+    python batch.py complete.json easy1.json --policy=random,lookahead --seeds=8
+    python batch.py run.frog --workers=4
+
+With no files, every level in the JSON folder is played.  The files must come first,
+and there are no number arguments (only options like --seeds=8), as consts.py reads a
+number after the first argument as the FROG_SPEED.
+"""
+from consts import *
+from headless import *
+from desync import random_script
+from replay import load_recording
+
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import os
+import random
+import sys
+import time
+import zlib
+
+
+# The compiled json of each level loaded by this process
+_BATCH_LEVELS = {}
+
+
+def idle_policy(seed, dt):
+    """
+    Returns a script that never presses a key.
+
+    Parameter seed: The random seed (unused)
+    Precondition: seed is an int
+
+    Parameter dt: The time step of each frame
+    Precondition: dt is a float > 0
+    """
+    def script(tick, game):
+        return ()
+    return script
+
+
+def random_policy(seed, dt):
+    """
+    Returns a script that holds down random keys (see desync.random_script).
+
+    Parameter seed: The random seed
+    Precondition: seed is an int
+
+    Parameter dt: The time step of each frame
+    Precondition: dt is a float > 0
+    """
+    keys = random_script(seed, dt)
+    def script(tick, game):
+        return keys(tick)
+    return script
+
+
+def lookahead_policy(seed, dt):
+    """
+    Returns a bot that tries each move on a fork of the level before making it.
+
+    Every FROG_SPEED seconds, the bot plays each move (up, down, left, right or no
+    key) on its own fork of the level: the move, and then as long again standing
+    still.  Of the moves that do not lose a life, it makes the one that gets the
+    furthest: a win first, then the most safe frogs, then the highest frog.  Ties
+    are broken at random, so the bot walks along the hedge until it finds a free
+    exit.  If every move loses a life, it hops up anyway.
+
+    Parameter seed: The random seed
+    Precondition: seed is an int
+
+    Parameter dt: The time step of each frame
+    Precondition: dt is a float > 0
+    """
+    rand = random.Random(seed)
+    hold = max(1,round(FROG_SPEED/dt))
+    moves = (('up',),('down',),('left',),('right',),())
+    chosen = [()]
+    def script(tick, game):
+        if tick % hold == 0:
+            level = game.getLevel()
+            chosen[0] = ('up',)
+            if not level.getFrog() is None:
+                best = None
+                for keys in moves:
+                    score = _lookahead(level, game.view, keys, hold, dt)
+                    if not score is None:
+                        score += (rand.random(),)
+                        if best is None or score > best[0]:
+                            best = (score, keys)
+                if not best is None:
+                    chosen[0] = best[1]
+        return chosen[0]
+    return script
+
+
+def _lookahead(level, view, keys, hold, dt):
+    """
+    Returns (win, safe frogs, frog y) for a fork of level after the given move.
+
+    The keys are held down for hold frames, and then released for hold frames.  The
+    frog y is 0 if the frog is gone (because it reached an exit).  This function
+    returns None if the fork lost a life.
+
+    Parameter level: The level to fork
+    Precondition: level is a HeadlessLevel (or a Level)
+
+    Parameter view: The game view
+    Precondition: view has a width and a height
+
+    Parameter keys: The keys of the move
+    Precondition: keys is a sequence of strings
+
+    Parameter hold: The number of frames to hold the keys down
+    Precondition: hold is an int > 0
+
+    Parameter dt: The time step of each frame
+    Precondition: dt is a float > 0
+    """
+    fork = level.fork()
+    lives = fork.getLives()
+    input = HeadlessInput(keys)
+    for tick in range(2*hold):
+        if tick == hold:
+            input.setKeys(())
+        fork.update(input, dt, view)
+        input.refresh()
+        if fork.getWin():
+            break
+    if fork.getLives() < lives:
+        return None
+    safe = sum([lane.getSafeCount() for lane in fork.getLanesList()])
+    frog = fork.getFrog()
+    return (fork.getWin(), safe, 0 if frog is None else frog.y)
+
+
+# The policies that can be named in a job
+BATCH_POLICIES = {'idle': idle_policy, 'random': random_policy,
+                  'lookahead': lookahead_policy}
+
+
+def level_files():
+    """
+    Returns the sorted list of level files in the JSON folder.
+
+    These are all of the .json files except OBJECT_DATA.
+    """
+    folder = os.path.join(HEADLESS_PATH, 'JSON')
+    return sorted([name for name in os.listdir(folder)
+        if name.endswith('.json') and name != OBJECT_DATA])
+
+
+def make_jobs(sources, policies=('random',), seeds=4, ticks=20000, dt=1/60):
+    """
+    Yields the jobs for the given level files and recordings.
+
+    A job is a tuple (source, policy, seed, ticks, dt).  Each level file gets a job
+    for every policy and seed.  Each recording (a file ending in .frog) gets a single
+    job with the policy None, as its keys are already recorded.
+
+    Parameter sources: The level files and recordings
+    Precondition: sources is a sequence of strings
+
+    Parameter policies: The policies to play each level with
+    Precondition: policies is a sequence of names in BATCH_POLICIES
+
+    Parameter seeds: The number of seeds for each policy (0 to seeds-1)
+    Precondition: seeds is an int > 0
+
+    Parameter ticks: The most frames to play in each game
+    Precondition: ticks is an int > 0
+
+    Parameter dt: The time step of each frame
+    Precondition: dt is a float > 0
+    """
+    for source in sources:
+        if source.endswith('.frog'):
+            yield (source, None, 0, ticks, dt)
+            continue
+        for policy in policies:
+            assert policy in BATCH_POLICIES, '%s is not a policy' % repr(policy)
+            for seed in range(seeds):
+                yield (source, policy, seed, ticks, dt)
+
+
+def run_job(job):
+    """
+    Returns the result of playing a single job (see make_jobs).
+
+    The result is a dictionary with the keys
+
+        'level', 'policy', 'seed':  the level file, policy and seed of the job
+        'error':    None, or why the level (or recording) could not be played
+        'win':      True if every exit was filled
+        'complete': True if the game was won or lost before the last frame
+        'lives':    the number of lives left
+        'ticks':    the number of frames played
+        'deaths':   a dictionary from each lane (row) to the deaths in that lane
+        'hash':     the state hash of the level at the end (see Level.getStateHash)
+
+    A game continues after every death without waiting for the 'c' key, unless it
+    is a recording, which has the keys that were pressed.
+
+    Parameter job: The job
+    Precondition: job is a tuple (source, policy, seed, ticks, dt) from make_jobs
+    """
+    (source, policy, seed, ticks, dt) = job
+    result = {'level': source, 'policy': policy, 'seed': seed, 'error': None,
+        'win': False, 'complete': False, 'lives': 0, 'ticks': 0, 'deaths': {},
+        'hash': 0}
+    try:
+        if policy is None:
+            recording = load_recording(source)
+            if recording.getSpeed() != FROG_SPEED:
+                raise ValueError('The recording has FROG_SPEED %s, not %s' %
+                    (recording.getSpeed(), FROG_SPEED))
+            result['level'] = recording.getLevel()
+            ticks = min(ticks, len(recording))
+            (script, step) = (_recording_script(recording), recording.dtAt)
+            game = HeadlessGame(_load_level(recording.getLevel()), _load_level(OBJECT_DATA),
+                HeadlessInput(recording.keysAt(0) if len(recording) else ()),
+                autocontinue=False)
+        else:
+            script = BATCH_POLICIES[policy](seed, dt)
+            step = None
+            game = HeadlessGame(_load_level(source), _load_level(OBJECT_DATA))
+
+        level = game.getLevel()
+        lives = level.getLives()
+        while game.getTicks() < ticks and not game.isComplete():
+            tick = game.getTicks()
+            game.input.setKeys(script(tick, game))
+            game.update(dt if step is None else step(tick))
+            if level.getLives() < lives:
+                row = int(level.getDeathPosition()[1] // GRID_SIZE)
+                result['deaths'][row] = result['deaths'].get(row, 0) + 1
+                lives = level.getLives()
+    except Exception as error:
+        result['error'] = '%s: %s' % (type(error).__name__, error)
+        return result
+
+    result['win'] = level.getWin()
+    result['complete'] = game.isComplete()
+    result['lives'] = level.getLives()
+    result['ticks'] = game.getTicks()
+    result['hash'] = level.getStateHash()
+    return result
+
+
+def _recording_script(recording):
+    """
+    Returns a script that plays back the keys of a recording.
+
+    Parameter recording: The recording to play
+    Precondition: recording is a Recording
+    """
+    def script(tick, game):
+        return recording.keysAt(tick) if tick < len(recording) else ()
+    return script
+
+
+def _load_level(name):
+    """
+    Returns the json of the given file, compiled if it is a level.
+
+    Each file is only loaded once by each process.  A ValueError is raised if the
+    file cannot be loaded, or if the level is not valid.
+
+    Parameter name: The file name in the JSON folder
+    Precondition: name is a string
+    """
+    if not name in _BATCH_LEVELS:
+        json_dict = load_json(name)
+        if json_dict is None:
+            raise ValueError('Level %s cannot be loaded' % repr(name))
+        if name != OBJECT_DATA:
+            json_dict = compile_level(json_dict, _load_level(OBJECT_DATA))
+        _BATCH_LEVELS[name] = json_dict
+    return _BATCH_LEVELS[name]
+
+
+def run_batch(jobs, workers=None, window=4):
+    """
+    Yields the result of every job, in the order that the jobs finish.
+
+    The jobs are played in a pool of worker processes (see run_job).  Only a few
+    jobs per worker are handed to the pool at a time, so the jobs can be a generator
+    of any length, and neither the jobs nor the results are ever all in memory.
+
+    Parameter jobs: The jobs to play
+    Precondition: jobs is an iterable of jobs from make_jobs
+
+    Parameter workers: The number of worker processes (one per core if None)
+    Precondition: workers is an int > 0 or None
+
+    Parameter window: The most jobs waiting for each worker
+    Precondition: window is an int > 0
+    """
+    workers = os.cpu_count() if workers is None else workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for job in jobs:
+            if len(pending) >= workers*window:
+                (done, pending) = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            pending.add(executor.submit(run_job, job))
+        while len(pending) > 0:
+            (done, pending) = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+class BatchSummary(object):
+    """
+    A class adding up batch results for each level, one result at a time.
+
+    The totals for a level are a dictionary with the keys 'games', 'wins', 'losses',
+    'unfinished' (games still going at the last frame), 'errors', 'ticks', 'deaths'
+    (a dictionary from each lane to its deaths), 'digest' and 'error' (the message
+    of the last error).  The digest combines the final state hash of every game, and
+    does not depend on the order that the results were added.
+    """
+    # Attribute _levels: The totals for each level
+    # Invariant: _levels is a dictionary from level files to totals dictionaries
+
+    # Attribute _count: The number of results added
+    # Invariant: _count is an int >= 0
+
+    def getLevels(self):
+        """
+        Returns the sorted list of level files with results.
+        """
+        return sorted(self._levels)
+
+    def getTotals(self, level):
+        """
+        Returns the totals dictionary for the given level.
+
+        Parameter level: The level file
+        Precondition: level is a string in getLevels()
+        """
+        return self._levels[level]
+
+    def __init__(self):
+        """
+        Initializes a summary with no results.
+        """
+        self._levels = {}
+        self._count = 0
+
+    def __len__(self):
+        """
+        Returns the number of results added.
+        """
+        return self._count
+
+    def add(self, result):
+        """
+        Adds a result to the totals for its level.
+
+        Parameter result: The result of a job
+        Precondition: result is a dictionary returned by run_job
+        """
+        self._count += 1
+        if not result['level'] in self._levels:
+            self._levels[result['level']] = {'games': 0, 'wins': 0, 'losses': 0,
+                'unfinished': 0, 'errors': 0, 'ticks': 0, 'deaths': {}, 'digest': 0,
+                'error': None}
+        totals = self._levels[result['level']]
+        if not result['error'] is None:
+            totals['errors'] += 1
+            totals['error'] = result['error']
+            return
+
+        totals['games'] += 1
+        if result['win']:
+            totals['wins'] += 1
+        elif result['complete']:
+            totals['losses'] += 1
+        else:
+            totals['unfinished'] += 1
+        totals['ticks'] += result['ticks']
+        for (row, count) in result['deaths'].items():
+            totals['deaths'][row] = totals['deaths'].get(row, 0) + count
+        game = repr((result['policy'], result['seed'], result['ticks'], result['hash']))
+        totals['digest'] = (totals['digest'] + zlib.crc32(game.encode('utf-8'))) & 0xffffffff
+
+    def report(self):
+        """
+        Returns the list of lines describing the totals of each level.
+        """
+        lines = []
+        for level in self.getLevels():
+            totals = self._levels[level]
+            line = '%-20s %4d games %4d won %4d lost %4d unfinished' % (level,
+                totals['games'], totals['wins'], totals['losses'], totals['unfinished'])
+            if totals['games'] > 0:
+                deaths = ' '.join(['%d:%d' % (row, totals['deaths'][row])
+                    for row in sorted(totals['deaths'])])
+                line += ' %8.0f ticks/game  deaths by lane [%s]  digest %08x' % (
+                    totals['ticks']/totals['games'], deaths, totals['digest'])
+            if totals['errors'] > 0:
+                line += '  %d errors (%s)' % (totals['errors'], totals['error'])
+            lines.append(line)
+        return lines
+
+
+# Application code
+if __name__ == '__main__':
+    (sources, policies, seeds, ticks, workers) = ([], ['random'], 4, 20000, None)
+    for arg in sys.argv[1:]:
+        if arg.startswith('--policy='):
+            policies = arg[9:].split(',')
+        elif arg.startswith('--seeds='):
+            seeds = int(arg[8:])
+        elif arg.startswith('--ticks='):
+            ticks = int(arg[8:])
+        elif arg.startswith('--workers='):
+            workers = int(arg[10:])
+        elif arg.endswith('.json') or arg.endswith('.frog'):
+            sources.append(arg)
+        else:
+            sources.append(arg+'.json')
+    if sources == []:
+        sources = level_files()
+
+    summary = BatchSummary()
+    start = time.perf_counter()
+    for result in run_batch(make_jobs(sources, policies, seeds, ticks), workers):
+        summary.add(result)
+    secs = time.perf_counter()-start
+    for line in summary.report():
+        print(line)
+    total = sum([summary.getTotals(level)['ticks'] for level in summary.getLevels()])
+    print('%d games, %d ticks in %.2f seconds (%.0f ticks/sec)' %
+        (len(summary), total, secs, total/secs))
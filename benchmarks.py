@@ -0,0 +1,423 @@
+"""
+Benchmarks for Froggit
+
+This module times the game rules on large, made-up levels. It uses the headless
+simulation in headless.py, so it does not need a window (or Kivy) to run.  The one
+exception is bench_tiles, which times the lane tiles themselves and so needs Kivy.  Each
+benchmark returns its measurements as a list of tuples, so that they can be compared
+from one version of the code to the next.
+
+Run this module on its own to print every benchmark:
+
+    python benchmarks.py
+"""
+from consts import *
+from headless import *
+
+import random
+import time
+
+
+def make_level(lanes, columns=16, roads=1, waters=1, cars=4):
+    """
+    Returns the json dictionary for a made-up level with the given number of lanes.
+
+    The level has a road lane and a water lane (or more) just above the bottom grass
+    lane, a hedge with a single exit at the top, and grass everywhere else.  The
+    frog starts on a grass lane halfway up the level, so that it is far from the
+    bottom lane.
+
+    Parameter lanes: The number of lanes
+    Precondition: lanes is an int >= roads+waters+2
+
+    Parameter columns: The number of grid squares across
+    Precondition: columns is an int > 0
+
+    Parameter roads: The number of road lanes
+    Precondition: roads is an int >= 0
+
+    Parameter waters: The number of water lanes
+    Precondition: waters is an int >= 0
+
+    Parameter cars: The number of cars in each road lane (evenly spaced)
+    Precondition: cars is an int > 0
+    """
+    rows = [{'type':'grass'}]
+    for r in range(roads):
+        rows.append({'type':'road', 'speed':100,
+            'objects':[{'type':'car1', 'position':p*columns/cars} for p in range(cars)]})
+    for w in range(waters):
+        rows.append({'type':'water', 'speed':-80,
+            'objects':[{'type':'log3', 'position':p} for p in range(0,columns,5)]})
+    while len(rows) < lanes-1:
+        rows.append({'type':'grass'})
+    rows.append({'type':'hedge', 'objects':[{'type':'exit', 'position':columns//2}]})
+    return {'version':1.0, 'size':[columns,lanes], 'start':[columns//2,lanes//2],
+            'offscreen':2, 'lanes':rows}
+
+
+def bench_lanes(counts=(10,100,1000), ticks=2000, dt=1/60):
+    """
+    Returns a list of (lanes, microseconds per update) for levels of each lane count.
+
+    Only the lane count changes from level to level; the number of moving obstacles
+    stays the same.  As the frog's lane is looked up by row, the time per update
+    should stay flat as the level gets taller.
+
+    Parameter counts: The lane counts to try
+    Precondition: counts is a sequence of ints >= 4
+
+    Parameter ticks: The number of updates to time for each level
+    Precondition: ticks is an int > 0
+
+    Parameter dt: The time step of each update
+    Precondition: dt is a float > 0
+    """
+    hitboxjson = load_json(OBJECT_DATA)
+    result = []
+    for count in counts:
+        game = HeadlessGame(make_level(count), hitboxjson)
+        start = time.perf_counter()
+        for tick in range(ticks):
+            game.update(dt)
+        result.append((count, (time.perf_counter()-start)/ticks*1e6))
+    return result
+
+
+def bench_lane_lookup(counts=(10,100,1000), repeats=10000):
+    """
+    Returns a list of (lanes, row lookup microseconds, scan microseconds).
+
+    This compares finding the frog's lane by row (Level._laneAt) to the old way of
+    checking every lane for a collision with the frog until one hits.
+
+    Parameter counts: The lane counts to try
+    Precondition: counts is a sequence of ints >= 4
+
+    Parameter repeats: The number of lookups to time for each level
+    Precondition: repeats is an int > 0
+    """
+    hitboxjson = load_json(OBJECT_DATA)
+    result = []
+    for count in counts:
+        level = HeadlessLevel(make_level(count), hitboxjson)
+        frog = level.getFrog()
+
+        start = time.perf_counter()
+        for ii in range(repeats):
+            level._laneAt(frog)
+        lookup = (time.perf_counter()-start)/repeats*1e6
+
+        start = time.perf_counter()
+        for ii in range(repeats):
+            for lane in level.getLanesList():
+                if lane.collides(frog):
+                    break
+        scan = (time.perf_counter()-start)/repeats*1e6
+        result.append((count, lookup, scan))
+    return result
+
+
+def bench_obstacles(counts=(100,1000,10000), ticks=1000, dt=1/60):
+    """
+    Returns a list of (cars, microseconds per update) for roads with many cars.
+
+    The level has four lanes, with one road lane holding all of the cars (and no
+    water, so the frog is always safe on the grass).  As moving a lane only moves
+    its clock, the time per update should stay flat as the number of cars grows.
+
+    Parameter counts: The number of cars in the road lane to try
+    Precondition: counts is a sequence of ints > 0
+
+    Parameter ticks: The number of updates to time for each level
+    Precondition: ticks is an int > 0
+
+    Parameter dt: The time step of each update
+    Precondition: dt is a float > 0
+    """
+    hitboxjson = load_json(OBJECT_DATA)
+    result = []
+    for count in counts:
+        game = HeadlessGame(make_level(4, waters=0, cars=count), hitboxjson)
+        start = time.perf_counter()
+        for tick in range(ticks):
+            game.update(dt)
+        result.append((count, (time.perf_counter()-start)/ticks*1e6))
+    return result
+
+
+def bench_obstacle_lookup(counts=(10,100,1000), repeats=10000):
+    """
+    Returns a list of (cars, index microseconds, scan microseconds).
+
+    This compares finding the cars under the frog with the lane's obstacle track
+    (a binary search) to the old way of checking every car in the lane.  The frog is
+    put at a random spot in the road lane for each lookup.
+
+    Parameter counts: The number of cars in the road lane to try
+    Precondition: counts is a sequence of ints > 0
+
+    Parameter repeats: The number of lookups to time for each lane
+    Precondition: repeats is an int > 0
+    """
+    hitboxjson = load_json(OBJECT_DATA)
+    rand = random.Random(0)
+    result = []
+    for count in counts:
+        level = HeadlessLevel(make_level(4, cars=count), hitboxjson)
+        lane = level.getLanesList()[1]
+        width = lane._width
+        points = [(rand.uniform(0,width), lane._tile.y) for ii in range(repeats)]
+
+        start = time.perf_counter()
+        for point in points:
+            lane._track.containing(point)
+        index = (time.perf_counter()-start)/repeats*1e6
+
+        start = time.perf_counter()
+        for point in points:
+            for obstacle in lane._objs:
+                obstacle.contains(point)
+        scan = (time.perf_counter()-start)/repeats*1e6
+        result.append((count, index, scan))
+    return result
+
+
+def bench_seek(counts=(100,1000,10000), repeats=1000):
+    """
+    Returns a list of (cars, seek microseconds, positions microseconds).
+
+    Seeking sets a road lane to a random time (forwards or backwards), which takes
+    the same time no matter how far it jumps.  Reading the positions works out the
+    center of every car in the lane at that time.
+
+    Parameter counts: The number of cars in the road lane to try
+    Precondition: counts is a sequence of ints > 0
+
+    Parameter repeats: The number of seeks to time for each lane
+    Precondition: repeats is an int > 0
+    """
+    hitboxjson = load_json(OBJECT_DATA)
+    rand = random.Random(0)
+    result = []
+    for count in counts:
+        level = HeadlessLevel(make_level(4, waters=0, cars=count), hitboxjson)
+        lane = level.getLanesList()[1]
+        times = [rand.uniform(-1e6,1e6) for ii in range(repeats)]
+
+        start = time.perf_counter()
+        for t in times:
+            lane.setTime(t)
+        seek = (time.perf_counter()-start)/repeats*1e6
+
+        start = time.perf_counter()
+        for t in times:
+            lane._track.getPositions()
+        positions = (time.perf_counter()-start)/repeats*1e6
+        result.append((count, seek, positions))
+    return result
+
+
+def bench_snapshots(counts=(16,64,256), repeats=1000):
+    """
+    Returns a list of (lanes, take microseconds, rewind microseconds, new microseconds).
+
+    This times taking a snapshot of a level, and rewinding the level to it, against
+    making a new level from the json (which is how a level was restarted before
+    snapshots).  Snapshots only save numbers, so they should be much faster than
+    making a new level, even though they grow with the number of lanes.
+
+    Parameter counts: The number of lanes in each level
+    Precondition: counts is a sequence of ints >= 4
+
+    Parameter repeats: The number of snapshots to time for each level
+    Precondition: repeats is an int > 0
+    """
+    hitboxjson = load_json(OBJECT_DATA)
+    result = []
+    for count in counts:
+        json = compile_level(make_level(count), hitboxjson)
+        level = HeadlessLevel(json, hitboxjson)
+        level.setSnapshots(repeats)
+
+        start = time.perf_counter()
+        for ii in range(repeats):
+            level.takeSnapshot()
+        take = (time.perf_counter()-start)/repeats*1e6
+
+        start = time.perf_counter()
+        for ii in range(repeats):
+            level.rewind()
+        rewind = (time.perf_counter()-start)/repeats*1e6
+
+        start = time.perf_counter()
+        for ii in range(repeats//10):
+            HeadlessLevel(json, hitboxjson)
+        new = (time.perf_counter()-start)/(repeats//10)*1e6
+        result.append((count, take, rewind, new))
+    return result
+
+
+def bench_respawn(counts=(16,64,256), repeats=1000):
+    """
+    Returns a list of (lanes, respawn microseconds, new frog microseconds, reset
+    microseconds, new level microseconds).
+
+    This times a new life (makeFrog, which resets the frog of the last life) against
+    making a new frog, which is how a frog was respawned before.  It also times
+    restarting a level in place (Level.reset) against making a new level from the
+    json.
+
+    Parameter counts: The number of lanes in each level
+    Precondition: counts is a sequence of ints >= 4
+
+    Parameter repeats: The number of respawns to time for each level
+    Precondition: repeats is an int > 0
+    """
+    hitboxjson = load_json(OBJECT_DATA)
+    frog = hitboxjson['sprites']['frog']
+    result = []
+    for count in counts:
+        json = compile_level(make_level(count), hitboxjson)
+        level = HeadlessLevel(json, hitboxjson)
+        (x, y) = level.getFrogStart()
+
+        start = time.perf_counter()
+        for ii in range(repeats):
+            level.makeFrog(hitboxjson)
+        respawn = (time.perf_counter()-start)/repeats*1e6
+
+        start = time.perf_counter()
+        for ii in range(repeats):
+            HeadlessFrog(x=x, y=y, format=frog['format'], source=frog['file'],
+                hitboxes=tuple(frog['hitboxes']), hitboxjson=hitboxjson,
+                toolkit=StandIns)
+        newfrog = (time.perf_counter()-start)/repeats*1e6
+
+        start = time.perf_counter()
+        for ii in range(repeats):
+            level.reset()
+        reset = (time.perf_counter()-start)/repeats*1e6
+
+        start = time.perf_counter()
+        for ii in range(repeats//10):
+            HeadlessLevel(json, hitboxjson)
+        new = (time.perf_counter()-start)/(repeats//10)*1e6
+        result.append((count, respawn, newfrog, reset, new))
+    return result
+
+
+def bench_fork(counts=(16,64,256), repeats=1000):
+    """
+    Returns a list of (lanes, fork microseconds, new microseconds) for levels of each
+    lane count.
+
+    This times forking a level (see Level.fork) against making a new level from the
+    json, which is how a copy of a level was made before.
+
+    Parameter counts: The number of lanes in each level
+    Precondition: counts is a sequence of ints >= 4
+
+    Parameter repeats: The number of forks to time for each level
+    Precondition: repeats is an int > 0
+    """
+    hitboxjson = load_json(OBJECT_DATA)
+    result = []
+    for count in counts:
+        json = compile_level(make_level(count), hitboxjson)
+        level = HeadlessLevel(json, hitboxjson)
+
+        start = time.perf_counter()
+        for ii in range(repeats):
+            level.fork()
+        fork = (time.perf_counter()-start)/repeats*1e6
+
+        start = time.perf_counter()
+        for ii in range(repeats//10):
+            HeadlessLevel(json, hitboxjson)
+        new = (time.perf_counter()-start)/(repeats//10)*1e6
+        result.append((count, fork, new))
+    return result
+
+
+def bench_tiles(counts=(100,300,1000), lanes=16, repeats=20):
+    """
+    Returns a list of (columns, first microseconds, again microseconds) for wide levels.
+
+    This times making the lane tiles of a level (one GTile per lane, as in
+    Lane._setTile).  The first time is with an empty mesh cache, so each kind of
+    lane computes its mesh once.  The second time is for making the same tiles
+    again, when every lane finds its mesh in the cache.
+
+    Unlike the other benchmarks, this one needs Kivy (and opens a window).
+
+    Parameter counts: The level widths (in grid squares) to try
+    Precondition: counts is a sequence of ints > 0
+
+    Parameter lanes: The number of lanes in each level
+    Precondition: lanes is an int >= 4
+
+    Parameter repeats: The number of times to make the tiles for each level
+    Precondition: repeats is an int > 0
+    """
+    from app import Froggit
+    from game2d import GTile
+    Froggit(width=GAME_WIDTH, height=GAME_HEIGHT)   # For the image folder
+
+    def make_tiles(json):
+        width = json['size'][0]*GRID_SIZE
+        return [GTile(left=0, bottom=row*GRID_SIZE, width=width, height=GRID_SIZE,
+            source=lane['type']+'.png') for (row, lane) in enumerate(json['lanes'])]
+
+    result = []
+    for count in counts:
+        json = make_level(lanes, columns=count)
+        first = 0
+        for ii in range(repeats):
+            GTile.MESH_CACHE.clear()
+            start = time.perf_counter()
+            make_tiles(json)
+            first += time.perf_counter()-start
+
+        start = time.perf_counter()
+        for ii in range(repeats):
+            make_tiles(json)
+        again = time.perf_counter()-start
+        result.append((count, first/repeats*1e6, again/repeats*1e6))
+    return result
+
+
+# Application code
+if __name__ == '__main__':
+    print('Update cost by lane count')
+    for (count, micros) in bench_lanes():
+        print('  %5d lanes: %8.2f us/update' % (count, micros))
+    print('Frog lane lookup by lane count')
+    for (count, lookup, scan) in bench_lane_lookup():
+        print('  %5d lanes: %8.2f us by row, %8.2f us by scan' % (count, lookup, scan))
+    print('Update cost by cars in the lane')
+    for (count, micros) in bench_obstacles():
+        print('  %5d cars: %8.2f us/update' % (count, micros))
+    print('Lane seek by cars in the lane')
+    for (count, seek, positions) in bench_seek():
+        print('  %5d cars: %8.2f us/seek, %8.2f us for all positions' %
+            (count, seek, positions))
+    print('Car lookup by cars in the lane')
+    for (count, index, scan) in bench_obstacle_lookup():
+        print('  %5d cars: %8.2f us by index, %8.2f us by scan' % (count, index, scan))
+    print('Snapshots by lane count')
+    for (count, take, rewind, new) in bench_snapshots():
+        print('  %5d lanes: %8.2f us to take, %8.2f us to rewind, %8.2f us for a new level' %
+            (count, take, rewind, new))
+    print('Respawn and restart by lane count')
+    for (count, respawn, newfrog, reset, new) in bench_respawn():
+        print('  %5d lanes: %8.2f us to respawn, %8.2f us for a new frog, '
+            '%8.2f us to reset, %8.2f us for a new level' %
+            (count, respawn, newfrog, reset, new))
+    print('Forks by lane count')
+    for (count, fork, new) in bench_fork():
+        print('  %5d lanes: %8.2f us to fork, %8.2f us for a new level' % (count, fork, new))
+    print('Lane tiles by level width')
+    for (count, first, again) in bench_tiles():
+        print('  %5d columns: %8.2f us to make, %8.2f us to make again' %
+            (count, first, again))
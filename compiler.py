@@ -0,0 +1,315 @@
+"""
+Level compiler module for Froggit
+
+This module turns a level json (plus the hitbox data in objects.json) into a compiled
+level.  A compiled level is the same nested dictionary as the level json, except that
+it has been checked for mistakes and everything the lanes need has been looked up
+ahead of time:
+
+    * every object in a lane has a 'hitbox' entry (None if it has no hitbox)
+    * the level has an 'exits' entry, the list of every exit in every hedge
+    * the level has a 'compiled' entry, the version of the compiler that made it
+
+That way the lanes never have to scan the other lanes or the objects.json images
+when they are made.  Compiling is cheap, but reading and parsing two json files is
+not, so load_level saves each compiled level (as a pickle file in the .compiled
+folder inside the JSON folder) and reuses it until either json file changes.
+
+This module does not import Kivy, so the headless simulation can use it too.
+"""
+from consts import *
+
+import os.path
+import json
+import pickle
+
+
+# The version of the compiled format. Change this whenever compile_level changes.
+COMPILER_VERSION = 1
+
+# The folder holding the level json files
+JSON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'JSON')
+
+# The folder holding the compiled levels
+COMPILED_PATH = os.path.join(JSON_PATH, '.compiled')
+
+# The lane types, and whether or not each type has a speed and objects
+LANE_FIELDS = {'grass':(), 'road':('speed','objects'), 'water':('speed','objects'),
+               'hedge':('objects',)}
+
+
+def is_compiled(level):
+    """
+    Returns True if level is a level compiled by this version of the compiler.
+
+    Parameter level: The level to check
+    Precondition: level is any value
+    """
+    return isinstance(level, dict) and level.get('compiled') == COMPILER_VERSION
+
+
+def compile_level(level, objects):
+    """
+    Returns the compiled version of the given level json.
+
+    The level is checked for mistakes (missing keys, unknown lane types, the wrong
+    number of lanes) and a ValueError is raised for the first one found. The level
+    itself is not changed; the compiled level is a new dictionary.  The level and the
+    object data may be frozen (as returned by GameApp.load_json), in which case the
+    parts of the compiled level that are not looked up are still frozen.
+
+    Parameter level: The loaded json for the level
+    Precondition: level is any value (normally a nested dictionary)
+
+    Parameter objects: The loaded 'objects.json' json file
+    Precondition: objects is any value (normally a nested dictionary)
+    """
+    _check(isinstance(objects, dict) and isinstance(objects.get('images'), dict) and
+           isinstance(objects.get('sprites'), dict),
+           'the object data has no images or sprites')
+    for sprite in ('frog', DEATH_SPRITE):
+        _check(sprite in objects['sprites'],
+               'the object data has no %s sprite' % sprite)
+    _check(isinstance(level, dict), 'the level is not a json object')
+    for key in ('size', 'start', 'offscreen', 'lanes'):
+        _check(key in level, 'the level has no %s' % repr(key))
+    size = level['size']
+    _check(_isNumbers(size, 2) and all(type(x) == int and x > 0 for x in size),
+           'the level size %s is not two positive ints' % repr(size))
+    _check(_isNumbers(level['start'], 2),
+           'the level start %s is not two numbers' % repr(level['start']))
+    _check(_isNumbers([level['offscreen']], 1) and level['offscreen'] >= 0,
+           'the level offscreen %s is not a number >= 0' % repr(level['offscreen']))
+    _check(type(level['lanes']) in (list, tuple) and
+           len(level['lanes']) == level['size'][1],
+           'the level does not have %s lanes' % level['size'][1])
+
+    images = objects['images']
+    lanes = []
+    exits = []
+    for pos in range(len(level['lanes'])):
+        lane = level['lanes'][pos]
+        _check(isinstance(lane, dict) and lane.get('type') in LANE_FIELDS,
+               'lane %s does not have a known type' % pos)
+        for key in LANE_FIELDS[lane['type']]:
+            _check(key in lane, 'lane %s has no %s' % (pos, repr(key)))
+        lane = dict(lane)
+        if 'speed' in LANE_FIELDS[lane['type']]:
+            _check(_isNumbers([lane['speed']], 1),
+                   'lane %s speed %s is not a number' % (pos, repr(lane['speed'])))
+        if 'objects' in LANE_FIELDS[lane['type']]:
+            _check(type(lane['objects']) in (list, tuple),
+                   'lane %s objects is not a list' % pos)
+            lane['objects'] = [_compileObject(obj, images, pos)
+                               for obj in lane['objects']]
+            if lane['type'] == 'hedge':
+                exits.extend(obj for obj in lane['objects'] if obj['type'] == 'exit')
+        lanes.append(lane)
+
+    result = dict(level)
+    result['lanes'] = lanes
+    result['exits'] = exits
+    result['compiled'] = COMPILER_VERSION
+    return result
+
+
+def load_level(name, objects=OBJECT_DATA, app=None):
+    """
+    Returns the pair (level, objects) for the given level file.
+
+    The level is compiled (see compile_level) and objects is the loaded object
+    data.  Both names must refer to files in the JSON folder.  The compiled level is
+    saved in the .compiled folder, and it is read from there (with no json parsing)
+    until the level file or the object file changes.  If the folder cannot be
+    written to, the level is compiled every time.
+
+    If there is an app, the json files are loaded with app.load_json, so a file that
+    has not changed is not parsed again (see GameApp.load_json), and a level read
+    from the .compiled folder counts as a hit for both files in app.JSON_STATS.  The
+    pair returned is never frozen, so it can be saved without game2d.
+
+    A ValueError is raised if either file is missing, is not valid json, or fails
+    the checks in compile_level.
+
+    Parameter name: The level file name
+    Precondition: name is a string
+
+    Parameter objects: The object data file name
+    Precondition: objects is a string
+
+    Parameter app: The game application that loads the json files, or None
+    Precondition: app is None or a GameApp (or GameApp itself)
+    """
+    key = (COMPILER_VERSION, name, _stamp(name), objects, _stamp(objects))
+    path = os.path.join(COMPILED_PATH, name+'.pickle')
+    try:
+        with open(path, 'rb') as f:
+            (stored, result) = pickle.load(f)
+        if stored == key:
+            if not app is None:
+                app.JSON_STATS['hits'] += 2
+            return result
+    except Exception:
+        pass    # Missing, stale or damaged; compile it again
+
+    data = _thaw(_readJson(objects, app))
+    result = (compile_level(_thaw(_readJson(name, app)), data), data)
+    try:
+        os.makedirs(COMPILED_PATH, exist_ok=True)
+        temp = '%s.%d.tmp' % (path, os.getpid())
+        with open(temp, 'wb') as f:
+            pickle.dump((key, result), f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, path)
+    except OSError:
+        pass    # Read-only folder; the level still loads
+    return result
+
+
+def level_images(level, objects):
+    """
+    Returns the sorted list of image files that the given level draws.
+
+    This is every lane tile and lane object image, the frog and death sprite sheets,
+    and the images for safe frogs and lives.  These are the textures to keep loaded
+    while the level is played.
+
+    Parameter level: The compiled level
+    Precondition: level is a level returned by compile_level
+
+    Parameter objects: The loaded 'objects.json' json file
+    Precondition: objects is the object data the level was compiled with
+    """
+    result = {FROG_SAFE, FROG_HEAD}
+    for sprite in ('frog', DEATH_SPRITE):
+        result.add(objects['sprites'][sprite]['file'])
+    for lane in level['lanes']:
+        result.add(lane['type']+'.png')
+        for obj in lane.get('objects', ()):
+            result.add(obj['type']+'.png')
+    return sorted(result)
+
+
+def level_sounds(level):
+    """
+    Returns the sorted list of sound files that the given level plays.
+
+    Every level plays the same frog sounds, but this is a function (like
+    level_images) so that callers do not need to know that.
+
+    Parameter level: The compiled level
+    Precondition: level is a level returned by compile_level
+    """
+    return sorted({CROAK_SOUND, SPLAT_SOUND, TRILL_SOUND})
+
+
+def _compileObject(obj, images, pos):
+    """
+    Returns the compiled copy of an object in a lane, with its hitbox.
+
+    Parameter obj: The object json
+    Precondition: obj is any value (normally a dictionary)
+
+    Parameter images: The 'images' part of objects.json
+    Precondition: images is a dictionary
+
+    Parameter pos: The position of the lane that has the object
+    Precondition: pos is an int
+    """
+    _check(isinstance(obj, dict) and type(obj.get('type')) == str and
+           _isNumbers([obj.get('position')], 1), 'lane %s has a bad object %s' %
+           (pos, repr(obj)))
+    obj = dict(obj)
+    hitbox = images[obj['type']].get('hitbox') if obj['type'] in images else None
+    obj['hitbox'] = None if hitbox is None else list(hitbox)
+    return obj
+
+
+def _readJson(name, app=None):
+    """
+    Returns the parsed json in the given file of the JSON folder.
+
+    If there is an app, the file is loaded with app.load_json, and the json returned
+    is frozen.
+
+    Parameter name: The file name
+    Precondition: name is a string
+
+    Parameter app: The game application that loads the json files, or None
+    Precondition: app is None or a GameApp (or GameApp itself)
+    """
+    if not app is None:
+        if not app.is_json(name):
+            raise ValueError('there is no json file named %s' % repr(name))
+        data = app.load_json(name)
+        if data is None:
+            raise ValueError('json %s is not properly formatted' % repr(name))
+        return data
+    try:
+        with open(os.path.join(JSON_PATH, name)) as f:
+            return json.loads(f.read())
+    except OSError:
+        raise ValueError('there is no json file named %s' % repr(name))
+    except ValueError as e:
+        raise ValueError('json %s is not properly formatted: %s' % (repr(name), e))
+
+
+def _thaw(data):
+    """
+    Returns a copy of the json value data, with dictionaries and lists for the
+    frozen objects and arrays.
+
+    Frozen json (see GameApp.load_json) is shared and uses a game2d class, so it is
+    copied before it is compiled or saved.
+
+    Parameter data: The json value
+    Precondition: data is any json value, frozen or not
+    """
+    if isinstance(data, dict):
+        return {key: _thaw(value) for (key, value) in data.items()}
+    elif type(data) in (list, tuple):
+        return [_thaw(value) for value in data]
+    return data
+
+
+def _stamp(name):
+    """
+    Returns the (modification time, size) of the given file of the JSON folder.
+
+    The result is None if there is no such file.
+
+    Parameter name: The file name
+    Precondition: name is a string
+    """
+    try:
+        info = os.stat(os.path.join(JSON_PATH, name))
+        return (info.st_mtime_ns, info.st_size)
+    except OSError:
+        return None
+
+
+def _isNumbers(value, size):
+    """
+    Returns True if value is a list of size ints or floats.
+
+    Parameter value: The value to check
+    Precondition: value is any value
+
+    Parameter size: The expected length
+    Precondition: size is an int >= 0
+    """
+    return (type(value) in (list, tuple) and len(value) == size and
+            all(type(x) in (int, float) for x in value))
+
+
+def _check(condition, message):
+    """
+    Raises a ValueError with the given message if condition is False.
+
+    Parameter condition: The condition to check
+    Precondition: condition is a bool
+
+    Parameter message: The error message
+    Precondition: message is a string
+    """
+    if not condition:
+        raise ValueError('Invalid level: '+message)
@@ -43,6 +43,9 @@ FROG_WEST   = -90
 FROG_EAST   =  90
 FROG_SOUTH  =   0
 
+# The directions the frog can slide in (a snapshot saves a slide as its index here)
+FROG_DIRECTIONS = ('left','right','up','down')
+
 # The sprite sheet for the animated frog
 FROG_SPRITE  = 'frog2'
 # The sprite sheet for the dying frog
@@ -66,6 +69,9 @@ STATE_CONTINUE = 4
 # The state when the game is complete (won or lost)
 STATE_COMPLETE = 5
 
+# The numbers in a level snapshot before the lane numbers (see Level.takeSnapshot)
+SNAPSHOT_HEADER = 20
+
 
 ### FONT CONSTANTS ###
 
@@ -109,6 +115,15 @@ DEATH_START = 0
 # The final death sprite frame
 DEATH_END = 7
 
+### REPLAYS ###
+
+# The keys saved in a recording, in bit order (the only keys the game reads)
+REPLAY_KEYS = ('up','down','left','right','s','c')
+# The file to record the game input to, or None to not record
+RECORD_FILE = None
+# The file to replay the game input from, or None to play from the keyboard
+REPLAY_FILE = None
+
 ### USE COMMAND LINE ARGUMENTS TO CHANGE DEFAULT LEVEL FILE AND FROG SPEED
 """
 sys.argv is a list of the command line arguments when you run python. These arguments are
@@ -122,9 +137,26 @@ you start the game.
 
 The second argument is the FROG_SPEED, which is the amount of time between move steps.
 A large value means a much slower moving frog.
+
+The options --record=FILE and --replay=FILE set RECORD_FILE and REPLAY_FILE, and may
+come anywhere after the level file (Kivy reads any options that come before it).  They
+are not counted as arguments, so
+
+    python froggit default.json --record=run.frog 1
+
+still sets the FROG_SPEED to 1.
 """
+_args = []
+for _arg in sys.argv[1:]:
+    if _arg.startswith('--record='):
+        RECORD_FILE = _arg[9:]
+    elif _arg.startswith('--replay='):
+        REPLAY_FILE = _arg[9:]
+    else:
+        _args.append(_arg)
+
 try:
-    file = sys.argv[1]
+    file = _args[0]
     if file[-5:].lower() == '.json':
         DEFAULT_LEVEL = file
     else:
@@ -133,7 +165,7 @@ except:
     pass # Use original value
 
 try:
-    value = float(sys.argv[2])
+    value = float(_args[1])
     FROG_SPEED = value
 except:
     pass # Use original value
@@ -0,0 +1,127 @@
+"""
+Desync detection for Froggit
+
+This module checks whether two simulations of the same level, played with the same
+input, stay the same.  Every level (Level or HeadlessLevel) keeps a rolling hash of its
+state, which is updated each frame from the hash of the frame before (see state_hash in
+snapshots.py).  Two levels that have been played the same way have the same hash, and
+once two levels differ their hashes stay different.  So comparing the hashes of each
+frame finds the first frame where they differ, and comparing the state fields of that
+frame finds what was different.
+
+This is how we check that the headless simulation matches the real game, that a game
+is deterministic, and that an optimization did not change the game rules.
+
+You can run this module on its own to compare the real level (which needs Kivy) with
+the headless one, either with random input or with a recording (see replay.py):
+
+    python desync.py complete.json
+    python desync.py --replay=run.frog
+"""
+from consts import *
+from snapshots import state_hash, first_difference
+
+import random
+
+
+def random_script(seed=0, dt=1/60):
+    """
+    Returns a function giving random keys for each frame (like fuzz in headless.py).
+
+    Every FROG_SPEED seconds of game time, the script holds down a new random
+    direction key (or no key at all).
+
+    Parameter seed: The random seed
+    Precondition: seed is an int
+
+    Parameter dt: The time step of each frame
+    Precondition: dt is a float > 0
+    """
+    rand = random.Random(seed)
+    choices = ((),('up',),('up',),('down',),('left',),('right',))
+    hold = max(1,round(FROG_SPEED/dt))
+    keys = []
+    def script(tick):
+        while len(keys) <= tick//hold:
+            keys.append(rand.choice(choices))
+        return keys[tick//hold]
+    return script
+
+
+def lockstep(first, second, ticks, script=None, dt=1/60):
+    """
+    Returns the first difference between two games played with the same input.
+
+    The result is a tuple (tick, name, index, value1, value2), where tick is the
+    number of frames played before the difference (0 means that the new levels are
+    already different), and the rest is as in first_difference.  This function
+    returns None if the games are the same for every frame.  It stops when ticks
+    frames have been played, or either game is complete.
+
+    Each game is a HeadlessGame (or anything with an input, an update method, a
+    getLevel method and an isComplete method).
+
+    Parameter first: The first game
+    Precondition: first is a HeadlessGame that has not been played
+
+    Parameter second: The second game
+    Precondition: second is a HeadlessGame that has not been played
+
+    Parameter ticks: The maximum number of frames
+    Precondition: ticks is an int >= 0
+
+    Parameter script: The keys for each frame (no keys if None)
+    Precondition: script is a function from a frame number to a sequence of
+    strings (such as Recording.keysAt), or None
+
+    Parameter dt: The time step of each frame
+    Precondition: dt is a float > 0, or a function from a frame number to a time
+    step (such as Recording.dtAt)
+    """
+    tick = 0
+    while True:
+        level1 = first.getLevel()
+        level2 = second.getLevel()
+        if level1.getStateHash() != level2.getStateHash():
+            diff = first_difference(level1.getStateFields(), level2.getStateFields())
+            if diff is None:   # The fields are the same, but an earlier frame was not
+                diff = ('hash', 0, level1.getStateHash(), level2.getStateHash())
+            return (tick,)+diff
+        if tick >= ticks or first.isComplete() or second.isComplete():
+            return None
+
+        keys = () if script is None else script(tick)
+        first.input.setKeys(keys)
+        second.input.setKeys(keys)
+        step = dt(tick) if callable(dt) else dt
+        first.update(step)
+        second.update(step)
+        tick += 1
+
+
+# Application code
+if __name__ == '__main__':
+    from headless import HeadlessGame, HeadlessInput, HeadlessLevel, load_json
+    from replay import load_recording
+    from app import Froggit
+    from level import Level
+    Froggit(width=GAME_WIDTH, height=GAME_HEIGHT)   # For the image folder
+
+    hitbox = load_json(OBJECT_DATA)
+    if REPLAY_FILE is None:
+        (name, ticks, script, dt) = (DEFAULT_LEVEL, 100000, random_script(), 1/60)
+        games = [HeadlessGame(load_json(name), hitbox, levelclass=cls)
+            for cls in (Level, HeadlessLevel)]
+    else:
+        recording = load_recording(REPLAY_FILE)
+        (name, ticks) = (recording.getLevel(), len(recording))
+        (script, dt) = (recording.keysAt, recording.dtAt)
+        games = [HeadlessGame(load_json(name), hitbox, HeadlessInput(script(0)),
+            autocontinue=False, levelclass=cls) for cls in (Level, HeadlessLevel)]
+    (real, headless) = games
+    diff = lockstep(real, headless, ticks, script, dt)
+    if diff is None:
+        print('%s: Level and HeadlessLevel match for %d ticks' % (name, real.getTicks()))
+    else:
+        print('%s: Level and HeadlessLevel differ at tick %d, %s[%d]: %r != %r' %
+            ((name,)+diff))
@@ -11,7 +11,13 @@ from .gobject import GObject, GScene
 from .grectangle import GRectangle, GEllipse, GImage, GLabel
 from .gsprite import GSprite
 from .gtile import GTile
+from .glayer import GLayer
+from .gbatch import GBatch
+from .gtext import GText
 from .gpath import GPath, GTriangle, GPolygon
 from .gview import GInput, GView
-from .sound import Sound, SoundLibrary
-from .app import GameApp
\ No newline at end of file
+from .sound import Sound, SoundLibrary, SoundCache, AudioDispatcher
+from .app import GameApp
+from .cache import TextureCache
+from .preload import Preloader
+from .atlas import TextureAtlas, GlyphAtlas
\ No newline at end of file
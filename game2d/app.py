@@ -25,6 +25,62 @@ import sys
 # Pull off the band aid
 import numpy
 
+from .cache import TextureCache
+from .sound import SoundCache, AudioDispatcher
+
+
+class FrozenDict(dict):
+    """
+    A dictionary that cannot be changed.
+    
+    Every JSON object returned by :meth:`GameApp.load_json` is a FrozenDict (and every
+    JSON array is a tuple).  These values are shared by every caller that loads the
+    same file, so changing one would change it for everyone.  Any method that would 
+    change the dictionary raises a ``TypeError`` instead.  Use ``dict(value)`` to get 
+    a copy that can be changed.
+    """
+    
+    def _immutable(self,*args,**keywords):
+        """
+        Raises a TypeError, as this dictionary cannot be changed.
+        """
+        raise TypeError('a frozen JSON object cannot be changed')
+    
+    __setitem__ = _immutable
+    __delitem__ = _immutable
+    __ior__     = _immutable
+    clear       = _immutable
+    pop         = _immutable
+    popitem     = _immutable
+    setdefault  = _immutable
+    update      = _immutable
+    
+    def __reduce__(self):
+        """
+        Returns the pickle (and copy) recipe for this dictionary.
+        
+        The default recipe fills in the dictionary one item at a time, which this 
+        class does not allow.
+        """
+        return (FrozenDict, (dict(self),))
+
+
+def _freeze(data):
+    """
+    Returns: A frozen copy of the parsed JSON value ``data``
+    
+    JSON objects become :class:`FrozenDict` objects and JSON arrays become tuples.
+    All other values are returned as is.
+    
+    :param data: The parsed JSON value
+    :type data:  any JSON value
+    """
+    if type(data) == dict:
+        return FrozenDict((key, _freeze(value)) for (key, value) in data.items())
+    elif type(data) == list:
+        return tuple(_freeze(value) for value in data)
+    return data
+
 
 class GameApp(kivy.app.App):
     """
@@ -45,8 +101,20 @@ class GameApp(kivy.app.App):
     :meth:`draw`: This method draws all of the objects to the screen.  The only 
     thing you should have in this method are calls to ``self.view.draw()``.
     """
-    # Class attribute for tracking textures (to reduce memory footprint)
-    TEXTURE_CACHE = {}
+    # Class attribute for tracking textures (to reduce memory footprint), bounded by memory
+    TEXTURE_CACHE = TextureCache()
+    
+    # Class attribute for sharing loaded sounds (to avoid reading files again)
+    SOUND_CACHE = SoundCache()
+    
+    # Class attribute for playing sounds off the main thread
+    AUDIO_DISPATCHER = AudioDispatcher()
+    
+    # Class attribute for sharing parsed JSON files, keyed by path
+    JSON_CACHE = {}
+    
+    # Class attribute counting JSON loads that did not parse a file (hits) or did (misses)
+    JSON_STATS = {'hits': 0, 'misses': 0}
     
     
     # MUTABLE ATTRIBUTES
@@ -71,6 +139,48 @@ class GameApp(kivy.app.App):
         self._fps = value
         Clock.schedule_interval(self._refresh,1.0/self._fps)
     
+    @property
+    def tick_rate(self):
+        """
+        The number of simulation steps per second
+        
+        The method :meth:`update` is always called with the same time step, which is
+        1/tick_rate seconds.  If a frame takes longer than that, :meth:`update` is
+        called several times to catch up.  If it takes less, :meth:`update` may not be
+        called at all that frame.  This makes the game behave the same no matter how
+        fast the computer is.  By default this value is 60.
+        
+        **Invariant**: Must be an int or float > 0.
+        """
+        return 1.0/self._tick
+    
+    @tick_rate.setter
+    def tick_rate(self,value):
+        assert type(value) in [int,float], 'value %s is not a number' % repr(value)
+        assert value > 0, 'value %s is not positive' % repr(value)
+        self._tick = 1.0/value
+        self._accum = 0.0
+    
+    @property
+    def max_steps(self):
+        """
+        The maximum number of simulation steps in a single frame
+        
+        If the game falls further behind than this (for example, after the window is
+        dragged), the extra time is dropped instead of being simulated.  This keeps a
+        single slow frame from making the next frames slow too.  By default this value
+        is 5.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._maxsteps
+    
+    @max_steps.setter
+    def max_steps(self,value):
+        assert type(value) == int, 'value %s is not an int' % repr(value)
+        assert value > 0, 'value %s is not positive' % repr(value)
+        self._maxsteps = value
+    
     @property
     def width(self):
         """
@@ -129,6 +239,20 @@ class GameApp(kivy.app.App):
         """
         return self._input
     
+    @property
+    def alpha(self):
+        """
+        How far the game is between the last simulation step and the next one.
+        
+        The value is the unsimulated time left over this frame, as a fraction of a
+        time step.  The method :meth:`draw` can use it to interpolate positions between
+        two steps, so that animation stays smooth when the frame rate and the
+        ``tick_rate`` do not match.
+        
+        **Invariant**: Must be a float in the range 0..1.
+        """
+        return self._alpha
+    
     # CLASS METHODS
     @classmethod
     def is_image(cls,name):
@@ -211,7 +335,9 @@ class GameApp(kivy.app.App):
         
         The ``name`` must refer to the file in the **Images** folder.  If the texture
         has already been loaded, it will return the cached texture.  Otherwise, it will
-        load the texture and cache it before returning it.
+        load the texture and cache it before returning it.  The cache is bounded by
+        memory, so textures that have not been used in a while (and are not pinned)
+        may have to be loaded again.
         
         :param name: The file name
         :type name:  ``str``
@@ -219,8 +345,10 @@ class GameApp(kivy.app.App):
         if not cls.is_image(name):
             Logger.info('GameApp: No image file named %s.' % repr(name))
             return None
-        elif name in cls.TEXTURE_CACHE:
-            return cls.TEXTURE_CACHE[name]
+        
+        texture = cls.TEXTURE_CACHE.get(name)
+        if not texture is None:
+            return texture
         
         try:
             from kivy.core.image import Image
@@ -255,6 +383,52 @@ class GameApp(kivy.app.App):
         
         return None
     
+    @classmethod
+    def load_sound(cls,name):
+        """
+        Returns: The loaded Kivy sound for the given file name, or None if it cannot be loaded
+        
+        The ``name`` must refer to a file in the **Sounds** folder.  Sounds are shared
+        through the sound cache (:attr:`SOUND_CACHE`), so a file that is already loaded
+        (or preloaded) is not read again.  Each call adds a reference to the sound, and
+        should be matched by a call to :meth:`unload_sound`.
+        
+        :param name: The file name
+        :type name:  ``str``
+        """
+        return cls.SOUND_CACHE.acquire(name)
+    
+    @classmethod
+    def unload_sound(cls,name):
+        """
+        Releases a sound returned by :meth:`load_sound`.
+        
+        The sound is unloaded when nothing else is using it, unless it was preloaded.
+        
+        :param name: The file name
+        :type name:  ``str``
+        """
+        cls.SOUND_CACHE.release(name)
+    
+    @classmethod
+    def sound_stats(cls):
+        """
+        Returns: A dictionary of statistics about the sound cache
+        
+        See :meth:`SoundCache.stats` for the keys.
+        """
+        return cls.SOUND_CACHE.stats()
+    
+    @classmethod
+    def texture_stats(cls):
+        """
+        Returns: A dictionary of statistics about the texture cache
+        
+        See :meth:`TextureCache.stats` for the keys.  The capacity of the cache can be
+        changed with ``GameApp.TEXTURE_CACHE.capacity``.
+        """
+        return cls.TEXTURE_CACHE.stats()
+    
     @classmethod
     def load_json(cls,name):
         """
@@ -263,6 +437,12 @@ class GameApp(kivy.app.App):
         The ``name`` must refer to the file in the **JSON** folder.  If the file is
         not there, it will return None.
         
+        If the file has already been loaded, and it has not changed since (according
+        to its modification time and size), it will return the cached JSON. Otherwise,
+        it will read the file and cache it before returning it. As the cached JSON is
+        shared, it is frozen: objects are :class:`FrozenDict` objects and arrays are 
+        tuples. Each call counts as a hit or a miss in ``JSON_STATS``.
+        
         :param name: The file name
         :type name:  ``str``
         """
@@ -270,13 +450,23 @@ class GameApp(kivy.app.App):
             Logger.info('GameApp: No json file named %s.' % repr(name))
             return None
         
+        path = os.path.join(cls.json,name)
+        info = os.stat(path)
+        stamp = (info.st_mtime_ns, info.st_size)
+        if path in cls.JSON_CACHE and cls.JSON_CACHE[path][0] == stamp:
+            cls.JSON_STATS['hits'] += 1
+            return cls.JSON_CACHE[path][1]
+        
+        cls.JSON_STATS['misses'] += 1
+        cls.JSON_CACHE.pop(path, None)
         data = None
-        with open(os.path.join(cls.json,name)) as f: 
+        with open(path) as f: 
             data = f.read()
         
         if not data is None:
             try:
-                data = json.loads(data)
+                data = _freeze(json.loads(data))
+                cls.JSON_CACHE[path] = (stamp, data)
             except Exception as e:
                 Logger.info('GameApp: JSON %s is not properly formatted.' % repr(name))
                 exc_type, exc_value, exc_tb = sys.exc_info()
@@ -285,6 +475,25 @@ class GameApp(kivy.app.App):
                 data = None
         return data
     
+    @classmethod
+    def unload_json(cls,name):
+        """
+        Returns: The JSON for the given file name, or None if it is not cached
+        
+        The ``name`` should refer to the file in the JSON cache.  If the JSON is in 
+        the cache, it will return the cached JSON before removing it.  Otherwise, 
+        it will return None.
+        
+        :param name: The file name
+        :type name:  ``str``
+        """
+        assert type(name) == str, '%s is not a valid json name' % repr(name)
+        path = os.path.join(cls.json,name)
+        if path in cls.JSON_CACHE:
+            return cls.JSON_CACHE.pop(path)[1]
+        
+        return None
+    
     # BUILT-IN METHODS
     def __init__(self,**keywords):
         """
@@ -321,6 +530,10 @@ class GameApp(kivy.app.App):
         
         self._fps = f
         
+        self.tick_rate = keywords.pop('tick_rate', 60.0)
+        self.max_steps = keywords.pop('max_steps', 5)
+        self._alpha = 0.0
+        
         x = keywords.pop('left', None)
         y = keywords.pop('top', None)
         assert x is None or type(x) in [int,float], 'left edge %s is not a number' % repr(x)
@@ -399,9 +612,10 @@ class GameApp(kivy.app.App):
         """
         Updates the state of the game one animation frame.
         
-        This method is called 60x a second (depending on the ``fps``) to provide on-screen 
-        animation. Any code that moves objects or processes user input (keyboard or mouse)
-        goes in this method.
+        This method is called 60x a second (depending on the ``tick_rate``) to provide 
+        on-screen animation. The value ``dt`` is always the same fixed time step, no 
+        matter how long the last frame took. Any code that moves objects or processes 
+        user input (keyboard or mouse) goes in this method.
         
         Think of this method as the body of the loop.  You will need to add attributes
         that represent the current animation state, so that they can persist across
@@ -434,6 +648,7 @@ class GameApp(kivy.app.App):
             Clock.schedule_interval(self._refresh,1.0/self.fps)
         else:
             Clock.schedule_interval(self._refresh,0)
+        self._accum = 0.0
         self.start()
     
     def _refresh(self,dt):
@@ -443,13 +658,31 @@ class GameApp(kivy.app.App):
         This method a callback-proxy for the methods `update` and `draw`.  It handles
         important issues behind the scenes, particularly with clearing the window.
         
+        The time ``dt`` is added to an accumulator, and `update` is called once for 
+        every whole time step in the accumulator (up to ``max_steps``).  Any time left
+        over is carried to the next frame, and is available to `draw` as ``alpha``.
+        
         :param dt: time in seconds since last update
         :type dt:  ``int`` or ``float``
         """
+        self._accum += dt
+        self.AUDIO_DISPATCHER.next_frame()
+        steps = 0
+        while self._accum >= self._tick and steps < self._maxsteps:
+            self.AUDIO_DISPATCHER.next_tick(self._tick)
+            self.update(self._tick)
+            self.input.refresh()
+            self._accum -= self._tick
+            steps += 1
+        
+        # Drop the time we could not catch up on
+        if self._accum >= self._tick:
+            self._accum %= self._tick
+        
+        self._alpha = self._accum/self._tick
         self.view.clear()
-        self.update(dt)
         self.draw()
-        self.input.refresh()
+        self.view.commit()
     
     def _setpaths(self):
         """
@@ -0,0 +1,315 @@
+"""
+A module to support texture atlases.
+
+An atlas is a single texture that holds many images.  Images drawn from the same atlas
+do not need to change textures in between, so they can be drawn together as a single
+mesh (see :class:`GBatch`).  A glyph atlas is an atlas of the characters of a font,
+so that text can be drawn the same way (see :class:`GText`).
+"""
+from kivy.graphics.texture import Texture
+from kivy.core.text import Label as CoreLabel
+from .app import GameApp
+import numpy as np
+import math
+
+
+class TextureAtlas(object):
+    """
+    A class representing many images packed into a single texture.
+    
+    The atlas acts like a read-only dictionary from image file names to regions.  A
+    region is the tuple of texture coordinates (u0,v0,u1,v1,u2,v2,u3,v3) of the
+    image in the atlas, for its bottom left, bottom right, top right and top left
+    corners, just like ``Texture.tex_coords``.
+    
+    The images are read from the texture cache (see :meth:`GameApp.load_texture`), so
+    they are not decoded again.  Each image is surrounded by a border that repeats its
+    edge pixels, so that images drawn at fractional positions do not pick up color
+    from their neighbors.
+    """
+    # The number of pixels around each image
+    PADDING = 2
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def texture(self):
+        """
+        The texture holding every image.
+        
+        **Invariant**: Must be a Kivy ``Texture``.
+        """
+        return self._texture
+    
+    @property
+    def names(self):
+        """
+        The image file names in this atlas.
+        
+        **Invariant**: Must be a tuple of strings.
+        """
+        return tuple(self._regions)
+    
+    @property
+    def size(self):
+        """
+        The size (width, height) of the atlas texture in pixels.
+        
+        **Invariant**: Must be a tuple of two ints > 0.
+        """
+        return self._texture.size
+    
+    def __init__(self,names,maxsize=4096):
+        """
+        Creates an atlas of the given images.
+        
+        The images are usually files in the **Images** folder.  They may also be
+        textures that were made some other way (such as rendered text), given as a
+        dictionary from names to textures.
+        
+        A ``ValueError`` is raised if an image cannot be loaded, or if the images do
+        not fit in a texture of the maximum size.
+        
+        :param names: The files in the **Images** folder to pack
+        :type names:  iterable of ``str``, or ``dict`` from names to Kivy ``Texture`` objects
+        
+        :param maxsize: The largest width or height allowed for the atlas
+        :type maxsize:  ``int`` > 0
+        """
+        if isinstance(names,dict):
+            textures = dict(names)
+        else:
+            textures = {}
+            for name in names:
+                texture = GameApp.load_texture(name)
+                if texture is None:
+                    raise ValueError('Image %s cannot be loaded' % repr(name))
+                textures[name] = texture
+        assert len(textures) > 0, 'An atlas needs at least one image'
+        
+        (width, height, spots) = self._pack(textures,maxsize)
+        pad = self.PADDING
+        pixels = np.zeros((height,width,4),dtype=np.uint8)
+        self._regions = {}
+        self._sizes = {}
+        for name in textures:
+            texture = textures[name]
+            (w, h) = texture.size
+            (x, y) = spots[name]
+            image = np.frombuffer(texture.pixels,dtype=np.uint8).reshape(h,w,4)
+            pixels[y-pad:y+h+pad,x-pad:x+w+pad] = np.pad(image,((pad,pad),(pad,pad),(0,0)),mode='edge')
+            
+            coords = texture.tex_coords
+            region = []
+            for pos in range(0,8,2):
+                region.append((x+coords[pos]*w)/width)
+                region.append((y+coords[pos+1]*h)/height)
+            self._regions[name] = tuple(region)
+            self._sizes[name] = (w, h)
+        
+        self._texture = Texture.create(size=(width,height),colorfmt='rgba')
+        self._texture.blit_buffer(pixels.tobytes(),colorfmt='rgba',bufferfmt='ubyte')
+    
+    def __len__(self):
+        """
+        Returns the number of images in this atlas.
+        """
+        return len(self._regions)
+    
+    def __contains__(self,name):
+        """
+        Returns True if the image name is in this atlas.
+        
+        :param name: The image file name
+        :type name:  ``str``
+        """
+        return name in self._regions
+    
+    def __getitem__(self,name):
+        """
+        Returns the region (the corner texture coordinates) of the image name.
+        
+        :param name: The image file name
+        :type name:  ``str``
+        """
+        return self._regions[name]
+    
+    def image_size(self,name):
+        """
+        Returns the size (width, height) in pixels of the image name.
+        
+        :param name: The image file name
+        :type name:  ``str``
+        """
+        return self._sizes[name]
+    
+    # HIDDEN METHODS
+    def _pack(self,textures,maxsize):
+        """
+        Returns (width, height, spots) for the packed images.
+        
+        The images are packed in rows (shelves), from the tallest to the shortest.  The
+        value spots is a dictionary from each name to the position (x, y) of the bottom
+        left corner of the image, not counting its border.
+        
+        :param textures: The textures to pack
+        :type textures:  ``dict`` from names to Kivy ``Texture`` objects
+        
+        :param maxsize: The largest width or height allowed for the atlas
+        :type maxsize:  ``int`` > 0
+        """
+        pad = self.PADDING
+        boxes = [(t.height+2*pad, t.width+2*pad, name) for (name, t) in textures.items()]
+        boxes.sort(key=lambda box: (-box[0],-box[1],box[2]))
+        area = sum(box[0]*box[1] for box in boxes)
+        width = max(max(box[1] for box in boxes),int(math.ceil(math.sqrt(area))))
+        if width > maxsize:
+            raise ValueError('The images do not fit in a %sx%s atlas' % (maxsize,maxsize))
+        
+        spots = {}
+        (x, y, shelf) = (0, 0, 0)
+        for (h, w, name) in boxes:
+            if x+w > width:
+                (x, y, shelf) = (0, y+shelf, 0)
+            spots[name] = (x+pad, y+pad)
+            x += w
+            shelf = max(shelf, h)
+        height = y+shelf
+        if height > maxsize:
+            raise ValueError('The images do not fit in a %sx%s atlas' % (maxsize,maxsize))
+        return (width, height, spots)
+
+
+class GlyphAtlas(object):
+    """
+    A class representing the characters of a font, pre-rendered into an atlas.
+    
+    Each character is rendered once, in white, as an image the height of a line of
+    text.  Text is then drawn by placing these images side by side, so changing the
+    text never renders anything.  As each character is rendered on its own, there is
+    no kerning between them.
+    
+    Characters that are not in the atlas are drawn as the fallback character ('?').
+    """
+    # The characters rendered by default (printable ASCII)
+    CHARACTERS = ''.join(map(chr,range(32,127)))
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def font_name(self):
+        """
+        The file name of the .ttf file for this font, or None for the default font.
+        
+        **Invariant**: Must be None or a string referring to a .ttf file in folder Fonts.
+        """
+        return self._font_name
+    
+    @property
+    def font_size(self):
+        """
+        The size of the font in points.
+        
+        **Invariant**: Must be a positive number (int or float).
+        """
+        return self._font_size
+    
+    @property
+    def height(self):
+        """
+        The height of a line of text.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._height
+    
+    @property
+    def texture(self):
+        """
+        The texture holding every character.
+        
+        **Invariant**: Must be a Kivy ``Texture``.
+        """
+        return self._atlas.texture
+    
+    def __init__(self,font_name=None,font_size=15,characters=None):
+        """
+        Creates the glyph atlas for the given font.
+        
+        :param font_name: The .ttf file in the **Fonts** folder (None for the default)
+        :type font_name:  ``str`` or None
+        
+        :param font_size: The size of the font in points
+        :type font_size:  ``int`` or ``float`` > 0
+        
+        :param characters: The characters to render (None for :attr:`CHARACTERS`)
+        :type characters:  ``str`` or None
+        """
+        assert font_name is None or GameApp.is_font(font_name), '%s is not a font name' % repr(font_name)
+        assert type(font_size) in [int,float] and font_size > 0, '%s is not a valid font size' % repr(font_size)
+        self._font_name = font_name
+        self._font_size = font_size
+        characters = self.CHARACTERS if characters is None else characters
+        
+        options = {'font_size':font_size,'color':(1,1,1,1)}
+        if not font_name is None:
+            options['font_name'] = font_name
+        textures = {}
+        for char in sorted(set(characters)):
+            label = CoreLabel(text=char,**options)
+            label.refresh()
+            if label.texture.width > 1:
+                textures[char] = label.texture
+        self._atlas = TextureAtlas(textures)
+        
+        self._chars = {}
+        widths = []
+        regions = []
+        for char in textures:
+            self._chars[char] = len(widths)
+            widths.append(self._atlas.image_size(char)[0])
+            regions.append(self._atlas[char])
+        self._widths = np.array(widths,dtype=np.float32)
+        self._regions = np.array(regions,dtype=np.float32)
+        self._height = max(self._atlas.image_size(char)[1] for char in textures)
+        self._fallback = self._chars.get('?',0)
+    
+    def __contains__(self,char):
+        """
+        Returns True if the character is in this atlas.
+        
+        :param char: The character
+        :type char:  ``str`` of length 1
+        """
+        return char in self._chars
+    
+    def indices(self,text):
+        """
+        Returns the NumPy array of glyph indices for the characters of text.
+        
+        The indices refer to the arrays of :meth:`widths` and :meth:`regions`.
+        
+        :param text: The text to look up
+        :type text:  ``str``
+        """
+        fallback = self._fallback
+        return np.array([self._chars.get(char,fallback) for char in text],dtype=np.intp)
+    
+    def widths(self):
+        """
+        Returns the NumPy array of the width of each glyph.
+        """
+        return self._widths
+    
+    def regions(self):
+        """
+        Returns the n x 8 NumPy array of the atlas region of each glyph.
+        """
+        return self._regions
+    
+    def measure(self,text):
+        """
+        Returns the width of the given text in this font.
+        
+        :param text: The text to measure
+        :type text:  ``str``
+        """
+        return float(self._widths[self.indices(text)].sum())
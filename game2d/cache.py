@@ -0,0 +1,262 @@
+"""
+A memory-bounded cache for textures.
+
+Textures are shared by every image that uses the same file, so the game keeps them in
+a cache (see :attr:`GameApp.TEXTURE_CACHE`).  This cache has a memory budget.  When
+it is over budget, it drops the least recently used textures until it is under budget
+again.  Textures that are in use can be pinned so that they are never dropped.
+"""
+from collections import OrderedDict
+
+
+class TextureCache(object):
+    """
+    A least-recently-used cache of textures, bounded by memory.
+    
+    The cache acts like a dictionary from file names to textures.  The size of a
+    texture is its width times its height times the bytes per pixel of its color
+    format.  Adding a texture (or lowering the :attr:`capacity`) drops the least
+    recently used textures that are not pinned, until the total size is within the
+    capacity.  A texture that is bigger than the capacity on its own is still kept,
+    as it was just asked for.
+    
+    Dropping a texture from the cache does not break any image that is using it; the
+    image keeps its own reference.  But loading the same file again will decode it
+    again, which is why textures in use should be pinned.
+    """
+    # The number of bytes per pixel for each Kivy color format
+    BYTES_PER_PIXEL = {'rgba': 4, 'bgra': 4, 'rgb': 3, 'bgr': 3,
+                       'luminance_alpha': 2, 'luminance': 1, 'alpha': 1, 'red': 1}
+    
+    # MUTABLE PROPERTIES
+    @property
+    def capacity(self):
+        """
+        The memory budget of this cache in bytes.
+        
+        Lowering the capacity drops textures right away if the cache is over budget.
+        
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._capacity
+    
+    @capacity.setter
+    def capacity(self,value):
+        assert type(value) == int and value >= 0, 'value %s is not a valid capacity' % repr(value)
+        self._capacity = value
+        self._evict()
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def size(self):
+        """
+        The total size in bytes of the textures in this cache.
+        
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._size
+    
+    def __init__(self,capacity=128*1024*1024):
+        """
+        Creates a new, empty texture cache.
+        
+        :param capacity: The memory budget in bytes
+        :type capacity:  ``int`` >= 0
+        """
+        self._entries = OrderedDict()
+        self._pins = {}
+        self._callbacks = []
+        self._size = 0
+        self._peak = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self.capacity = capacity
+    
+    # DICTIONARY METHODS
+    def __len__(self):
+        """
+        Returns the number of textures in this cache.
+        """
+        return len(self._entries)
+    
+    def __contains__(self,name):
+        """
+        Returns True if the texture for name is in this cache.
+        
+        This does not count as a use of the texture.
+        
+        :param name: The file name
+        :type name:  ``str``
+        """
+        return name in self._entries
+    
+    def __iter__(self):
+        """
+        Returns an iterator over the file names, from least to most recently used.
+        """
+        return iter(list(self._entries))
+    
+    def __getitem__(self,name):
+        """
+        Returns the texture for name, marking it as the most recently used.
+        
+        :param name: The file name
+        :type name:  ``str``
+        """
+        entry = self._entries[name]
+        self._entries.move_to_end(name)
+        return entry[0]
+    
+    def __setitem__(self,name,texture):
+        """
+        Adds (or replaces) the texture for name, dropping old textures if needed.
+        
+        :param name: The file name
+        :type name:  ``str``
+        
+        :param texture: The texture for the file
+        :type texture:  a Kivy ``Texture``
+        """
+        if name in self._entries:
+            self._size -= self._entries.pop(name)[1]
+        nbytes = self.sizeof(texture)
+        self._entries[name] = (texture, nbytes)
+        self._size += nbytes
+        self._peak = max(self._peak, self._size)
+        self._evict()
+    
+    def __delitem__(self,name):
+        """
+        Removes the texture for name from this cache (even if it is pinned).
+        
+        This does not call the eviction callbacks, as the texture was removed on
+        purpose.
+        
+        :param name: The file name
+        :type name:  ``str``
+        """
+        self._size -= self._entries.pop(name)[1]
+    
+    def get(self,name,default=None):
+        """
+        Returns the texture for name, or default if it is not in this cache.
+        
+        Unlike the other lookups, this method counts as a hit or a miss in the
+        cache :meth:`stats`.  A hit marks the texture as the most recently used.
+        
+        :param name: The file name
+        :type name:  ``str``
+        
+        :param default: The value to return on a miss
+        :type default:  any value
+        """
+        if name in self._entries:
+            self._hits += 1
+            return self[name]
+        self._misses += 1
+        return default
+    
+    # PINNING
+    def pin(self,name):
+        """
+        Pins the texture for name, so that it is never dropped to save memory.
+        
+        A name may be pinned before its texture is loaded.  Pins are counted, so a
+        texture pinned twice has to be unpinned twice.
+        
+        :param name: The file name
+        :type name:  ``str``
+        """
+        self._pins[name] = self._pins.get(name, 0)+1
+    
+    def unpin(self,name):
+        """
+        Removes one pin from the texture for name.
+        
+        Once the last pin is removed, the texture may be dropped again, and it is
+        dropped right away if the cache is over budget.
+        
+        :param name: The file name
+        :type name:  ``str``
+        """
+        assert name in self._pins, '%s is not pinned' % repr(name)
+        self._pins[name] -= 1
+        if self._pins[name] == 0:
+            del self._pins[name]
+            self._evict()
+    
+    def is_pinned(self,name):
+        """
+        Returns True if the texture for name is pinned.
+        
+        :param name: The file name
+        :type name:  ``str``
+        """
+        return name in self._pins
+    
+    # CALLBACKS
+    def add_callback(self,callback):
+        """
+        Adds a function to call whenever a texture is dropped to save memory.
+        
+        The function is called as ``callback(name, texture)``, after the texture is
+        removed from the cache.
+        
+        :param callback: The function to call
+        :type callback:  callable
+        """
+        assert callable(callback), '%s is not callable' % repr(callback)
+        self._callbacks.append(callback)
+    
+    def remove_callback(self,callback):
+        """
+        Removes a function added with :meth:`add_callback`.
+        
+        :param callback: The function to remove
+        :type callback:  callable
+        """
+        self._callbacks.remove(callback)
+    
+    # OTHER METHODS
+    def stats(self):
+        """
+        Returns a dictionary of statistics about this cache.
+        
+        The keys are 'textures' (the number of textures), 'pinned' (how many of them
+        are pinned), 'size', 'peak' and 'capacity' (all in bytes), and 'hits',
+        'misses' and 'evictions' (counted since the cache was made).
+        """
+        pinned = sum(1 for name in self._entries if name in self._pins)
+        return {'textures': len(self._entries), 'pinned': pinned, 'size': self._size,
+                'peak': self._peak, 'capacity': self._capacity, 'hits': self._hits,
+                'misses': self._misses, 'evictions': self._evictions}
+    
+    @classmethod
+    def sizeof(cls,texture):
+        """
+        Returns the size of texture in bytes.
+        
+        :param texture: The texture to measure
+        :type texture:  a Kivy ``Texture``
+        """
+        bpp = cls.BYTES_PER_PIXEL.get(getattr(texture,'colorfmt','rgba'), 4)
+        return int(texture.width)*int(texture.height)*bpp
+    
+    def _evict(self):
+        """
+        Drops the least recently used unpinned textures until within capacity.
+        
+        The most recently used texture is never dropped.
+        """
+        if self._size <= self._capacity:
+            return
+        for name in list(self._entries)[:-1]:
+            if self._size <= self._capacity:
+                break
+            if not name in self._pins:
+                (texture, nbytes) = self._entries.pop(name)
+                self._size -= nbytes
+                self._evictions += 1
+                for callback in self._callbacks:
+                    callback(name, texture)
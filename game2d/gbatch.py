@@ -0,0 +1,193 @@
+"""
+A module to support batched images.
+
+A batch is a group of images from the same texture atlas, drawn as a single mesh.
+Drawing a batch costs one draw call, no matter how many images it has, and moving
+the images only changes the numbers in the mesh.
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from .gobject import GObject
+import numpy as np
+import math
+
+
+class GBatch(GObject):
+    """
+    An class representing a group of images drawn as a single mesh
+    
+    Each image in the batch is a rectangle showing an image from a
+    :class:`TextureAtlas`, like a ``GImage``.  Images are referred to by their index,
+    the order in which they were added, which is also the order in which they are
+    drawn.  Each image has its own center, size and angle.
+    
+    The images are positioned relative to the batch, so a batch at (0,0) uses the same
+    coordinates as the view.  Moving, rotating or scaling the batch moves, rotates or
+    scales every image in it.
+    """
+    # The most images a batch can have (as mesh indices are 16 bits)
+    MAX_IMAGES = 16384
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def atlas(self):
+        """
+        The atlas holding the images of this batch.
+        
+        **Invariant**: Must be a :class:`TextureAtlas`.
+        """
+        return self._atlas
+    
+    # BUILT-IN METHODS
+    def __init__(self,atlas,**keywords):
+        """
+        Creates a new, empty batch for the given atlas.
+        
+        This class supports the all same keywords as :class:`GObject`.
+        
+        :param atlas: The atlas holding the images
+        :type atlas:  :class:`TextureAtlas`
+        
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._atlas = atlas
+        self._corners = np.zeros((0,4,2),dtype=np.float32)
+        self._vertices = np.zeros((0,4,4),dtype=np.float32)
+        self._centers = np.zeros((0,2),dtype=np.float32)
+        self._added = []
+        GObject.__init__(self,**keywords)
+        self._reset()
+        self._defined = True
+    
+    def __len__(self):
+        """
+        Returns the number of images in this batch.
+        """
+        return len(self._centers)+len(self._added)
+    
+    # PUBLIC METHODS
+    def add(self,name,x,y,width=None,height=None,angle=0):
+        """
+        Returns the index of a new image added to the top of this batch.
+        
+        :param name: The image file name
+        :type name:  ``str`` in the atlas
+        
+        :param x: The horizontal coordinate of the image center
+        :type x:  ``int`` or ``float``
+        
+        :param y: The vertical coordinate of the image center
+        :type y:  ``int`` or ``float``
+        
+        :param width: The image width (the width of the file if None)
+        :type width:  ``int`` or ``float`` >= 0, or None
+        
+        :param height: The image height (the height of the file if None)
+        :type height:  ``int`` or ``float`` >= 0, or None
+        
+        :param angle: The angle of rotation about the center, in degrees
+        :type angle:  ``int`` or ``float``
+        """
+        assert name in self._atlas, '%s is not in the atlas' % repr(name)
+        (w, h) = self._atlas.image_size(name)
+        w = w if width is None else width
+        h = h if height is None else height
+        
+        radians = math.radians(angle)
+        (cos, sin) = (math.cos(radians), math.sin(radians))
+        if angle % 90 == 0:
+            (cos, sin) = (round(cos), round(sin))
+        corners = []
+        for (dx, dy) in ((-w/2,-h/2),(w/2,-h/2),(w/2,h/2),(-w/2,h/2)):
+            corners.append((dx*cos-dy*sin, dx*sin+dy*cos))
+        
+        region = self._atlas[name]
+        vertex = [(cx+x, cy+y, region[2*k], region[2*k+1]) for (k, (cx, cy)) in enumerate(corners)]
+        assert len(self) < self.MAX_IMAGES, 'A batch cannot have more than %s images' % self.MAX_IMAGES
+        self._added.append((corners, vertex, (x, y)))
+        return len(self)-1
+    
+    def getPositions(self):
+        """
+        Returns a copy of the image centers, as an n x 2 NumPy array.
+        """
+        self._sync()
+        return self._centers.copy()
+    
+    def setPositions(self,xs,ys=None):
+        """
+        Moves the images of this batch to the given centers.
+        
+        This updates the mesh in place, so it is much faster than moving one
+        ``GImage`` per image.
+        
+        :param xs: The horizontal coordinate of each image center, in index order
+        :type xs:  sequence of ``len(self)`` numbers
+        
+        :param ys: The vertical coordinate of each center (unchanged if None)
+        :type ys:  sequence of ``len(self)`` numbers, or None
+        """
+        self._sync()
+        self._centers[:,0] = xs
+        if not ys is None:
+            self._centers[:,1] = ys
+        np.add(self._corners,self._centers[:,None,:],out=self._vertices[:,:,0:2])
+        if len(self._flat):
+            self._mesh.vertices = self._flat
+    
+    def draw(self,view):
+        """
+        Draws this batch in the provided view.
+        
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        self._sync()
+        GObject.draw(self,view)
+    
+    def show(self,view):
+        """
+        Adds this batch to the provided view, where it stays until it is hidden.
+        
+        The batch is moved with :meth:`setPositions`.  Images added afterwards are
+        only shown by the next call to :meth:`setPositions` or :meth:`draw`.
+        
+        :param view: view to add to
+        :type view:  :class:`GView`
+        """
+        self._sync()
+        GObject.show(self,view)
+    
+    # HIDDEN METHODS
+    def _sync(self):
+        """
+        Moves the images added since the last call into the mesh.
+        """
+        if self._added:
+            (corners, vertices, centers) = zip(*self._added)
+            self._corners = np.concatenate((self._corners,np.array(corners,dtype=np.float32)))
+            self._vertices = np.concatenate((self._vertices,np.array(vertices,dtype=np.float32)))
+            self._centers = np.concatenate((self._centers,np.array(centers,dtype=np.float32)))
+            self._added = []
+            self._reset()
+    
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        GObject._reset(self)
+        n = len(self._centers)
+        self._flat = self._vertices.reshape(-1)
+        quads = np.arange(0,4*n,4,dtype=np.uint16)[:,None]
+        indices = (quads+np.array([0,1,2,2,3,0],dtype=np.uint16)).reshape(-1)
+        # Kivy cannot read an empty array, so an empty batch gets an empty list
+        self._mesh = Mesh(vertices=self._flat if n else [],indices=indices.tolist(),mode='triangles',
+                          texture=self._atlas.texture)
+        if not self._fillcolor is None:
+            self._cache.add(self._fillcolor)
+        else:
+            self._cache.add(Color(1,1,1))
+        self._cache.add(self._mesh)
+        
+        self._cache.add(PopMatrix())
@@ -0,0 +1,172 @@
+"""
+A module to support pre-rendered layers.
+
+A layer is a group of objects that is drawn once into an offscreen image (a Kivy
+``Fbo``), and then drawn every frame as that single image.  It is useful for things
+like backgrounds, which are made of many objects that never move.
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from kivy.metrics import dp
+from .grectangle import GRectangle, GObject
+
+
+class GLayer(GRectangle):
+    """
+    An class representing a pre-rendered group of objects
+    
+    Objects added to a layer are not drawn to the view.  Instead they are drawn
+    (baked) into a texture the size of the layer, and the layer draws that texture
+    like a ``GImage``.  So drawing the layer costs one rectangle, no matter how many
+    objects it has.
+    
+    The objects are positioned relative to the bottom left corner of the layer, not
+    the view.  A layer that fills the view (with ``left=0`` and ``bottom=0``) can use
+    the same coordinates as the view.
+    
+    The layer is baked the next time it is drawn after an object is added.  Changing
+    an object that is already in the layer does **not** change the layer until
+    :meth:`bake` is called.
+    """
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def objects(self):
+        """
+        The objects in this layer, in drawing order.
+        
+        **Invariant**: Must be a tuple of :class:`GObject`.
+        """
+        return tuple(self._objects)
+    
+    @property
+    def bakes(self):
+        """
+        The number of times this layer has been baked.
+        
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._bakes
+    
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new, empty layer.
+        
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes. For example, to make a
+        layer that fills a 400x300 view, use the constructor::
+        
+            GLayer(left=0,bottom=0,width=400,height=300)
+        
+        This class supports the all same keywords as :class:`GRectangle`.  However, the
+        attributes `width` and `height` are **required** (so that the object knows how
+        big a texture to make).  Leaving out these values will cause a `ValueError`.
+        
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names, including 'width' and 'height'
+        """
+        self._defined = False
+        if not 'width' in keywords:
+            raise ValueError("The 'width' argument must be specified.")
+        if not 'height' in keywords:
+            raise ValueError("The 'height' argument must be specified.")
+        self._objects = []
+        self._fbo = None
+        self._dirty = True
+        self._bakes = 0
+        GRectangle.__init__(self,**keywords)
+        self._defined = True
+    
+    # PUBLIC METHODS
+    def add(self,obj):
+        """
+        Adds an object to the top of this layer.
+        
+        The object must not be drawn anywhere else, as it is now drawn by the layer.
+        
+        :param obj: The object to add
+        :type obj:  :class:`GObject`
+        """
+        assert isinstance(obj,GObject), '%s is not a GObject' % repr(obj)
+        self._objects.append(obj)
+        self._dirty = True
+    
+    def remove(self,obj):
+        """
+        Removes an object from this layer.
+        
+        The layer is baked again the next time it is drawn.
+        
+        :param obj: The object to remove
+        :type obj:  :class:`GObject` in this layer
+        """
+        assert obj in self._objects, '%s is not in the layer' % repr(obj)
+        self._objects.remove(obj)
+        self._dirty = True
+    
+    def bake(self):
+        """
+        Draws the objects of this layer into its texture.
+        
+        This is called for you when the layer is drawn after an object was added.  You
+        only need to call it after changing an object already in the layer.
+        """
+        self._fbo.clear()
+        self._fbo.add(ClearColor(0,0,0,0))
+        self._fbo.add(ClearBuffers())
+        self._fbo.add(Scale(dp(1),dp(1),1))
+        for obj in self._objects:
+            self._fbo.add(obj._cache)
+        self._fbo.draw()
+        self._dirty = False
+        self._bakes += 1
+    
+    def draw(self,view):
+        """
+        Draws this layer in the provided view, baking it first if it has changed.
+        
+        :param view: view to draw to
+        :type view:  :class:`GView`
+        """
+        if self._dirty:
+            self.bake()
+        GObject.draw(self,view)
+    
+    def show(self,view):
+        """
+        Adds this layer to the provided view, baking it first if it has changed.
+        
+        The layer then stays on screen, but it is not baked again by itself.  After an
+        object is added or removed, call :meth:`draw` (which only bakes the layer, as
+        it is already on screen) or :meth:`bake`.
+        
+        :param view: view to add to
+        :type view:  :class:`GView`
+        """
+        if self._dirty:
+            self.bake()
+        GObject.show(self,view)
+    
+    # HIDDEN METHODS
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        GObject._reset(self)
+        
+        size = (max(1,int(round(self.width*dp(1)))),max(1,int(round(self.height*dp(1)))))
+        if self._fbo is None or tuple(self._fbo.size) != size:
+            self._fbo = Fbo(size=size)
+            self._dirty = True
+        
+        x = -self.width/2.0
+        y = -self.height/2.0
+        fill = Rectangle(pos=(x,y), size=(self.width, self.height),texture=self._fbo.texture)
+        if not self._fillcolor is None:
+            self._cache.add(self._fillcolor)
+        else:
+            self._cache.add(Color(1,1,1))
+        self._cache.add(fill)
+        
+        self._cache.add(PopMatrix())
@@ -725,12 +725,42 @@ class GObject(object):
         except:
             raise IOError('Cannot draw %s since it was not initialized properly' % repr(self))
 
+    def show(self, view):
+        """
+        Adds this shape to the provided view, where it stays until it is hidden.
+
+        Unlike :meth:`draw`, this is done once, and not every animation frame.  Moving
+        or changing the shape afterwards changes it on screen.  See :meth:`GView.add`.
+
+        :param view: view to add to
+        :type view:  :class:`GView`
+        """
+        try:
+            view.add(self._cache)
+        except AttributeError:
+            raise IOError('Cannot show %s since it was not initialized properly' % repr(self))
+
+    def hide(self, view):
+        """
+        Removes this shape from the provided view, after a call to :meth:`show`.
+
+        :param view: view to remove from
+        :type view:  :class:`GView`
+        """
+        view.remove(self._cache)
+
     # HIDDEN METHODS
     def _reset(self):
         """
         Resets the drawing cache.
+
+        The cache is refilled, and not replaced, so a shape added to a view (see
+        :meth:`show`) stays there after a reset.
         """
-        self._cache = InstructionGroup()
+        if getattr(self,'_cache',None) is None:
+            self._cache = InstructionGroup()
+        else:
+            self._cache.clear()
         self._cache.add(PushMatrix())
         self._cache.add(self._trans)
         self._cache.add(self._rotate)
@@ -11,6 +11,7 @@ Date:   August 1, 2017 (Python 3 version)
 from kivy.graphics import *
 from kivy.graphics.instructions import *
 from kivy.uix.label import Label
+from kivy.core.text import Label as CoreLabel
 from kivy.uix.image import Image
 from .gobject import GObject
 from .app import GameApp
@@ -300,7 +301,16 @@ class GLabel(GRectangle):
     to the font by filename, including the .ttf. If you give no name, it will use the 
     default Kivy font.  The `bold` attribute only works for the default Kivy font; for 
     other fonts you will need the .ttf file for the bold version of that font.  See the
-    provided `ComicSans.ttf` and `ComicSansBold.ttf` for an example."""
+    provided `ComicSans.ttf` and `ComicSansBold.ttf` for an example.
+    
+    The text is not drawn (rasterized) when an attribute changes, but once before the
+    next frame, no matter how many attributes changed.  Until then, the size of the
+    label does not include the new text.  Labels with the same text and font share the
+    same texture, which is only rasterized once (see :attr:`TEXT_CACHE`)."""
+    # The rendered text of recent labels, keyed by their text and font settings
+    TEXT_CACHE = {}
+    # The number of rendered texts to keep in TEXT_CACHE
+    TEXT_CACHE_SIZE = 64
     
     # MUTABLE PROPERTIES
     @property
@@ -316,7 +326,6 @@ class GLabel(GRectangle):
         assert type(value) in [int,float], 'value %s is not a number' % repr(value)
         self._fsize = value
         self._label.font_size = value
-        self._label.texture_update()
     
     @property
     def font_name(self):
@@ -331,7 +340,6 @@ class GLabel(GRectangle):
         from .app import GameApp
         assert GameApp.is_font(value), 'value %s is not a font name' % repr(value)
         self._label.font_name = value
-        self._label.texture_update()
     
     @property
     def bold(self):
@@ -349,7 +357,6 @@ class GLabel(GRectangle):
     def bold(self,value):
         assert type(value) == bool, repr(value)+' is not a bool'
         self._label.bold = value
-        self._label.texture_update()
 
     @property
     def text(self):
@@ -367,7 +374,6 @@ class GLabel(GRectangle):
     def text(self,value):
         assert type(value) == str, 'value %s is not a string' % repr(value)
         self._label.text = value
-        self._label.texture_update()
     
     @property
     def halign(self):
@@ -604,7 +610,7 @@ class GLabel(GRectangle):
             if not key in excludes:
                 sanitized[key] = keywords[key]
         
-        self._label = Label(**sanitized)
+        self._label = _TextLabel(**sanitized)
         self._label.size_hint = (None,None)
         
         self.linewidth = keywords['linewidth'] if 'linewidth' in keywords else 0.0
@@ -695,3 +701,61 @@ class GLabel(GRectangle):
             self._cache.add(line)
         
         self._cache.add(PopMatrix())
+
+
+class _TextLabel(Label):
+    """
+    A Kivy label that shares its rendered text through :attr:`GLabel.TEXT_CACHE`
+    
+    Kivy labels rasterize their text once before the next frame after any font
+    attribute changes.  This label first looks for a texture with the same text and
+    font attributes in the cache, and only rasterizes the text if there is none.
+    
+    Each cached texture has its own core label.  A core label draws new text into its
+    old texture if the size has not changed, so a texture shared by several labels
+    cannot belong to any one of them.
+    """
+    
+    def texture_update(self, *largs):
+        """
+        Updates the texture to the current text and font attributes.
+        """
+        if self.markup or not self.text:
+            Label.texture_update(self, *largs)
+            return
+        
+        options = {x: getattr(self, x) for x in self._font_properties}
+        options['usersize'] = self.text_size
+        if self.disabled:
+            options['color'] = self.disabled_color
+            options['outline_color'] = self.disabled_outline_color
+        key = tuple((k, self._freeze(options[k])) for k in sorted(options))
+        
+        cache = GLabel.TEXT_CACHE
+        if key in cache:
+            core = cache.pop(key)
+        else:
+            core = CoreLabel(**options)
+            core.refresh()
+        cache[key] = core
+        if len(cache) > GLabel.TEXT_CACHE_SIZE:
+            del cache[next(iter(cache))]
+        
+        self.texture = None
+        if not core.texture is None:
+            self.texture = core.texture
+            self.texture_size = list(core.texture.size)
+        self.is_shortened = core.is_shortened
+    
+    def _freeze(self, value):
+        """
+        Returns a hashable version of an attribute value (lists become tuples).
+        
+        :param value: The attribute value
+        :type value:  any attribute value of a Kivy label
+        """
+        if isinstance(value, dict):
+            return tuple(sorted((k, self._freeze(v)) for (k, v) in value.items()))
+        if isinstance(value, (list, tuple)):
+            return tuple(self._freeze(v) for v in value)
+        return value
@@ -33,7 +33,14 @@ class GSprite(GRectangle):
 
     If the image supports transparency, then this object can be used to represent irregular
     shapes.  However, the :meth:`contains` method still treats this shape as a  rectangle.
+
+    Sprites with the same source and format share the same frame textures, which are
+    only cut from the image once (see :attr:`FRAME_CACHE`).
     """
+    # The frame textures of recent sprites, keyed by source and format
+    FRAME_CACHE = {}
+    # The number of filmstrips to keep in FRAME_CACHE
+    FRAME_CACHE_SIZE = 64
 
     # IMMUTABLE PROPERTIES
     @property
@@ -190,13 +197,7 @@ class GSprite(GRectangle):
                 self.width  = width
                 self.height = height
 
-            ty = 0
-            for row in range(self._format[0]):
-                tx = 0
-                for col in range(self._format[1]):
-                    self._images[row*self._format[1]+col] = texture.get_region(int(tx),texture.height-int(ty)-int(height),int(width),int(height))
-                    tx += width
-                ty += width
+            self._images = self._frames(texture)
         else:
             print('Failed to load',repr(self.source))
 
@@ -216,3 +217,38 @@ class GSprite(GRectangle):
             self._cache.add(line)
 
         self._cache.add(PopMatrix())
+
+    def _frames(self,texture):
+        """
+        Returns the tuple of frame textures for this filmstrip.
+
+        The frames are cut from the texture once for each source and format, and are
+        shared by every sprite that uses them.  They are cut again if the texture was
+        reloaded since.
+
+        :param texture: The texture for the source file
+        :type texture:  Kivy ``Texture``
+        """
+        key = (self.source, self._format)
+        if key in self.FRAME_CACHE:
+            (parent, frames) = self.FRAME_CACHE.pop(key)
+            if parent is texture:
+                self.FRAME_CACHE[key] = (parent, frames)
+                return frames
+
+        width  = texture.width/self._format[1]
+        height = texture.height/self._format[0]
+        frames = []
+        ty = 0
+        for row in range(self._format[0]):
+            tx = 0
+            for col in range(self._format[1]):
+                frames.append(texture.get_region(int(tx),texture.height-int(ty)-int(height),int(width),int(height)))
+                tx += width
+            ty += height
+        frames = tuple(frames)
+
+        self.FRAME_CACHE[key] = (texture, frames)
+        if len(self.FRAME_CACHE) > self.FRAME_CACHE_SIZE:
+            del self.FRAME_CACHE[next(iter(self.FRAME_CACHE))]
+        return frames
@@ -0,0 +1,216 @@
+"""
+A module to support fast-changing text.
+
+A :class:`GLabel` renders its text with Kivy every time the text changes, which is too
+slow for text that changes every frame, like a timer or a score.  The text here is
+drawn from the pre-rendered characters of a :class:`GlyphAtlas` instead, so changing
+it only moves the corners of a mesh.
+"""
+from kivy.graphics import *
+from kivy.graphics.instructions import *
+from .gobject import GObject
+from .atlas import GlyphAtlas
+import numpy as np
+
+
+class GText(GObject):
+    """
+    A class representing a single line of text drawn from a glyph atlas
+    
+    Each character is a rectangle showing that character from the atlas, and the whole
+    line is drawn as a single mesh.  Changing the text writes new corners into the
+    mesh, so it is cheap enough to do every frame.  The mesh only has to be rebuilt
+    when the text is longer than any text before it.
+    
+    The `width` and `height` of this object are always the size of the text.  As with
+    :class:`GLabel`, `linecolor` is the color of the text.  The attribute `halign`
+    decides which edge of the text stays in place when its width changes.
+    
+    The glyph atlas for each font and size is made once, and shared by every object
+    with that font (see :attr:`FONT_CACHE`).  Making the first one for a font takes
+    about as long as rendering a label for each character.
+    """
+    # The glyph atlases made so far, keyed by font name and size
+    FONT_CACHE = {}
+    
+    # MUTABLE PROPERTIES
+    @property
+    def text(self):
+        """
+        The text for this object.
+        
+        The text is a single line.  Characters that are not in the font (including
+        `'\\n'`) are drawn as '?'.
+        
+        **Invariant**: Must be a string"""
+        return self._text
+    
+    @text.setter
+    def text(self,value):
+        assert type(value) == str, 'value %s is not a string' % repr(value)
+        if value == self._text:
+            return
+        self._text = value
+        if self._defined:
+            if len(value) > self._capacity:
+                self._reset()
+            else:
+                self._layout()
+    
+    @property
+    def halign(self):
+        """
+        The horizontal alignment for this text.
+        
+        This is the edge of the text that stays in place when the width of the text
+        changes: 'left', 'right', or 'center'.  For example, a right-aligned score
+        grows to the left.
+        
+        **Invariant**: Must be one of 'left', 'right', or 'center'"""
+        return self._halign
+    
+    @halign.setter
+    def halign(self,value):
+        assert value in ('left','right','center'), 'value %s is not a valid horizontal alignment' % repr(value)
+        self._halign = value
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def font_name(self):
+        """
+        The file name for the .ttf file used as a font, or None for the default font.
+        
+        **Invariant**: Must be None or a string referring to a .ttf file in folder Fonts"""
+        return self._glyphs.font_name
+    
+    @property
+    def font_size(self):
+        """
+        The size of the text font in points.
+        
+        **Invariant**: Must be a positive number (int or float)"""
+        return self._glyphs.font_size
+    
+    # BUILT-IN METHODS
+    def __init__(self,**keywords):
+        """
+        Creates a new line of text.
+        
+        To use the constructor for this class, you should provide it with a list of
+        keyword arguments that initialize various attributes.  For example, to show a
+        score at the top right of the window, use the constructor call::
+        
+            GText(text='0',font_name='RetroGame.ttf',font_size=24,halign='right',right=400,top=300)
+        
+        This class supports the all same keywords as :class:`GObject`, plus `text`,
+        `font_name`, `font_size` and `halign`.  The keywords `width` and `height` are
+        ignored, as the size is always the size of the text.
+        
+        :param keywords: dictionary of keyword arguments
+        :type keywords:  keys are attribute names
+        """
+        self._defined = False
+        font_name = keywords['font_name'] if 'font_name' in keywords else None
+        font_size = keywords['font_size'] if 'font_size' in keywords else 15
+        if not (font_name, font_size) in self.FONT_CACHE:
+            self.FONT_CACHE[(font_name, font_size)] = GlyphAtlas(font_name,font_size)
+        self._glyphs = self.FONT_CACHE[(font_name, font_size)]
+        
+        self._text = ''
+        self.text = keywords['text'] if 'text' in keywords else ''
+        self.halign = keywords['halign'] if 'halign' in keywords else 'center'
+        self._capacity = 0
+        self._vertices = None
+        self._fill = None
+        
+        keywords = dict(keywords)
+        keywords['width']  = self._glyphs.measure(self._text)
+        keywords['height'] = self._glyphs.height
+        GObject.__init__(self,**keywords)
+        if not self.linecolor:
+            self.linecolor = (0,0,0,1)
+        self._reset()
+        self._defined = True
+    
+    def __str__(self):
+        """
+        :return: A readable string representation of this object.
+        :rtype:  ``str``
+        """
+        if self.name is None:
+            s = '['
+        else:
+            s = '[name=%s,' % self.name
+        return '%s,text=%s,center=(%s,%s),angle=%s]' \
+                % (s,repr(self.text),repr(self.x),repr(self.y),repr(self.angle))
+    
+    # HIDDEN METHODS
+    def _layout(self):
+        """
+        Writes the corners of the current text into the mesh.
+        
+        The object is moved so that the edge given by `halign` stays in place.
+        """
+        glyphs = self._glyphs.indices(self._text)
+        widths = self._glyphs.widths()[glyphs]
+        regions = self._glyphs.regions()[glyphs]
+        count = len(glyphs)
+        
+        width = float(widths.sum())
+        if self._halign == 'left':
+            self._trans.x += (width-self._width)/2.0
+        elif self._halign == 'right':
+            self._trans.x -= (width-self._width)/2.0
+        self._width = width
+        self._mtrue = False
+        
+        # Start on a whole pixel, so that the characters are not blurred
+        start = -(width//2)
+        right = np.cumsum(widths)+start
+        left  = right-widths
+        top = self._height/2.0
+        
+        vert = self._vertices
+        vert[:count,0,0] = left
+        vert[:count,0,1] = -top
+        vert[:count,1,0] = right
+        vert[:count,1,1] = -top
+        vert[:count,2,0] = right
+        vert[:count,2,1] = top
+        vert[:count,3,0] = left
+        vert[:count,3,1] = top
+        vert[:count,:,2:4] = regions.reshape(count,4,2)
+        vert[count:] = 0
+        self._mesh.vertices = self._flat
+        if not self._fill is None:
+            self._fill.pos  = (start,-top)
+            self._fill.size = (width,self._height)
+    
+    def _reset(self):
+        """
+        Resets the drawing cache.
+        """
+        GObject._reset(self)
+        
+        capacity = max(8,self._capacity)
+        while capacity < len(self._text):
+            capacity *= 2
+        if capacity != self._capacity:
+            self._capacity = capacity
+            self._vertices = np.zeros((capacity,4,4),dtype=np.float32)
+            self._flat = self._vertices.reshape(-1)
+        
+        quads = np.arange(0,4*capacity,4,dtype=np.uint16)[:,None]
+        indices = (quads+np.array([0,1,2,2,3,0],dtype=np.uint16)).reshape(-1)
+        self._mesh = Mesh(vertices=self._flat,indices=indices,mode='triangles',
+                          texture=self._glyphs.texture)
+        self._fill = None if self._fillcolor is None else Rectangle()
+        self._layout()
+        
+        if not self._fill is None:
+            self._cache.add(self._fillcolor)
+            self._cache.add(self._fill)
+        self._cache.add(self._linecolor)
+        self._cache.add(self._mesh)
+        
+        self._cache.add(PopMatrix())
@@ -12,6 +12,7 @@ from kivy.graphics import *
 from kivy.graphics.instructions import *
 from .grectangle import GRectangle, GObject
 from .app import GameApp
+import numpy as np
 
 
 class GTile(GObject):
@@ -23,7 +24,14 @@ class GTile(GObject):
     **explicitly** with the ``scale`` attribute).  Instead it repeats the image
     to fill in all of the remaining space.  This is ideal for terrain and other
     background features
+    
+    Tiles with the same source and size share the same mesh data, which is only
+    computed once (see :attr:`MESH_CACHE`).
     """
+    # The mesh data (vertices, indices) of recent tiles, keyed by source, size, corner and texture size
+    MESH_CACHE = {}
+    # The number of meshes to keep in MESH_CACHE
+    MESH_CACHE_SIZE = 64
     
     # MUTABLE PROPERTIES
     @property
@@ -108,8 +116,47 @@ class GTile(GObject):
         if not self._texture is None and self.height == 0:
             self.height = self._texture.height
         
-        grid_x = self._texture.width
-        grid_y = self._texture.height
+        key = (self.source, self.width, self.height, x, y, tuple(self._texture.size))
+        if key in self.MESH_CACHE:
+            (vert, indx) = self.MESH_CACHE.pop(key)
+        else:
+            (vert, indx) = self._build(x,y,self._texture.width,self._texture.height)
+        self.MESH_CACHE[key] = (vert, indx)
+        if len(self.MESH_CACHE) > self.MESH_CACHE_SIZE:
+            del self.MESH_CACHE[next(iter(self.MESH_CACHE))]
+        
+        # Kivy cannot read an empty array, so an empty tile gets an empty list
+        mesh = Mesh(vertices=vert if len(vert) else [], indices=indx,mode='triangles',
+                    texture=self._texture)
+        if not self._fillcolor is None:
+            self._cache.add(self._fillcolor)
+        else:
+            self._cache.add(Color(1,1,1))
+        self._cache.add(mesh)
+        
+        self._cache.add(PopMatrix())
+    
+    def _build(self,x,y,grid_x,grid_y):
+        """
+        Returns the mesh data (vertices, indices) for a tile with bottom left corner (x,y).
+        
+        The vertices are a flat float32 array with four vertices (x, y, u, v) for each
+        copy of the image, in column order.  The indices are a uint16 array, as that
+        is what Kivy uses for meshes.  The copies in the last row and column are
+        cut short if the tile is not a whole number of images.
+        
+        :param x: The horizontal coordinate of the bottom left corner
+        :type x:  ``int`` or ``float``
+        
+        :param y: The vertical coordinate of the bottom left corner
+        :type y:  ``int`` or ``float``
+        
+        :param grid_x: The texture width
+        :type grid_x:  ``int`` > 0
+        
+        :param grid_y: The texture height
+        :type grid_y:  ``int`` > 0
+        """
         size_x = int(self.width//grid_x)
         size_y = int(self.height//grid_y)
         rem_x = self.width-grid_x*size_x
@@ -118,25 +165,35 @@ class GTile(GObject):
         rng_x = size_x+1 if rem_x > 0 else size_x
         rng_y = size_y+1 if rem_y > 0 else size_y
         
-        vert = []
-        indx = []
-        pos = 0
-        for ii in range(rng_x):
-            for jj in range(rng_y):
-                ni = 1 if ii < size_x else rem_x/grid_x
-                nj = 1 if jj < size_y else rem_y/grid_y
-                vert.extend([x+ii*grid_x,      y+jj*grid_y,         0, 1])
-                vert.extend([x+(ii+ni)*grid_x, y+jj*grid_y,        ni, 1])
-                vert.extend([x+(ii+ni)*grid_x, y+(jj+nj)*grid_y,   ni, 1-nj])
-                vert.extend([x+ii*grid_x,      y+(jj+nj)*grid_y,    0, 1-nj])
-                indx.extend([pos,pos+1,pos+2,pos+2,pos+3,pos])
-                pos += 4
-        
-        mesh = Mesh(vertices=vert, indices=indx,mode='triangles',texture=self._texture)
-        if not self._fillcolor is None:
-            self._cache.add(self._fillcolor)
-        else:
-            self._cache.add(Color(1,1,1))
-        self._cache.add(mesh)
+        ii = np.arange(rng_x,dtype=np.float64)
+        jj = np.arange(rng_y,dtype=np.float64)
+        ni = np.where(ii < size_x,1,rem_x/grid_x)
+        nj = np.where(jj < size_y,1,rem_y/grid_y)
+        
+        vert = np.empty((rng_x,rng_y,4,4),dtype=np.float32)
+        left  = (x+ii*grid_x)[:,None]
+        right = (x+(ii+ni)*grid_x)[:,None]
+        bottom = (y+jj*grid_y)[None,:]
+        top = (y+(jj+nj)*grid_y)[None,:]
+        u = ni[:,None]
+        v = 1-nj[None,:]
+        vert[:,:,0,0] = left
+        vert[:,:,0,1] = bottom
+        vert[:,:,0,2] = 0
+        vert[:,:,0,3] = 1
+        vert[:,:,1,0] = right
+        vert[:,:,1,1] = bottom
+        vert[:,:,1,2] = u
+        vert[:,:,1,3] = 1
+        vert[:,:,2,0] = right
+        vert[:,:,2,1] = top
+        vert[:,:,2,2] = u
+        vert[:,:,2,3] = v
+        vert[:,:,3,0] = left
+        vert[:,:,3,1] = top
+        vert[:,:,3,2] = 0
+        vert[:,:,3,3] = v
         
-        self._cache.add(PopMatrix())
\ No newline at end of file
+        quads = np.arange(0,4*rng_x*rng_y,4,dtype=np.uint16)[:,None]
+        indx = (quads+np.array([0,1,2,2,3,0],dtype=np.uint16)).reshape(-1)
+        return (vert.reshape(-1), indx)
@@ -407,9 +407,22 @@ class GView(FloatLayout):
     """
     A class representing a drawing window for a :class:`GameApp` application.
 
-    This is the class that you will use to draw shapes to the screen.  Simply pass your
-    :class:`GObject` instances to the :meth:`draw` method.  You must do this every
-    animation frame, as the game is constantly clearing the window.
+    This is the class that you will use to draw shapes to the screen.  There are two
+    ways to put a :class:`GObject` on screen.
+
+    The first is to add it with its `show` method (which calls :meth:`add`).  It then
+    stays on screen (it is retained) until it is removed with its `hide` method.  An
+    object only has to be added once, and moving or changing it afterwards changes
+    it on screen.  So the view does no work at all for the object in later frames.
+
+    The second is to pass it to the :meth:`draw` method (with its `draw` method).
+    Then it is only on screen for the current animation frame, so you must do this
+    every frame.  Behind the scenes, :meth:`commit` compares the objects drawn this
+    frame with the ones drawn last frame, and only adds or removes the ones that
+    changed.  This costs a little work per object every frame, so it is best kept
+    for objects that come and go.
+
+    Objects drawn with :meth:`draw` are on top of the ones added with :meth:`add`.
 
     **You should never construct an object of this class**.  Creating a new instance
     of this class will not properly display it on the screen.  Instead, you should
@@ -428,17 +441,57 @@ class GView(FloatLayout):
         :class:`GameApp`. See the documentation of that class for more information.
         """
         FloatLayout.__init__(self)
+        self._scene = InstructionGroup()
         self._frame = InstructionGroup()
         self.bind(pos=self._reset)
         self.bind(size=self._reset)
         self._reset()
+        self._added = set()
         self._contents = set()
+        self._drawn = []
+        self._shown = []
 
 
     # PUBLIC METHODS
+    def add(self,cmd):
+        """
+        Adds the given Kivy graphics command to this view, until it is removed.
+
+        The command is drawn on top of the commands added before it, and it stays on
+        screen from one animation frame to the next.  Drawing it with :meth:`draw`
+        while it is added does nothing.
+
+        You should never call this method, since you do not understand raw Kivy graphics
+        commands.  Instead, you should use the `show` method in :class:`GObject` instead.
+
+        :param cmd: the command to add
+        :type cmd:  A Kivy graphics command
+        """
+        assert not cmd in self._added, '%s is already in the view' % repr(cmd)
+        self._added.add(cmd)
+        self._scene.add(cmd)
+
+    def remove(self,cmd):
+        """
+        Removes the given Kivy graphics command, added with :meth:`add`, from this view.
+
+        You should never call this method, since you do not understand raw Kivy graphics
+        commands.  Instead, you should use the `hide` method in :class:`GObject` instead.
+
+        :param cmd: the command to remove
+        :type cmd:  A Kivy graphics command
+        """
+        assert cmd in self._added, '%s is not in the view' % repr(cmd)
+        self._added.remove(cmd)
+        self._scene.remove(cmd)
+
     def draw(self,cmd):
         """
-        Draws the given Kivy graphics command to this view.
+        Draws the given Kivy graphics command to this view, for this frame only.
+
+        This is the same as adding the command now and removing it at the start of the
+        next frame, except that a command drawn again next frame is left in place (see
+        :meth:`commit`).
 
         You should never call this method, since you do not understand raw Kivy graphics
         commands.  Instead, you should use the `draw` method in :class:`GObject` instead.
@@ -446,20 +499,49 @@ class GView(FloatLayout):
         :param cmd: the command to draw
         :type cmd:  A Kivy graphics command
         """
-        if not cmd in self._contents:
-            self._frame.add(cmd)
+        if not cmd in self._contents and not cmd in self._added:
+            self._drawn.append(cmd)
             self._contents.add(cmd)
 
     def clear(self):
         """
-        Clears the contents of the view.
+        Clears the commands drawn with :meth:`draw`.
 
         This method is called for you automatically at the start of the animation
-        frame.  That way, you are not drawing images on top of one another.
+        frame.  That way, you are not drawing images on top of one another.  The
+        screen itself does not change until the next call to :meth:`commit`.  The
+        commands added with :meth:`add` are not cleared.
         """
-        self._frame.clear()
+        self._drawn = []
         self._contents.clear()
 
+    def commit(self):
+        """
+        Shows the commands drawn with :meth:`draw` since the last :meth:`clear`.
+
+        Only the commands that differ from the ones on screen are added or removed,
+        keeping the unchanged commands at the start and end of the list.  This method
+        is called for you automatically at the end of the animation frame.
+        """
+        old = self._shown
+        new = self._drawn
+        if new == old:
+            return
+
+        size = min(len(old),len(new))
+        start = 0
+        while start < size and old[start] is new[start]:
+            start += 1
+        end = 0
+        while end < size-start and old[-1-end] is new[-1-end]:
+            end += 1
+
+        for cmd in old[start:len(old)-end]:
+            self._frame.remove(cmd)
+        for pos in range(start,len(new)-end):
+            self._frame.insert(pos,new[pos])
+        self._shown = new
+
     # HIDDEN METHODS
     def _reset(self,obj=None,value=None):
         """
@@ -470,4 +552,5 @@ class GView(FloatLayout):
         self.canvas.add(Rectangle(pos=self.pos,size=self.size))
         # Work-around for Retina Macs
         self.canvas.add(Scale(dp(1),dp(1),dp(1)))
+        self.canvas.add(self._scene)
         self.canvas.add(self._frame)
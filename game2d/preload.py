@@ -0,0 +1,173 @@
+"""
+A background loader for images and sounds.
+
+Decoding image and sound files is the slowest part of making a new scene, and it
+normally happens the first time each file is used.  A :class:`Preloader` decodes a
+list of files on a worker thread instead, while the game keeps running.  Once it is
+done, :meth:`Preloader.finish` hands the results to :class:`GameApp`, so that making
+the scene does not touch the disk.
+
+Only the decoding happens on the worker thread.  OpenGL textures can only be made on
+the main thread, so they are made in :meth:`Preloader.finish`, which is cheap.
+"""
+import threading
+import traceback
+import time
+import sys
+
+from kivy.logger import Logger
+
+
+class Preloader(object):
+    """
+    A class that loads images and sounds on a background thread.
+    
+    The files start loading as soon as the preloader is made.  A file that cannot be
+    loaded is logged and skipped; it will be loaded (and fail) the usual way when it
+    is used.  Files that are already in the texture or sound cache are not loaded again.
+    
+    The preloader is meant to be used once.  Make it when the next scene is known
+    (say, when the title screen is shown) and call :meth:`finish` when the scene is
+    made.
+    """
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def done(self):
+        """
+        Whether the worker thread has finished decoding.
+        
+        **Invariant**: Must be a boolean.
+        """
+        return not self._thread.is_alive()
+    
+    @property
+    def images(self):
+        """
+        The image files to load.
+        
+        **Invariant**: Must be a tuple of strings.
+        """
+        return self._images
+    
+    @property
+    def sounds(self):
+        """
+        The sound files to load.
+        
+        **Invariant**: Must be a tuple of strings.
+        """
+        return self._sounds
+    
+    @property
+    def elapsed(self):
+        """
+        The time in seconds the worker thread spent decoding, or None if not done.
+        
+        **Invariant**: Must be a float >= 0 or None.
+        """
+        return self._elapsed
+    
+    def __init__(self,images=(),sounds=()):
+        """
+        Creates a preloader and starts loading the given files.
+        
+        :param images: The files in the **Images** folder to load
+        :type images:  iterable of ``str``
+        
+        :param sounds: The files in the **Sounds** folder to load
+        :type sounds:  iterable of ``str``
+        """
+        from .app import GameApp
+        self._images = tuple(images)
+        self._sounds = tuple(sounds)
+        self._decoded = {}
+        self._loaded = {}
+        self._elapsed = None
+        self._finished = False
+        
+        todo = [name for name in self._images if not name in GameApp.TEXTURE_CACHE]
+        self._thread = threading.Thread(target=self._run,args=(todo,),daemon=True)
+        self._thread.start()
+    
+    def finish(self,wait=True):
+        """
+        Returns: True if the loaded files were handed to :class:`GameApp`
+        
+        This makes a texture for each decoded image and puts it in the texture cache
+        (:attr:`GameApp.TEXTURE_CACHE`).  It also preloads each decoded sound in the
+        sound cache (:attr:`GameApp.SOUND_CACHE`), so that every :class:`Sound` for
+        that file shares it.  This must be called from the main thread, and only does
+        anything the first time it is called.
+        
+        If ``wait`` is True, this method waits for the worker thread to finish.
+        Otherwise, it returns False right away if the worker is still running.
+        
+        :param wait: Whether to wait for the worker thread
+        :type wait:  ``bool``
+        """
+        if self._finished:
+            return False
+        if wait:
+            self._thread.join()
+        elif not self.done:
+            return False
+        
+        from .app import GameApp
+        for name in self._images:
+            if name in self._decoded and not name in GameApp.TEXTURE_CACHE:
+                GameApp.TEXTURE_CACHE[name] = self._decoded[name].texture
+        for name in self._sounds:
+            if name in self._loaded:
+                GameApp.SOUND_CACHE[name] = self._loaded[name]
+            elif name in GameApp.SOUND_CACHE:
+                GameApp.SOUND_CACHE[name] = name
+        self._decoded = {}
+        self._loaded = {}
+        self._finished = True
+        return True
+    
+    # HIDDEN METHODS
+    def _run(self,todo):
+        """
+        Decodes the given images and the sounds (the worker thread).
+        
+        :param todo: The image files to decode
+        :type todo:  ``list`` of ``str``
+        """
+        from .app import GameApp
+        from kivy.core.image import ImageLoader
+        import os.path
+        
+        start = time.perf_counter()
+        for name in todo:
+            try:
+                self._decoded[name] = ImageLoader.load(os.path.join(GameApp.images,name))
+            except:
+                self._log('Image',name)
+        for name in self._sounds:
+            if name in GameApp.SOUND_CACHE:
+                continue
+            try:
+                sound = GameApp.SOUND_CACHE.load(name)
+                if sound is None:
+                    raise IOError('Module game2d cannot read the file %s' % repr(name))
+                self._loaded[name] = sound
+            except:
+                self._log('Sound',name)
+        self._elapsed = time.perf_counter()-start
+    
+    def _log(self,kind,name):
+        """
+        Logs the error for a file that could not be loaded.
+        
+        :param kind: The kind of file ('Image' or 'Sound')
+        :type kind:  ``str``
+        
+        :param name: The file name
+        :type name:  ``str``
+        """
+        Logger.info('Preloader: %s %s could not be loaded.' % (kind,repr(name)))
+        exc_type, exc_value, exc_tb = sys.exc_info()
+        items = traceback.format_exception(exc_type, exc_value, exc_tb)
+        Logger.info(items[-1].strip())
@@ -7,7 +7,11 @@ Author: Walker M. White (wmw2)
 Date:   August 1, 2017 (Python 3 version)
 """
 from kivy.core.audio import SoundLoader
-from .app import GameApp
+import threading
+import queue
+import time
+import math
+import wave
 
 
 class Sound(object):
@@ -19,9 +23,12 @@ class Sound(object):
     platforms. In order for Kivy to find a WAV or MP3 file, you should put it in the
     **Sounds** directory.  Sounds in that folder can be referenced directly by name.
     
-    When a sound is played, it cannot be played again until it finishes, or is stopped.  
-    This means that if you want multiple, simultaneous sound effects from the same WAV 
-    file.you will need to create multiple Sound objects.
+    Sound objects for the same file share one loaded sound (see :class:`SoundCache`),
+    so making a new Sound for a file that is already loaded does not read the file.
+    It also means that a WAV file cannot play over itself.  While it is playing, it is
+    not started again, even from a different Sound object for the same file.
+    
+    Each Sound has its own volume, which is applied whenever that Sound is played.
     """
     # This class is a simply replacement for the built-in Kivy Sound class.  It is a
     # little better with error handling, since GStreamer appears to be quite unreliable.
@@ -32,17 +39,19 @@ class Sound(object):
         """
         The current sound volume.
         
-        1 means full volume, 0 means mute.  The default value is 1.
+        1 means full volume, 0 means mute.  The default value is 1.  The volume belongs
+        to this Sound, and not the other Sounds for the same file.  A change takes effect
+        the next time this Sound is played.
         
         **Invariant**: Must float in the range 0..1.
         """
-        return self._sound.volume
+        return self._volume
     
     @volume.setter
     def volume(self,value):
         assert type(value) in [int, float] and value >= 0 and value <= 1, \
             'value %s is not a valid volume' % repr(value)
-        self._sound.volume = value
+        self._volume = value
     
     # IMMUTABLE PROPERTIES
     @property
@@ -61,6 +70,9 @@ class Sound(object):
         """
         Whether or not the sound is currently playing.
         
+        As sounds are played on a worker thread, this is not True until a moment after
+        a call to :meth:`play`.
+        
         **Immutable**: This value cannot be changed.  You should use the :meth:`play` 
         and :meth:`stop` methods to alter its value.
         
@@ -78,30 +90,41 @@ class Sound(object):
         from .app import GameApp
         assert GameApp.is_sound(source), 'source %s is not a sound file' % repr(source)
         self._source = source
-        self._sound  = SoundLoader.load(source)
-        self._sound.load()
+        self._volume = 1.0
+        self._sound  = GameApp.load_sound(source)
         if self._sound is None:
             raise IOError('Module game2d cannot read the file %s' % repr(source))
+        self._cache = GameApp.SOUND_CACHE
+        self._dispatcher = GameApp.AUDIO_DISPATCHER
+    
+    def __del__(self):
+        """
+        Releases the loaded sound shared with the other Sounds for the same file.
+        """
+        cache = getattr(self,'_cache',None)
+        if not cache is None:
+            cache.release(self._source)
     
     def play(self,loop=False):
         """
         Plays this sound.
         
-        The sound will play until completion, or interrupted by the user.
+        The sound will play until completion, or interrupted by the user.  The sound
+        is played by the audio dispatcher (see :class:`AudioDispatcher`), so it starts
+        a moment later, and it is skipped if it is still playing.
         
         :param loop: Whether or not to loop the sound
         :type loop:  ``bool``
         """
-        self._sound.loop = loop
-        self._sound.play()
-
+        self._dispatcher.play(self._sound,self._volume,loop)
+    
     def stop(self):
         """
         Stops this sound.
         
         This will stop the sound immediately, even if it is looping.
         """
-        self._sound.stop()
+        self._dispatcher.stop(self._sound)
 
 
 # #mark -
@@ -180,3 +203,414 @@ class SoundLibrary(object):
         :rtype:  ``iterable``
         """
         return self._data.keys()
+
+
+# #mark -
+class SoundCache(SoundLibrary):
+    """
+    A sound library of loaded sounds, shared by every :class:`Sound` object.
+    
+    The keys of this library are sound file names, and the values are the loaded Kivy
+    sounds.  Loading a sound reads and decodes the whole file, so each file is loaded
+    once and shared by every Sound for that file.
+    
+    Loaded sounds are counted.  Each Sound holds one reference to its file (see
+    :meth:`acquire` and :meth:`release`), and a file is unloaded when its last
+    reference is released.  Assigning to the library preloads a file, and the library
+    holds its own reference to it until the key is deleted.  So preloaded sounds stay
+    loaded no matter how often Sound objects for them are made and thrown away::
+        
+        cache['croak.wav'] = 'croak.wav'
+    """
+    
+    def __init__(self):
+        """
+        Creates a new, empty sound cache.
+        """
+        super().__init__()
+        self._refs = {}
+        self._kept = set()
+        self._hits = 0
+        self._misses = 0
+        self._loads = 0
+        self._loadtime = 0.0
+    
+    def __setitem__(self, key, sound):
+        """
+        Preloads the sound file key, keeping it loaded until the key is deleted.
+        
+        :param key: The sound file name
+        :type key:  ``str``
+        
+        :param sound: The same file name, or the sound for it if already loaded
+        :type sound:  ``str`` or a loaded Kivy ``Sound``
+        """
+        if not key in self._data:
+            if type(sound) == str:
+                assert sound == key, '%s is not the file %s' % (repr(sound),repr(key))
+                sound = self.load(key)
+                if sound is None:
+                    raise IOError('Module game2d cannot read the file %s' % repr(key))
+            self._data[key] = sound
+        self._kept.add(key)
+    
+    def __delitem__(self, key):
+        """
+        Stops keeping the sound file key loaded.
+        
+        The sound is unloaded once no Sound objects are using it.
+        
+        :param key: The sound file name
+        :type key:  ``str``
+        """
+        self._kept.remove(key)
+        self._drop(key)
+    
+    def acquire(self, name):
+        """
+        Returns the loaded sound for the file name, adding a reference to it.
+        
+        The file is loaded if it is not in the cache already.  The result is None if
+        the file cannot be loaded.  Every call should be matched by a call to
+        :meth:`release`.
+        
+        :param name: The sound file name
+        :type name:  ``str``
+        
+        :return: The loaded sound for the file
+        :rtype:  a Kivy ``Sound`` or ``None``
+        """
+        if name in self._data:
+            self._hits += 1
+        else:
+            self._misses += 1
+            sound = self.load(name)
+            if sound is None:
+                return None
+            self._data[name] = sound
+        self._refs[name] = self._refs.get(name,0)+1
+        return self._data[name]
+    
+    def release(self, name):
+        """
+        Removes a reference added by :meth:`acquire`.
+        
+        The file is unloaded if this was the last reference and it is not preloaded.
+        
+        :param name: The sound file name
+        :type name:  ``str``
+        """
+        assert name in self._refs, '%s is not in use' % repr(name)
+        self._refs[name] -= 1
+        if self._refs[name] == 0:
+            del self._refs[name]
+            self._drop(name)
+    
+    def stats(self):
+        """
+        Returns a dictionary of statistics about this cache.
+        
+        The keys are 'sounds' (the number of loaded sounds), 'references' (the number
+        of Sound objects using them), 'hits' and 'misses' (from :meth:`acquire`),
+        'loads' (the number of files read) and 'loadtime' (the seconds spent reading
+        them).
+        
+        :return: The statistics for this cache
+        :rtype:  ``dict``
+        """
+        return {'sounds': len(self._data), 'references': sum(self._refs.values()),
+                'hits': self._hits, 'misses': self._misses, 'loads': self._loads,
+                'loadtime': self._loadtime}
+    
+    def load(self, name):
+        """
+        Returns the sound for the file name loaded from disk, or None on failure.
+        
+        This does not add the sound to the cache, but it is counted in the :meth:`stats`.
+        It is safe to call from a worker thread (see :class:`Preloader`).
+        
+        :param name: The sound file name
+        :type name:  ``str``
+        """
+        start = time.perf_counter()
+        sound = SoundLoader.load(name)
+        if not sound is None:
+            sound.load()
+        self._loads += 1
+        self._loadtime += time.perf_counter()-start
+        return sound
+    
+    def _drop(self, name):
+        """
+        Unloads the sound for the file name if nothing is using it.
+        
+        :param name: The sound file name
+        :type name:  ``str``
+        """
+        if name in self._data and not name in self._refs and not name in self._kept:
+            self._data.pop(name).unload()
+
+
+# #mark -
+class AudioDispatcher(object):
+    """
+    A class that plays and stops sounds on a worker thread.
+    
+    Starting a sound can take a while in the audio backend, and game code often asks
+    for the same sound every animation frame.  So :class:`Sound` objects do not play
+    themselves.  They push a request onto the queue of this dispatcher, which is all
+    the work done by the game.  A worker thread then works through the queue.
+    
+    The dispatcher throws away requests that would not be heard:
+    
+    * A request to play a sound that was already requested this frame is dropped.
+    * A sound that is still playing is not started again.  A sound counts as playing
+      for its length, or for :attr:`cooldown` ticks if that is longer.
+    * A new sound is not started while :attr:`voices` sounds are playing.
+    
+    Time is measured in game ticks, not on the clock, so the same game always makes
+    the same sounds.  :class:`GameApp` calls :meth:`next_tick` once per simulation
+    step, and :meth:`next_frame` once per animation frame, which may cover several
+    steps.  The worker thread starts with the first request.
+    """
+    
+    # MUTABLE PROPERTIES
+    @property
+    def cooldown(self):
+        """
+        The least number of ticks before the same sound can be started again.
+        
+        Sounds longer than this are not started again until they finish.
+        
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._cooldown
+    
+    @cooldown.setter
+    def cooldown(self,value):
+        assert type(value) == int and value >= 0, 'value %s is not a valid cooldown' % repr(value)
+        self._cooldown = value
+    
+    @property
+    def voices(self):
+        """
+        The maximum number of sounds that can play at the same time.
+        
+        **Invariant**: Must be an int > 0.
+        """
+        return self._voices
+    
+    @voices.setter
+    def voices(self,value):
+        assert type(value) == int and value > 0, 'value %s is not a valid voice count' % repr(value)
+        self._voices = value
+    
+    # IMMUTABLE PROPERTIES
+    @property
+    def ticks(self):
+        """
+        The number of game ticks so far.
+        
+        **Immutable**: This value is advanced by :meth:`next_tick`.
+        
+        **Invariant**: Must be an int >= 0.
+        """
+        return self._ticks
+    
+    def __init__(self,cooldown=6,voices=8):
+        """
+        Creates a new audio dispatcher.
+        
+        :param cooldown: The least number of ticks before the same sound can be started again
+        :type cooldown:  ``int`` >= 0
+        
+        :param voices: The maximum number of sounds that can play at the same time
+        :type voices:  ``int`` > 0
+        """
+        self.cooldown = cooldown
+        self.voices = voices
+        self._queue = queue.SimpleQueue()
+        self._requested = set()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._ticks = 0
+        self._step = 0.0
+        self._until = {}
+        self._lengths = {}
+        self._playing = []
+        self._counts = {'requests': 0, 'duplicates': 0, 'busy': 0, 'limited': 0,
+                        'played': 0, 'stopped': 0}
+    
+    def play(self,sound,volume=1.0,loop=False):
+        """
+        Asks for the given sound to be played.
+        
+        :param sound: The sound to play
+        :type sound:  a loaded Kivy ``Sound``
+        
+        :param volume: The volume to play the sound at
+        :type volume:  ``float`` in 0..1
+        
+        :param loop: Whether or not to loop the sound
+        :type loop:  ``bool``
+        """
+        self._counts['requests'] += 1
+        key = id(sound)
+        if key in self._requested:
+            self._counts['duplicates'] += 1
+            return
+        self._requested.add(key)
+        if self._ticks < self._until.get(key,0):
+            self._counts['busy'] += 1
+            return
+        self._until[key] = self._ticks+self._duration(sound,loop)
+        self._push(('play',sound,volume,loop))
+    
+    def stop(self,sound):
+        """
+        Asks for the given sound to be stopped.
+        
+        :param sound: The sound to stop
+        :type sound:  a loaded Kivy ``Sound``
+        """
+        self._requested.discard(id(sound))
+        self._until.pop(id(sound),None)
+        self._push(('stop',sound,None,None))
+    
+    def next_tick(self,dt):
+        """
+        Starts the next game tick, so the sounds requested now are timed from it.
+        
+        :param dt: The length of a tick in seconds
+        :type dt:  ``int`` or ``float`` > 0
+        """
+        self._ticks += 1
+        self._step = dt
+    
+    def next_frame(self):
+        """
+        Starts a new animation frame, so sounds can be requested again.
+        """
+        self._requested.clear()
+    
+    def wait(self):
+        """
+        Waits until the worker thread has handled every request so far.
+        """
+        if not self._thread is None:
+            done = threading.Event()
+            self._queue.put(('wait',done,None,None))
+            done.wait()
+    
+    def stats(self):
+        """
+        Returns a dictionary of statistics about this dispatcher.
+        
+        The keys are 'requests' (the calls to :meth:`play`), 'duplicates' (requests
+        dropped as already requested this frame), 'busy' (requests dropped as the sound
+        is still playing), 'limited' (requests dropped by the voice limit), 'played'
+        (sounds started) and 'stopped' (sounds stopped).
+        
+        :return: The statistics for this dispatcher
+        :rtype:  ``dict``
+        """
+        with self._lock:
+            return dict(self._counts)
+    
+    # HIDDEN METHODS
+    def _duration(self,sound,loop):
+        """
+        Returns the number of ticks that the given sound counts as playing.
+        
+        This is the length of the sound rounded up to whole ticks, but at least the
+        :attr:`cooldown`.  A looping sound plays until it is stopped.
+        
+        :param sound: The sound to play
+        :type sound:  a loaded Kivy ``Sound``
+        
+        :param loop: Whether or not the sound loops
+        :type loop:  ``bool``
+        """
+        if loop:
+            return float('inf')
+        key = id(sound)
+        if not key in self._lengths:
+            self._lengths[key] = self._length(sound)
+        if not self._step:
+            return self._cooldown
+        return max(self._cooldown,math.ceil(self._lengths[key]/self._step))
+    
+    def _length(self,sound):
+        """
+        Returns the length of the given sound in seconds, or 0 if it is not known.
+        
+        The audio backend does not know the length without an audio device, so the
+        length of a WAV file is read from its header instead.
+        
+        :param sound: The sound to measure
+        :type sound:  a loaded Kivy ``Sound``
+        """
+        try:
+            if sound.length > 0:
+                return sound.length
+            with wave.open(sound.source) as file:
+                return file.getnframes()/file.getframerate()
+        except:
+            return 0
+    
+    def _push(self,command):
+        """
+        Adds a command to the queue, starting the worker thread if needed.
+        
+        :param command: The command
+        :type command:  a tuple (action, target, volume, loop)
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run,daemon=True)
+            self._thread.start()
+        self._queue.put(command)
+    
+    def _run(self):
+        """
+        Handles the commands in the queue, forever (the worker thread).
+        """
+        while True:
+            (action, target, volume, loop) = self._queue.get()
+            try:
+                if action == 'play':
+                    self._play(target,volume,loop)
+                elif action == 'stop':
+                    target.stop()
+                    with self._lock:
+                        self._counts['stopped'] += 1
+                else:
+                    target.set()    # A 'wait' command, and target is the event
+            except:
+                pass    # A bad sound must not stop the worker
+    
+    def _play(self,sound,volume,loop):
+        """
+        Starts the given sound unless there are no free voices.
+        
+        :param sound: The sound to play
+        :type sound:  a loaded Kivy ``Sound``
+        
+        :param volume: The volume to play the sound at
+        :type volume:  ``float`` in 0..1
+        
+        :param loop: Whether or not to loop the sound
+        :type loop:  ``bool``
+        """
+        self._playing = [other for other in self._playing if other.state == 'play']
+        if len(self._playing) >= self._voices and not sound in self._playing:
+            with self._lock:
+                self._counts['limited'] += 1
+            return
+        
+        sound.volume = volume
+        sound.loop = loop
+        sound.play()
+        if not sound in self._playing:
+            self._playing.append(sound)
+        with self._lock:
+            self._counts['played'] += 1
@@ -0,0 +1,45 @@
+"""
+Graphics module for Froggit
+
+This module connects the game rules to game2d.  The level, its lanes and its frog
+(level.py, lanes.py and models.py) never import game2d.  They make every tile, image,
+sprite, label and sound with a toolkit, a class whose attributes are the classes to
+make (see Level).  Graphics is the toolkit of the real game, and it makes game2d
+objects that can be drawn.  The toolkit that makes pure-data stand-ins instead is in
+standins.py.
+"""
+from game2d import *
+from models import *
+
+
+class GraphicsFrog(Frog, GSprite):
+    """
+    The frog of the real game: the rules in Frog, drawn as a GSprite.
+    """
+    pass
+
+
+class Graphics(object):
+    """
+    The toolkit that makes game2d objects.
+
+    This is the default toolkit of a level (see Level).  A level made with it can be
+    drawn in a GView, with the still parts of the lanes pre-rendered in a GLayer and
+    the moving obstacles batched with a TextureAtlas.
+    """
+    # The classes for the lane tiles, the obstacles and the lives
+    Tile = GTile
+    Image = GImage
+
+    # The class for the death sprite, and the one for the lives title
+    Sprite = GSprite
+    Label = GLabel
+
+    # The classes for the sounds and for the frog
+    Sound = Sound
+    Frog = GraphicsFrog
+
+    # The classes to pre-render the background and to batch the obstacles
+    Layer = GLayer
+    Atlas = TextureAtlas
+    Batch = GBatch
@@ -0,0 +1,250 @@
+"""
+Headless simulation module for Froggit
+
+This module plays the Froggit game rules without a window.  HeadlessLevel is the Level
+class in level.py, made with the pure-data stand-ins in standins.py instead of game2d
+objects (see Level), so it follows exactly the same rules.  That means that this module
+never imports Kivy (or game2d), and so it can run on a machine with no display at all.
+
+The only things that are stubbed out are the view (which is just a width and height),
+the input (which is a scripted key dictionary), and the sounds (which count plays but
+do not make any noise).  This lets us load-test levels, fuzz them and benchmark the
+game rules at thousands of ticks per second.
+
+You can run this module on its own to fuzz a level with random input:
+
+    python headless.py complete.json
+"""
+from consts import *
+from compiler import *
+from level import *
+from standins import *
+
+import os.path
+import json
+import random
+import sys
+import time
+
+
+def load_json(name):
+    """
+    Returns the JSON for the given file name, or None if it cannot be loaded
+
+    This is the headless version of GameApp.load_json.  The name must refer to a
+    file in the JSON folder.
+
+    Parameter name: The file name
+    Precondition: name is a string
+    """
+    path = os.path.join(HEADLESS_PATH, 'JSON', name)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            return json.loads(f.read())
+    except ValueError:
+        return None
+
+
+class HeadlessLevel(Level):
+    """
+    A level that is played with no window.
+
+    This is a Level made with the StandIns toolkit, so every lane, obstacle and frog
+    is plain data instead of a Kivy graphics object.  It has the same initializer
+    and the same update method as Level, so it can be driven in exactly the same
+    way, but it cannot be drawn.
+    """
+
+    def __init__(self, json_dict, hitboxjson):
+        """
+        Initializes the level from the json.
+
+        The parameters are the same as for Level in level.py.
+
+        Parameter json_dict: The loaded json file for the level.
+        Precondition: json_dict is a nested dictionary
+
+        Parameter hitboxjson: The loaded 'objects.json' json file
+        Precondition: hitboxjson is a loaded json file.
+        """
+        super().__init__(json_dict, hitboxjson, StandIns)
+
+
+class HeadlessGame(object):
+    """
+    A window-free replacement for the Froggit application.
+
+    This class runs the same state machine as Froggit (active, paused, continue
+    and complete), but has no title screen and starts the level right away.  If
+    autocontinue is True, a new frog is made as soon as the old one is finished,
+    without waiting for the 'c' key.
+    """
+    # Attribute input: The scripted input
+    # Invariant: input is a HeadlessInput
+
+    # Attribute view: The stub view, sized to the level
+    # Invariant: view is a HeadlessView
+
+    # Attribute _level: The level being played
+    # Invariant: _level is a HeadlessLevel (or a Level)
+
+    # Attribute _hitbox: The contents of the loaded 'objects.json' file
+    # Invariant: _hitbox is a nested dictionary
+
+    # Attribute _state: The current state of the game (taken from consts.py)
+    # Invariant: _state is one of STATE_ACTIVE, STATE_PAUSED, STATE_CONTINUE,
+    #            or STATE_COMPLETE
+
+    # Attribute _last: Whether 's' or 'c' was held down last frame (Froggit
+    # uses the same attribute for both keys)
+    # Invariant: _last is a bool
+
+    # Attribute _autocontinue: Whether to continue without waiting for 'c'
+    # Invariant: _autocontinue is a bool
+
+    # Attribute _ticks: The number of updates so far
+    # Invariant: _ticks is an int >= 0
+
+    def getLevel(self):
+        """
+        Returns the level being played.
+        """
+        return self._level
+
+    def getState(self):
+        """
+        Returns the current game state.
+        """
+        return self._state
+
+    def getTicks(self):
+        """
+        Returns the number of updates so far.
+        """
+        return self._ticks
+
+    def isComplete(self):
+        """
+        Returns True if the game is won or lost.
+        """
+        return self._state == STATE_COMPLETE
+
+    def __init__(self, json_dict, hitboxjson, input=None, autocontinue=True,
+                 levelclass=HeadlessLevel):
+        """
+        Initializes a game for the given level.
+
+        The level is a HeadlessLevel, unless levelclass is Level.  The real level
+        needs Kivy (and the image folder of a Froggit app), but not a window; it is
+        played with the same stub view and scripted input.  The level is compiled
+        first if it is not already, so a ValueError is raised if it is not a valid
+        level (see compile_level).
+
+        Parameter json_dict: The loaded json file for the level.
+        Precondition: json_dict is any value (normally a nested dictionary)
+
+        Parameter hitboxjson: The loaded 'objects.json' json file
+        Precondition: hitboxjson is a loaded json file.
+
+        Parameter input: The scripted input (a new one if None)
+        Precondition: input is a HeadlessInput or None
+
+        Parameter autocontinue: Whether to continue without waiting for 'c'
+        Precondition: autocontinue is a bool
+
+        Parameter levelclass: The class of the level
+        Precondition: levelclass is HeadlessLevel or Level
+        """
+        if not is_compiled(json_dict):
+            json_dict = compile_level(json_dict, hitboxjson)
+        self.input = HeadlessInput() if input is None else input
+        size = json_dict['size']
+        self.view = HeadlessView(size[0]*GRID_SIZE, (size[1]+1)*GRID_SIZE)
+        self._level = levelclass(json_dict, hitboxjson)
+        self._hitbox = hitboxjson
+        self._state = STATE_ACTIVE
+        # Froggit starts the level on the frame that 's' is pressed
+        self._last = not autocontinue and self.input.is_key_down('s')
+        self._autocontinue = autocontinue
+        self._ticks = 0
+
+    def update(self, dt):
+        """
+        Updates the game one animation frame (see Froggit.update).
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        if self._state == STATE_PAUSED and not self._level.noLivesLeft():
+            curr_keys = self._autocontinue or self.input.is_key_down('c')
+            if curr_keys and not self._last:
+                self._level.makeFrog(self._hitbox)
+                self._state = STATE_CONTINUE
+            self._last = curr_keys and not self._autocontinue
+
+        if self._state == STATE_CONTINUE:
+            self._level.setFinished(False)
+            self._state = STATE_ACTIVE
+
+        if self._state == STATE_ACTIVE:
+            self._level.update(self.input, dt, self.view)
+        if self._state != STATE_PAUSED:
+            if self._level.getFinished():
+                if self._level.noLivesLeft():
+                    self._state = STATE_COMPLETE
+                else:
+                    self._state = STATE_PAUSED
+            if self._level.getWin():
+                self._state = STATE_COMPLETE
+        self.input.refresh()
+        self._ticks += 1
+
+
+def fuzz(json_dict, hitboxjson, ticks, dt=1/60, seed=0):
+    """
+    Returns (game, seconds) after playing a level with random input.
+
+    Every FROG_SPEED seconds of game time, the fuzzer holds down a new random
+    direction key (or no key at all).  The game continues automatically after
+    every death until it is complete or ticks updates have run.
+
+    Parameter json_dict: The loaded json file for the level.
+    Precondition: json_dict is a nested dictionary
+
+    Parameter hitboxjson: The loaded 'objects.json' json file
+    Precondition: hitboxjson is a loaded json file.
+
+    Parameter ticks: The maximum number of updates
+    Precondition: ticks is an int >= 0
+
+    Parameter dt: The time step of each update
+    Precondition: dt is a float > 0
+
+    Parameter seed: The random seed
+    Precondition: seed is an int
+    """
+    rand = random.Random(seed)
+    game = HeadlessGame(json_dict, hitboxjson)
+    choices = ((),('up',),('up',),('down',),('left',),('right',))
+    hold = max(1,round(FROG_SPEED/dt))
+    start = time.perf_counter()
+    while game.getTicks() < ticks and not game.isComplete():
+        if game.getTicks() % hold == 0:
+            game.input.setKeys(rand.choice(choices))
+        game.update(dt)
+    return (game, time.perf_counter()-start)
+
+
+# Application code
+if __name__ == '__main__':
+    try:
+        (json_dict, hitboxjson) = load_level(DEFAULT_LEVEL)
+    except ValueError as e:
+        sys.exit('%s: %s' % (DEFAULT_LEVEL, e))
+    (game, secs) = fuzz(json_dict, hitboxjson, 100000)
+    level = game.getLevel()
+    print('%s: %d ticks in %.3f seconds (%.0f ticks/sec), %d lives left, win=%s' %
+        (DEFAULT_LEVEL, game.getTicks(), secs, game.getTicks()/secs,
+         level.getLives(), level.getWin()))
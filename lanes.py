@@ -26,14 +26,14 @@ extra classes and are now sure where they would go, ask on Piazza and we will an
 Alice Ke alk248
 21.12.2020
 """
-from game2d import *
 from consts import *
 from models import *
+from tracks import *
 
 
 # PRIMARY RULE: Lanes are not allowed to access anything in any level.py or app.py.
-# They can only access models.py and const.py. If you need extra information from the
-# level object (or the app), then it should be a parameter in your method.
+# They can only access models.py, tracks.py and const.py. If you need extra information
+# from the level object (or the app), then it should be a parameter in your method.
 
 class Lane(object):         # You are permitted to change the parent class if you wish
     """
@@ -73,7 +73,8 @@ class Lane(object):         # You are permitted to change the parent class if yo
     # Invariant: _lanes_list is a nested list with dictionaries inside.
 
     # Attribute _exitsOnly: The list of exits (lilypads) for the level. This
-    #stores the objects type and position from the json.
+    #stores the objects type and position from the json, and is shared by
+    #every lane of the level.
     # Invariant: _exitsOnly is a list containing dictionaries that contain
     #strings.
 
@@ -86,6 +87,24 @@ class Lane(object):         # You are permitted to change the parent class if yo
     # Attribute _tile: The tile for the lane.
     # Invariant: _tile is an instance of GTile
 
+    # Attribute _toolkit: The toolkit that makes the tiles and the obstacles
+    # Invariant: _toolkit is a toolkit class (see Level)
+
+    # Attribute _track: The positions and hitboxes of the obstacles in _objs
+    # Invariant: _track is an ObstacleTrack with one obstacle for each item in _objs
+
+    # Attribute _layer: The pre-rendered layer holding the parts of the lane
+    #that never move (the tiles, the obstacles of a still lane, and safe frogs)
+    # Invariant: _layer is a GLayer, or None if the lane draws everything itself
+
+    # Attribute _batch: The moving obstacles, drawn as a single mesh
+    # Invariant: _batch is a GBatch with one image for each item in _objs, or None
+    #if the obstacles are drawn one by one
+
+    # Attribute _shown: Whether the lane stays in the view from frame to frame
+    #(see show)
+    # Invariant: _shown is a bool
+
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def getObstacle(self):
         """
@@ -93,20 +112,69 @@ class Lane(object):         # You are permitted to change the parent class if yo
         """
         return self._image
 
+    def getTime(self):
+        """
+        Returns the lane time in seconds (how long the obstacles have moved).
+        """
+        return self._track.getTime()
+
+    def setTime(self, value):
+        """
+        Sets the lane time in seconds, moving the obstacles to match.
+
+        The time can be set to any value (including an earlier one), and the
+        obstacles go straight to where they would be at that time.
+
+        Parameter value: The new lane time
+        Precondition: value is an int or float
+        """
+        self._track.setTime(value)
+
     def getexitsOnly(self):
         """
         Returns the list of all exits (lilypads) for the level.
         """
         return self._exitsOnly
 
+    def getSafeFrogs(self):
+        """
+        Returns the list of (x, y) positions of the safe frogs in this lane.
+        """
+        return [(safe.x, safe.y) for safe in self._safeFrogs]
+
+    def getSafeCount(self):
+        """
+        Returns the number of safe frogs in this lane.
+        """
+        return len(self._safeFrogs)
+
+    def setSafeCount(self, value):
+        """
+        Removes the newest safe frogs, so that there are only value of them.
+
+        This undoes safe frogs that were placed after a snapshot (see
+        Level.rewind).  If the safe frogs are drawn in the lane layer, the
+        layer is baked again the next time it is drawn.
+
+        Parameter value: The number of safe frogs to keep
+        Precondition: value is an int, 0 <= value <= getSafeCount()
+        """
+        while len(self._safeFrogs) > value:
+            safe = self._safeFrogs.pop()
+            if not self._layer is None:
+                self._layer.remove(safe)
+
     # INITIALIZER TO SET LANE POSITION, BACKGROUND,AND OBJECTS
-    def __init__(self, json_dict, lane, hitboxjson):
+    def __init__(self, json_dict, lane, hitboxjson, toolkit):
         """
         Initializes the lane position, background and objects (e.g obstacles).
 
-        Parameter json_dict: json_dict is the loaded json file for the level.
-        Precondition: json_dict is a nested dictionary that is taken from the
-        json loaded for the level.
+        The level must already be compiled (see compiler.py), so that the exits
+        and the obstacle hitboxes have already been looked up.  The tiles and the
+        obstacles are made with the toolkit of the level (see Level).
+
+        Parameter json_dict: json_dict is the compiled json for the level.
+        Precondition: json_dict is a nested dictionary made by compile_level.
 
         Parameter lane: lane is the position of the lane.
         Precondition: lane is an int.
@@ -114,8 +182,12 @@ class Lane(object):         # You are permitted to change the parent class if yo
         Parameter hitboxjson: hitboxjson is the loaded json file for the
         images and sprites which contain hitbox values.
         Precondition: hitboxjson is a loaded json file.
+
+        Parameter toolkit: The toolkit that makes the tiles and the obstacles
+        Precondition: toolkit is a toolkit class (see Level)
         """
         lanes_list = json_dict['lanes']
+        self._toolkit = toolkit
         self._initEmpty(json_dict)
         self._setTile(lanes_list, lane)
         self._tiles.append(self._tile)
@@ -131,8 +203,8 @@ class Lane(object):         # You are permitted to change the parent class if yo
                     self._speed=0
                 if self._speed<0:
                     self.getObstacle().angle = 180
-        self._initExitsOnly(lanes_list)
-        self._initHitboxImage(hitboxjson)
+        self._exitsOnly = json_dict['exits']
+        self._initTrack(json_dict)
 
     # ADDITIONAL METHODS (DRAWING, COLLISIONS, MOVEMENT, ETC)
     def update(self, dt, json):
@@ -144,26 +216,18 @@ class Lane(object):         # You are permitted to change the parent class if yo
         implemented. The obstacles in each lane will move depending on the speed
         set for the lane.
 
+        Only the lane time is moved forward here.  The obstacle positions are
+        worked out from the time when they are needed (see tracks.py), and the
+        obstacle images are moved to match when the lane is drawn.
+
         Parameter dt: The time since the last animation frame.
         Precondition: dt is a float.
 
-        Parameter json: The full loaded json for the level.
+        Parameter json: The full loaded json for the level (the offscreen buffer
+        is read from it when the lane is made)
         Precondition: json is a nested dictionary for the level.
         """
-        buffer = json['offscreen']
-        buffer_width = self._width + buffer * GRID_SIZE
-
-        pixel_size = self._speed * dt
-
-        for obstacle in self._objs:
-            if self._speed !=0:
-                obstacle.x = (obstacle.x+pixel_size)
-            if obstacle.x>buffer_width:
-                d = obstacle.x - buffer_width
-                obstacle.x = -buffer * GRID_SIZE + d
-            if obstacle.x<(-buffer*GRID_SIZE):
-                d = -buffer*GRID_SIZE - obstacle.x
-                obstacle.x = buffer_width - d
+        self._track.update(dt)
 
     def draw(self, view):
         """
@@ -171,17 +235,117 @@ class Lane(object):         # You are permitted to change the parent class if yo
 
         Draws the lane tiles and the obstacles that are in each lane to the view
         window. When a safe frog is created and added to the list self._safeFrogs,
-        the blue frogs will also be drawn if there are any.
+        the blue frogs will also be drawn if there are any.  Obstacles that are
+        offscreen are neither moved nor drawn.  If the lane has been added to a
+        layer (see addStatic), only the moving obstacles are drawn here.  If the
+        lane has a batch (see useAtlas), the obstacles are moved and drawn all at
+        once, and the GImage obstacles are no longer moved.  If the lane was added
+        to the view (see show), the obstacles are only moved, and nothing is drawn
+        but the safe frogs of a lane that is not in a layer.
+
+        Parameter view: The game view, used in drawing
+        Precondition: view is an instance of GView and is inherited from GameApp
+        """
+        baked = not self._layer is None
+        if self._shown:
+            self._moveAll()
+        else:
+            if not baked:
+                for tile in self._tiles:
+                    tile.draw(view)
+            if not self._batch is None:
+                self._batch.setPositions(self._track.getPositions())
+                self._batch.draw(view)
+            elif not baked or self._speed != 0:
+                for index in self._track.visible():
+                    obj = self._objs[index]
+                    if self._speed != 0:
+                        obj.x = self._track.getX(index)
+                    obj.draw(view)
+        if not baked:
+            for safe in self._safeFrogs:
+                safe.draw(view)
+
+    def fork(self):
+        """
+        Returns a copy of this lane that can be played on its own.
+
+        The copy shares the tiles, the obstacles and the batch of this lane, as
+        they never change.  It has its own track (see ObstacleTrack.fork) and
+        its own list of safe frogs, so a safe frog placed in the copy is not in
+        this lane.  The copy is not in a layer (see addStatic) or in the view
+        (see show), so if it is drawn, it draws its tiles and still obstacles
+        itself.
+        """
+        # Copying the attributes directly is several times faster than copy.copy
+        lane = type(self).__new__(type(self))
+        lane.__dict__.update(self.__dict__)
+        lane._track = self._track.fork()
+        lane._safeFrogs = list(self._safeFrogs)
+        lane._layer = None
+        lane._shown = False
+        return lane
+
+    def show(self, view):
+        """
+        Adds the lane to the view, where it stays from frame to frame.
+
+        These are the tiles and the obstacles, unless they are in a layer (see
+        addStatic).  After this, draw only moves the obstacles.  As obstacles that
+        are offscreen stay in the view, they are moved as well, so that none is
+        left behind on screen.
 
         Parameter view: The game view, used in drawing
         Precondition: view is an instance of GView and is inherited from GameApp
         """
+        baked = not self._layer is None
+        if not baked:
+            for tile in self._tiles:
+                tile.show(view)
+        if not self._batch is None:
+            self._batch.show(view)
+        elif not baked or self._speed != 0:
+            for obj in self._objs:
+                obj.show(view)
+        self._shown = True
+
+    def addStatic(self, layer):
+        """
+        Adds the parts of the lane that never move to the given layer.
+
+        These are the tiles, the obstacles if the lane does not move, and the
+        safe frogs (including any added later).  The lane stops drawing these
+        parts itself, as the layer draws them.
+
+        Parameter layer: The layer for the still parts of the level
+        Precondition: layer is a GLayer with the same coordinates as the view
+        """
+        self._layer = layer
         for tile in self._tiles:
-            tile.draw(view)
-        for obj in self._objs:
-            obj.draw(view)
+            layer.add(tile)
+        if self._speed == 0:
+            for obj in self._objs:
+                layer.add(obj)
         for safe in self._safeFrogs:
-            safe.draw(view)
+            layer.add(safe)
+
+    def useAtlas(self, atlas):
+        """
+        Draws the moving obstacles of this lane as a single batch.
+
+        Each obstacle image becomes one image of a GBatch, so the lane costs one
+        draw call however many obstacles it has.  Still lanes are left alone, as
+        their obstacles are drawn by the layer (see addStatic).
+
+        Parameter atlas: The atlas holding the obstacle images
+        Precondition: atlas is a TextureAtlas with every obstacle image
+        """
+        if self._speed == 0:
+            return
+        self._batch = self._toolkit.Batch(atlas)
+        for obj in self._objs:
+            self._batch.add(obj.source, obj.x, obj.y, obj.width, obj.height,
+                obj.angle)
 
     def collides(self, frog):
         """
@@ -209,6 +373,18 @@ class Lane(object):         # You are permitted to change the parent class if yo
         """
         return self._tile.contains((frog.x, frog.y))
 
+    def _moveAll(self):
+        """
+        Moves every obstacle of a lane in the view (see show) to where it is now.
+        """
+        if self._speed == 0:
+            return
+        if not self._batch is None:
+            self._batch.setPositions(self._track.getPositions())
+        else:
+            for index in range(len(self._objs)):
+                self._objs[index].x = self._track.getX(index)
+
     def _setTile(self, lanes_list, lane):
         """
         Creates a lane Gtile for the intiializer.
@@ -223,7 +399,7 @@ class Lane(object):         # You are permitted to change the parent class if yo
         Parameter lane: The lane position from the bottom lane.
         Precondition: lane is an int
         """
-        self._tile = GTile(left = 0, bottom = 0, width=self._width,height=\
+        self._tile = self._toolkit.Tile(left = 0, bottom = 0, width=self._width,height=\
         GRID_SIZE, source = lanes_list[lane]['type'] + '.png')
         self._tile.bottom += GRID_SIZE * lane
 
@@ -246,39 +422,29 @@ class Lane(object):         # You are permitted to change the parent class if yo
         Precondition: lane is an int.
         """
         image_source = lanes_list[lane]['objects'][o]['type']
-        self._image = GImage(source = image_source+'.png')
+        self._image = self._toolkit.Image(source = image_source+'.png')
         self._image.y = self._tile.bottom+GRID_SIZE/2
         self._image.x = objs_list[o]['position']*GRID_SIZE + GRID_SIZE/2
+        self._image.hitbox = objs_list[o]['hitbox']
 
-    def _initExitsOnly(self, lanes_list):
+    def _initTrack(self, json_dict):
         """
-        Initializes the a list of all lilypads (exits only).
+        Initializes the obstacle track from the obstacles in the lane.
 
-        Parameter lanes_list: The lane list from the full json loaded for the
-        level.
-        Precondition: lanes_list is a nested list with dictionaries inside.
-        """
-        for l in lanes_list:
-            if l['type'] == 'hedge':
-                for obstacle in l['objects']:
-                    obstacletype = obstacle['type']
-                    if obstacletype == 'exit':
-                        self._exitsOnly.append(obstacle)
+        The track keeps the obstacles in order from left to right, so that the
+        collision checks only have to look at the obstacles near the frog.  This
+        must be called after the obstacles are made.
 
-    def _initHitboxImage(self, hitboxjson):
-        """
-        Initializes assignment of hitbox values to all the obstacles
-        e.g cars, logs etc.
-
-        Parameter hitboxjson: hitboxjson is the loaded json file for the
-        images and sprites which contain hitbox values.
-        Precondition: hitboxjson is a loaded json file from 'objects.json'.
+        Parameter json_dict: json_dict is the compiled json for the level.
+        Precondition: json_dict is a nested dictionary made by compile_level.
         """
-        images_hitboxDict = hitboxjson['images']
-        for val in images_hitboxDict:
-            for obstacle in self._objs:
-                    if obstacle.source == val + '.png':
-                        obstacle.hitbox = images_hitboxDict[val]['hitbox']
+        xs = [obstacle.x for obstacle in self._objs]
+        ys = [obstacle.y for obstacle in self._objs]
+        widths = [obstacle.width for obstacle in self._objs]
+        extents = [hitbox_extent(obstacle.width, obstacle.height, obstacle.angle,
+            obstacle.hitbox) for obstacle in self._objs]
+        self._track = ObstacleTrack(xs, ys, widths, extents, self._speed,
+            self._width, json_dict['offscreen'])
 
     def _initEmpty(self, json_dict):
         """
@@ -300,6 +466,10 @@ class Lane(object):         # You are permitted to change the parent class if yo
         self._safeFrogs = []
         self._exitsOnly = []
         self._distance = 0
+        self._speed = 0
+        self._layer = None
+        self._batch = None
+        self._shown = False
 
 
 class Grass(Lane):                           # We recommend AGAINST changing this one
@@ -336,10 +506,9 @@ class Road(Lane):                           # We recommend AGAINST changing this
         Precondition: frog is an instance of the Frog class
         """
         FrogCollision = False
-        for obstacle in self._objs:
-                if not (frog is None) and obstacle.contains((frog.x, frog.y)):
-                    FrogCollision = True
-                    frog.setAnimator(None)
+        if not (frog is None) and self._track.containing((frog.x, frog.y)):
+            FrogCollision = True
+            frog.setAnimator(None)
         return FrogCollision
 
 
@@ -374,9 +543,8 @@ class Water(Lane):
         Parameter dt: The time since the last animation frame.
         Precondition: dt is a float.
         """
-        for obstacle in self._objs:
-            if obstacle.contains((frog.x, frog.y)):
-                frog.x += lane._speed * dt
+        for index in self._track.containing((frog.x, frog.y)):
+            frog.x += lane._speed * dt
 
     def checkWaterCollision(self, frog):
         """
@@ -388,9 +556,8 @@ class Water(Lane):
         Precondition: frog is an instance of the Frog class
         """
         FrogCollision = True
-        for obstacle in self._objs:
-                if  not (frog is None) and obstacle.contains((frog.x, frog.y)):
-                    FrogCollision = False
+        if not (frog is None) and self._track.containing((frog.x, frog.y)):
+            FrogCollision = False
         return FrogCollision
 
 
@@ -419,15 +586,14 @@ class Hedge(Lane):
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
 
     # INITIALIZER TO SET ADDITIONAL EXIT INFORMATION
-    def __init__(self, json_dict, lane, hitboxjson):
+    def __init__(self, json_dict, lane, hitboxjson, toolkit):
         """
         Intializer for the Hedge subclass.
 
         This method initializes the Hedge subclass.
 
-        Parameter json_dict: json_dict is the loaded json file for the level.
-        Precondition: json_dict is a nested dictionary that is taken from the
-        json loaded for the level.
+        Parameter json_dict: json_dict is the compiled json for the level.
+        Precondition: json_dict is a nested dictionary made by compile_level.
 
         Parameter lane: lane is the position of the lane.
         Precondition: lane is an int.
@@ -435,8 +601,11 @@ class Hedge(Lane):
         Parameter hitboxjson: hitboxjson is the loaded json file for the
         images and sprites which contain hitbox values.
         Precondition: hitboxjson is a loaded json file.
+
+        Parameter toolkit: The toolkit that makes the tiles and the obstacles
+        Precondition: toolkit is a toolkit class (see Level)
         """
-        super().__init__(json_dict, lane, hitboxjson)
+        super().__init__(json_dict, lane, hitboxjson, toolkit)
 
     # ANY ADDITIONAL METHODS
     def checkHedgeExit(self, frog):
@@ -484,12 +653,15 @@ class Hedge(Lane):
         Precondition: frog is an instance of the Frog class
         """
         FrogEnter = False
-        for obstacle in self._objs:
-            if obstacle.contains((frog.x, frog.y)) and not obstacle.source == \
-            'open.png' :
+        for index in self._track.containing((frog.x, frog.y)):
+            obstacle = self._objs[index]
+            if not obstacle.source == 'open.png':
                 FrogEnter= True
-                self._safeFrogs.append(GImage(source= FROG_SAFE, angle = \
-                FROG_SOUTH, x = obstacle.x, y = obstacle.y))
+                safe = self._toolkit.Image(source= FROG_SAFE, angle = FROG_SOUTH, \
+                x = self._track.getX(index), y = self._track.getY(index))
+                self._safeFrogs.append(safe)
+                if not self._layer is None:
+                    self._layer.add(safe)
         if FrogEnter:
             frog.getJumpSound().volume = 0.0
         return FrogEnter
@@ -15,12 +15,14 @@ it should either go in the lanes.py module or the models.py module.
 Alice Ke alk248
 21.12.2020
 """
-from game2d import *
 from consts import *
 from lanes  import *
 from models import *
+from compiler import *
+from snapshots import *
 
 import time
+import copy
 
 # PRIMARY RULE: Level can only access attributes in models.py or lanes.py using getters
 # and setters. Level is NOT allowed to access anything in app.py (Subcontrollers are not
@@ -51,6 +53,13 @@ class Level(object):
     resize to match.  That resizing is done in the Froggit app, and so it needs to access
     these values in the level.  The height value should include one extra grid square
     to suppose the number of lives meter.
+
+    The level never makes a game2d object itself.  The level, its lanes and its frog
+    make every tile, image, sprite, label and sound with a toolkit, a class whose
+    attributes are the classes to make.  The default toolkit is Graphics (in
+    graphics.py), which makes game2d objects.  StandIns (in standins.py) makes
+    pure-data stand-ins instead, so that the same rules can be played with no window
+    (see headless.py).  A level made with StandIns cannot be drawn.
     """
     pass
     # LIST ALL HIDDEN ATTRIBUTES HERE
@@ -92,6 +101,43 @@ class Level(object):
     #Attribute _lives: _lives stores the frog heads which are 'lives'
     # Invariant: _lives is None or a list of GImage objects
 
+    #Attribute _toolkit: The toolkit that makes the objects of the level
+    # Invariant: _toolkit is a toolkit class, such as Graphics or StandIns
+
+    #Attribute _movingLanes: The lanes with moving obstacles (roads and water)
+    # Invariant: _movingLanes is a list of the Road and Water objects in _lanes
+
+    #Attribute _background: The pre-rendered tiles, hedge exits and safe frogs
+    # Invariant: _background is a GLayer the size of the lanes, or None if the
+    #toolkit has no layers or the level is a fork
+
+    #Attribute _atlas: The obstacle images of the level, packed into one texture
+    # Invariant: _atlas is a TextureAtlas, or None if the images do not fit
+
+    #Attribute _hash: The rolling hash of the state of every frame so far
+    # Invariant: _hash is an int >= 0 (see getStateHash)
+
+    #Attribute _heads: Every life in the lives counter, including lost ones
+    # Invariant: _heads is a tuple of GImage objects; _lives is a suffix of it
+
+    #Attribute _deathTime: How long the death animation has been running
+    # Invariant: _deathTime is a float >= 0
+
+    #Attribute _ticks: The number of frames this level has been updated
+    # Invariant: _ticks is an int >= 0
+
+    #Attribute _snapshots: The snapshots taken of this level
+    # Invariant: _snapshots is a SnapshotRing, or None if no snapshots are taken
+
+    #Attribute _every: The number of frames between snapshots
+    # Invariant: _every is an int > 0
+
+    #Attribute _spareFrog: The frog object, which is reset for every life
+    # Invariant: _spareFrog is a Frog (None only while the level is made)
+
+    #Attribute _initial: The snapshot numbers of the level when it was made
+    # Invariant: _initial is a tuple of numbers (see _getSnapshot)
+
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def getFrogX(self):
         """
@@ -141,6 +187,12 @@ class Level(object):
         """
         return self._deathAnimator
 
+    def getDeathPosition(self):
+        """
+        Returns the [x, y] position where the frog last died.
+        """
+        return self._deathPosition
+
     def getFinished(self):
         """
         Returns the value (True or False) stored as self._finished.
@@ -156,6 +208,85 @@ class Level(object):
         """
         self._finished = val
 
+    def getLives(self):
+        """
+        Returns the number of lives left.
+        """
+        return len(self._lives)
+
+    def getStateFields(self):
+        """
+        Returns the simulation state of this level as a list of (name, values)
+        pairs.
+
+        This is everything that changes as the level is played: the frog (its
+        position, angle and animation frame), the lives, the safe frogs, the
+        death animation and the time of each moving lane.  The obstacle
+        positions are worked out from the lane time (see tracks.py), so the
+        time stands for all of them.  The values of a field are a tuple of
+        numbers.
+        """
+        frog = self._frog
+        if frog is None:
+            frogstate = ()
+        else:
+            frogstate = (frog.x, frog.y, frog.angle % 360, frog.frame)
+        safe = [c for lane in self._lanes for pos in lane.getSafeFrogs() for c in pos]
+        death = (self._deathPosition[0], self._deathPosition[1],
+            self._deathSprite.frame, not self._deathAnimator is None)
+        times = tuple([lane.getTime() for lane in self._movingLanes])
+        return [('frog', frogstate), ('lives', (len(self._lives),)),
+            ('finished', (self._finished, self._win)),
+            ('safe', tuple([self._numsafeFrogs]+safe)), ('death', death),
+            ('lanes', times)]
+
+    def getTicks(self):
+        """
+        Returns the number of frames this level has been updated.
+        """
+        return self._ticks
+
+    def getSnapshots(self):
+        """
+        Returns the snapshot buffer of this level, or None if it takes no
+        snapshots (see setSnapshots).
+        """
+        return self._snapshots
+
+    def setSnapshots(self, capacity, every=1):
+        """
+        Starts taking a snapshot of this level every few frames.
+
+        The snapshots are kept in a ring buffer (see snapshots.py) that holds
+        the newest capacity snapshots.  The first one is taken right away.  A
+        snapshot is a row of numbers and a reference to the frog, so taking
+        one makes no new objects, and rewind restores one in place.
+
+        Parameter capacity: The most snapshots to keep (0 to take none)
+        Precondition: capacity is an int >= 0
+
+        Parameter every: The number of frames between snapshots
+        Precondition: every is an int > 0
+        """
+        assert type(every) == int and every > 0, '%s is not a valid interval' % repr(every)
+        self._every = every
+        if capacity == 0:
+            self._snapshots = None
+        else:
+            width = SNAPSHOT_HEADER+len(self._movingLanes)+len(self._lanes)
+            self._snapshots = SnapshotRing(capacity, width)
+            self.takeSnapshot()
+
+    def getStateHash(self):
+        """
+        Returns the rolling hash of the state of this level.
+
+        The hash is updated every frame, from the state fields of that frame and
+        the hash of the frame before (see desync.py).  So two levels have the
+        same hash only if they have been the same on every frame so far.
+        """
+        return self._hash
+
     def getWin(self):
         """
         Returns the value of self._win
@@ -163,10 +294,15 @@ class Level(object):
         return self._win
 
     # INITIALIZER (standard form) TO CREATE THE FROG AND LANES
-    def __init__(self, json_dict, hitboxjson):
+    def __init__(self, json_dict, hitboxjson, toolkit=None):
         """
         Initializes the background of the game at the start.
 
+        If json_dict is not already compiled (see compiler.py), it is compiled
+        here, which raises a ValueError if the level is not valid.  If there is
+        no toolkit, the level is made with Graphics, which is only imported here,
+        so that a level made with stand-ins never imports Kivy.
+
         Parameter json_dict: json_dict is the loaded json file for the level.
         Precondition: json_dict is a nested dictionary that is taken from the
         json loaded for the level.
@@ -174,7 +310,16 @@ class Level(object):
         Parameter hitboxjson: hitboxjson is the loaded json file for the
         images and sprites which contain hitbox values.
         Precondition: hitboxjson is a loaded json file.
+
+        Parameter toolkit: The toolkit that makes the objects of the level
+        Precondition: toolkit is a toolkit class, or None for Graphics
         """
+        if not is_compiled(json_dict):
+            json_dict = compile_level(json_dict, hitboxjson)
+        if toolkit is None:
+            from graphics import Graphics
+            toolkit = Graphics
+        self._toolkit = toolkit
         self._lanes = []
         lanes_list = json_dict['lanes']
         self._jsonLanes = lanes_list
@@ -182,17 +327,27 @@ class Level(object):
         width = json_dict['size'][0]*GRID_SIZE
         height = (json_dict['size'][1]+1)*GRID_SIZE
         self._initLanes(lanes_list,json_dict, hitboxjson)
+        self._initBackground(width)
+        self._initBatches(json_dict)
         frog_pos = json_dict['start']
         self._frogpos = frog_pos
         self._livesCounter(w=width,h=height)
+        self._heads = tuple(self._lives)
         self._cooldown = FROG_SPEED
         self._finished = False
         self._numsafeFrogs = 0
+        self._spareFrog = None
         self.makeFrog(hitboxjson)
         self._makeDeathSprite(hitboxjson)
         self._deathAnimator = None
         self._deathPosition = [-1000, 0]
+        self._deathTime = 0
         self._win = False
+        self._hash = state_hash(self.getStateFields())
+        self._ticks = 0
+        self._snapshots = None
+        self._every = 1
+        self._initial = tuple(self._getSnapshot())
 
     # UPDATE METHOD TO MOVE THE FROG AND UPDATE ALL OF THE LANES
     def update(self, input, dt, view):
@@ -203,6 +358,9 @@ class Level(object):
         the frog has collided with an obstacle. It also checks if the frog
         starys within the bounds of the view window.
 
+        After every frame, the state hash is updated (see getStateHash), and a
+        snapshot is taken if it is time for one (see setSnapshots).
+
         Parameter input: The user input, used to control the frog and change
         state
         Precondition: input is an instance of GInput and is inherited from
@@ -214,50 +372,26 @@ class Level(object):
         Parameter view: The game view, used in drawing
         Precondition: view is an instance of GView and is inherited from GameApp
         """
-        self._updateDeath(input, dt, view)
-        if self._frog is not None:
-            self._frogTurn(input)
-
-            if 0>self._frog.y-GRID_SIZE and input.is_key_down('down'):
-                return
-            elif self._frog.y>(view.height-GRID_SIZE) and input.is_key_down('up'):
-                return
-            elif 0>self._frog.x-GRID_SIZE and input.is_key_down('left'):
-                return
-            elif self._frog.x>view.width-GRID_SIZE and input.is_key_down('right'):
-                return
-
-            self._moveFrog(input, dt, view)
-
-            for lane in self.getLanesList():
-                position = 0
-                position +=1
-                if isinstance(lane, Water) or isinstance(lane, Road):
-                    lane.update(dt, self._fulljson)
-
-            for lane in self.getLanesList():
-                if lane.collides(self._frog):
-                    if isinstance(lane, Hedge):
-                        self._hedgeChecks(lane, input, dt, view)
-                    else:
-                        self._moveFrogBack(input, dt, view)
-                        self._frog.update(input, dt, view)
-
-                    if isinstance(lane, Road):
-                        self._roadChecks(lane)
-
-                    if isinstance(lane, Water):
-                        self._waterChecks(lane, view, dt)
-                    break;
+        self._updateFrame(input, dt, view)
+        self._hash = state_hash(self.getStateFields(), self._hash)
+        self._ticks += 1
+        if not self._snapshots is None and self._ticks % self._every == 0:
+            self.takeSnapshot()
 
     # DRAW METHOD TO DRAW THE FROG AND THE INDIVIDUAL LANES
     def draw(self, view):
         """
         Draws the game objects (lanes and frog) to the view.
 
+        If the level was added to the view (see show), drawing the background,
+        the lanes and the title only moves the obstacles and bakes the
+        background again if a safe frog was added.
+
         Parameter view: The game view, used in drawing
         Precondition: view is an instance of GView and is inherited from GameApp
         """
+        if not self._background is None:
+            self._background.draw(view)
         for lane in self._lanes:
             lane.draw(view)
         if not self._frog is None:
@@ -267,6 +401,23 @@ class Level(object):
         self._title.draw(view)
         self._deathSprite.draw(view)
 
+    def show(self, view):
+        """
+        Adds the parts of the level that stay on screen to the view.
+
+        These are the background, the lanes and the lives title.  They then stay
+        in the view from frame to frame (see GView.add), and draw only has to
+        move the obstacles and draw the frog, the lives and the death sprite.
+
+        Parameter view: The game view, used in drawing
+        Precondition: view is an instance of GView and is inherited from GameApp
+        """
+        if not self._background is None:
+            self._background.show(view)
+        for lane in self._lanes:
+            lane.show(view)
+        self._title.show(view)
+
     # ANY NECESSARY HELPERS (SHOULD BE HIDDEN)
     def noLivesLeft(self):
         """
@@ -275,6 +426,82 @@ class Level(object):
         """
         return self._lives == []
 
+    def takeSnapshot(self):
+        """
+        Takes a snapshot of this level now (such as at a checkpoint).
+
+        The snapshot holds everything that changes as the level is played (see
+        getStateFields), as well as the state hash, the progress of the frog
+        slide and the death animation, and the volume of the frog jump sound.  The buffer must have been made with
+        setSnapshots.
+        """
+        self._snapshots.push(self._ticks, self._frog)[:] = self._getSnapshot()
+
+    def rewind(self, age=0):
+        """
+        Restores the snapshot of the given age in place, and returns its tick.
+
+        Age 0 is the newest snapshot.  Every snapshot newer than the one restored
+        is removed, as it is now in the future.  Nothing is rebuilt: the frog
+        is the frog object of the snapshot, the lanes are moved back to their
+        time, and safe frogs (and lives) made since the snapshot are removed.
+
+        Parameter age: The age of the snapshot
+        Precondition: age is an int in 0..len(getSnapshots())-1
+        """
+        (tick, row, frog) = self._snapshots.get(age)
+        self._snapshots.truncate(age)
+        self._setSnapshot(tick, row.tolist(), frog)
+        return tick
+
+    def reset(self):
+        """
+        Restarts this level in place, as if it had just been made.
+
+        The lanes, lives, safe frogs and death animation are restored from the
+        numbers saved when the level was made, and the frog is put back at the
+        start (see Frog.reset).  Nothing is made or loaded again, so this is
+        much faster than making a new level from the json.  If snapshots are
+        being taken, the old ones are removed, and the first one is taken again.
+        """
+        self._setSnapshot(0, self._initial, self._spareFrog)
+        self._spareFrog.reset(self._frogpos[0], self._frogpos[1])
+        if not self._snapshots is None:
+            self._snapshots.clear()
+            self.takeSnapshot()
+
+    def fork(self):
+        """
+        Returns a copy of this level that can be played on its own.
+
+        A fork lets a bot or a solver try out moves without changing this level.
+        It shares everything that never changes as the level is played: the
+        json, the obstacles and their tracks, the tiles, the textures and the
+        lives counter.  It only has its own lane times, safe frogs, lives, frog
+        and death animation (see Lane.fork and Frog.fork), so it is much cheaper
+        than making a new level.  The fork starts with the tick and state hash of
+        this level, but takes no snapshots until setSnapshots is called.
+
+        A fork can be drawn, but it has no background layer, and its lanes draw
+        their own tiles (see Lane.fork), so it is slower to draw than this level.
+        """
+        level = copy.copy(self)
+        level._background = None
+        level._lanes = [lane.fork() for lane in self._lanes]
+        level._movingLanes = [lane for lane in level._lanes if \
+            isinstance(lane, Water) or isinstance(lane, Road)]
+        level._deathSprite = self._toolkit.Sprite(x=self._deathSprite.x,
+            y=self._deathSprite.y, format=self._deathSprite.format,
+            source=self._deathSprite.source)
+        level._lives = list(self._lives)
+        level._deathPosition = list(self._deathPosition)
+        level._spareFrog = self._spareFrog.fork()
+        level._snapshots = None
+        level._every = 1
+        frog = None if self._frog is None else level._spareFrog
+        level._setSnapshot(self._ticks, self._getSnapshot(), frog)
+        return level
+
     def makeFrog(self,hitboxjson):
         """
         Creates a new frog object and sets the position to the inital start
@@ -282,21 +509,28 @@ class Level(object):
 
         This method will create an instance of the Frog class and set its
         position to the start position of the frog when the game initially
-        began.
+        began.  Only the first frog is made this way.  After that, every new
+        life resets the same frog (see Frog.reset), so a respawn does not make
+        a sprite or load its sounds again.
 
         Parameter hitboxjson: hitboxjson is the loaded json file for the
         images and sprites which contain hitbox values.
         Precondition: hitboxjson is a loaded json file.
         """
+        if not self._spareFrog is None:
+            self._spareFrog.reset(self._frogpos[0], self._frogpos[1])
+            self._frog = self._spareFrog
+            return
         sprites_hitboxDict = hitboxjson['sprites']
         for val in sprites_hitboxDict:
             if val == 'frog':
                 format = sprites_hitboxDict[val]['format']
                 source = sprites_hitboxDict[val]["file"]
                 hitboxes = sprites_hitboxDict[val]["hitboxes"]
-        self._frog = Frog(x=self._frogpos[0], y=self._frogpos[1], format = \
-        format,source = source,hitboxes=tuple(hitboxes), hitboxjson = \
-        hitboxjson)
+        self._frog = self._toolkit.Frog(x=self._frogpos[0], y=self._frogpos[1],
+        format = format,source = source,hitboxes=tuple(hitboxes), hitboxjson = \
+        hitboxjson, toolkit=self._toolkit)
+        self._spareFrog = self._frog
 
     def _hedgeChecks(self, lane, input, dt, view):
         """
@@ -437,14 +671,83 @@ class Level(object):
         for lane in range(len(lanes_list)):
             lane_type = lanes_list[lane]['type']
             if lane_type == "grass":
-                lane_val = Grass(json_dict,lane, hitboxjson)
+                lane_val = Grass(json_dict,lane, hitboxjson, self._toolkit)
             elif lane_type == "road":
-                lane_val = Road(json_dict,lane, hitboxjson)
+                lane_val = Road(json_dict,lane, hitboxjson, self._toolkit)
             elif lane_type== "water":
-                lane_val = Water(json_dict,lane, hitboxjson)
+                lane_val = Water(json_dict,lane, hitboxjson, self._toolkit)
             elif lane_type=="hedge":
-                lane_val = Hedge(json_dict,lane, hitboxjson)
+                lane_val = Hedge(json_dict,lane, hitboxjson, self._toolkit)
             self._lanes.append(lane_val)
+        self._movingLanes = [lane for lane in self._lanes if \
+            isinstance(lane, Water) or isinstance(lane, Road)]
+
+    def _initBackground(self, width):
+        """
+        Creates the layer for the parts of the lanes that never move.
+
+        The lane tiles, the hedge exits and the safe frogs are drawn once into
+        this layer (see GLayer), instead of one by one every frame.  The layer
+        is only drawn again when a safe frog is added.  If the toolkit has no
+        layers, there is no background.
+
+        Parameter width: The width of the level
+        Precondition: width is an int > 0
+        """
+        if self._toolkit.Layer is None:
+            self._background = None
+            return
+        self._background = self._toolkit.Layer(left=0, bottom=0, width=width, \
+            height=len(self._lanes)*GRID_SIZE)
+        for lane in self._lanes:
+            lane.addStatic(self._background)
+
+    def _initBatches(self, json_dict):
+        """
+        Packs the obstacle images into an atlas and batches the moving lanes.
+
+        Each moving lane then draws all of its obstacles with one mesh (see
+        GBatch), instead of one GImage per obstacle.  If the images do not fit in
+        an atlas (or the toolkit has no atlases), the lanes draw their obstacles
+        one by one as before.
+
+        Parameter json_dict: json_dict is the compiled json for the level.
+        Precondition: json_dict is a nested dictionary made by compile_level.
+        """
+        names = set()
+        for lane in json_dict['lanes']:
+            if lane['type'] in ('road', 'water'):
+                for obj in lane.get('objects', []):
+                    names.add(obj['type']+'.png')
+        self._atlas = None
+        if names and not self._toolkit.Atlas is None:
+            try:
+                self._atlas = self._toolkit.Atlas(sorted(names))
+            except ValueError:
+                return
+            for lane in self._movingLanes:
+                lane.useAtlas(self._atlas)
+
+    def _laneAt(self, frog):
+        """
+        Returns the lowest lane that collides with the frog, or None if there is none.
+
+        This is the lane that the frog is checked against (see Lane.collides).
+        Lanes are GRID_SIZE tall and stacked from the bottom of the window, so
+        _lanes is indexed by row.  The box of the frog is less than two lanes
+        tall, so it can only touch the lane of the row of its center and the
+        lanes just below and above it.  Checking those three lanes from the
+        bottom finds the same lane as checking every lane in the level.  A frog
+        that touches no lane (such as one in the lives row) is in no lane.
+
+        Parameter frog: The frog to look up
+        Precondition: frog is an instance of the Frog class
+        """
+        row = int(frog.y // GRID_SIZE)
+        for lane in self._lanes[max(row-1, 0):max(row+2, 0)]:
+            if lane.collides(frog):
+                return lane
+        return None
 
     def _offscreen(self, viewX):
         """
@@ -463,6 +766,126 @@ class Level(object):
             self._frog = None
             self._frogDeathCountdown()
 
+    def _getSnapshot(self):
+        """
+        Returns the list of numbers in a snapshot of this level (see takeSnapshot).
+        """
+        frog = self._frog
+        values = [self._hash, self._finished, self._win, self._numsafeFrogs,
+            len(self._lives), self._deathPosition[0], self._deathPosition[1],
+            self._deathSprite.x, self._deathSprite.y, self._deathSprite.frame,
+            not self._deathAnimator is None, self._deathTime]
+        if frog is None:
+            values.extend((0, 0, 0, 0, -1, 0, 0, 1.0))
+        else:
+            slide = frog.getSlide()
+            values.extend((frog.x, frog.y, frog.angle, frog.frame))
+            if slide is None:
+                values.extend((-1, 0, 0))
+            else:
+                values.extend((FROG_DIRECTIONS.index(slide[0]), slide[1], slide[2]))
+            values.append(frog.getJumpSound().volume)
+        values.extend([lane.getTime() for lane in self._movingLanes])
+        values.extend([lane.getSafeCount() for lane in self._lanes])
+        return values
+
+    def _setSnapshot(self, tick, values, frog):
+        """
+        Restores this level in place from the numbers of a snapshot.
+
+        Parameter tick: The tick of the snapshot
+        Precondition: tick is an int >= 0
+
+        Parameter values: The numbers of the snapshot (see _getSnapshot)
+        Precondition: values is a list of numbers
+
+        Parameter frog: The frog of the snapshot
+        Precondition: frog is a Frog or None
+        """
+        self._ticks = tick
+        self._hash = int(values[0])
+        self._finished = bool(values[1])
+        self._win = bool(values[2])
+        self._numsafeFrogs = int(values[3])
+        self._lives[:] = self._heads[len(self._heads)-int(values[4]):]
+        self._deathPosition[0] = values[5]
+        self._deathPosition[1] = values[6]
+        self._deathSprite.x = values[7]
+        self._deathSprite.y = values[8]
+        self._deathSprite.frame = int(values[9])
+        if values[10]:
+            self._deathAnimator = self._deathAnimation(0)
+            next(self._deathAnimator)
+        else:
+            self._deathAnimator = None
+        self._deathTime = values[11]
+
+        self._frog = frog
+        if not frog is None:
+            frog.x = values[12]
+            frog.y = values[13]
+            frog.angle = values[14]
+            frog.frame = int(values[15])
+            if values[16] < 0:
+                frog.setSlide(None)
+            else:
+                frog.setSlide((FROG_DIRECTIONS[int(values[16])], values[17], values[18]))
+            frog.getJumpSound().volume = values[19]
+
+        pos = SNAPSHOT_HEADER
+        for lane in self._movingLanes:
+            lane.setTime(values[pos])
+            pos += 1
+        for lane in self._lanes:
+            lane.setSafeCount(int(values[pos]))
+            pos += 1
+
+    def _updateFrame(self, input, dt, view):
+        """
+        Moves the frog and updates all the lanes (see update).
+
+        Parameter input: The user input, used to control the frog and change
+        state
+        Precondition: input is an instance of GInput and is inherited from
+        GameApp
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a float.
+
+        Parameter view: The game view, used in drawing
+        Precondition: view is an instance of GView and is inherited from GameApp
+        """
+        self._updateDeath(input, dt, view)
+        if self._frog is not None:
+            self._frogTurn(input)
+
+            if 0>self._frog.y-GRID_SIZE and input.is_key_down('down'):
+                return
+            elif self._frog.y>(view.height-GRID_SIZE) and input.is_key_down('up'):
+                return
+            elif 0>self._frog.x-GRID_SIZE and input.is_key_down('left'):
+                return
+            elif self._frog.x>view.width-GRID_SIZE and input.is_key_down('right'):
+                return
+
+            self._moveFrog(input, dt, view)
+
+            for lane in self._movingLanes:
+                lane.update(dt, self._fulljson)
+
+            lane = self._laneAt(self._frog)
+            if isinstance(lane, Hedge):
+                self._hedgeChecks(lane, input, dt, view)
+            elif not lane is None:
+                self._moveFrogBack(input, dt, view)
+                self._frog.update(input, dt, view)
+
+            if isinstance(lane, Road):
+                self._roadChecks(lane)
+
+            if isinstance(lane, Water):
+                self._waterChecks(lane, view, dt)
+
     def _updateDeath(self, input, dt, view):
         """
         Controls the death sprite.
@@ -510,7 +933,7 @@ class Level(object):
                 format = sprites_hitboxDict[val]['format']
                 source = sprites_hitboxDict[val]["file"]
         #make it a constant called offscreen
-        self._deathSprite = GSprite(x=-1000, y=0, format = format,\
+        self._deathSprite = self._toolkit.Sprite(x=-1000, y=0, format = format,\
             source = source)
         self._deathSprite.frame = 0
 
@@ -524,16 +947,16 @@ class Level(object):
         Parameter dt: The time since the last animation frame.
         Precondition: dt is a float.
         """
-        currentTime = 0
+        self._deathTime = 0
         finalTime = DEATH_SPEED
         animating = True
         while animating:
             dt = (yield)
-            currentTime += dt
-            frac = currentTime/finalTime
+            self._deathTime += dt
+            frac = self._deathTime/finalTime
             frame = DEATH_START + frac * DEATH_END
             self._deathSprite.frame = round(frame)
-            if currentTime >= finalTime:
+            if self._deathTime >= finalTime:
                 self._deathSprite.x = -1000
                 self._deathAnimator = None
                 self._finished = True
@@ -567,20 +990,20 @@ class Level(object):
         Precondition: h is an int or float
         """
         self._lives = []
-        for l in range(3):
-            life = GImage(width = GRID_SIZE, height = GRID_SIZE, source = \
+        for l in range(FROG_LIVES):
+            life = self._toolkit.Image(width = GRID_SIZE, height = GRID_SIZE, source = \
             FROG_HEAD)
             life.x = w-GRID_SIZE/2
             life.y = h-GRID_SIZE/2
             if l>0:
                 life.x= (life.x -(GRID_SIZE*l))
             self._lives.append(life)
-        self._title = GLabel(text='Lives:',font_size = ALLOY_SMALL, \
+        self._title = self._toolkit.Label(text='Lives:',font_size = ALLOY_SMALL, \
         font_name = ALLOY_FONT)
         self._title.linecolor = 'forest green'
         self._title.y = h - GRID_SIZE/2
         self._title.x = w - GRID_SIZE*3
-        self._title.right = self._lives[2].left
+        self._title.right = self._lives[-1].left
 
     def _frogDeathCountdown(self):
         """
@@ -24,21 +24,25 @@ Alice Ke alk248
 21.12.2020
 """
 from consts import *
-from game2d import *
 
 # PRIMARY RULE: Models are not allowed to access anything in any module other than
 # consts.py.  If you need extra information from a lane or level object, then it
 # should be a parameter in your method.
 
 
-class Frog(GSprite):         # You will need to change this by Task 3
+class Frog(object):
     """
     A class representing the frog
 
     The frog is represented as an image (or sprite if you are doing timed animation).
     However, unlike the obstacles, we cannot use a simple GImage class for the frog.
-    The frog has to have additional attributes (which you will add).  That is why we
-    make it a subclass of GImage.
+    The frog has to have additional attributes (which you will add).
+
+    This class only has the rules for the frog, so that the game can be played with
+    or without a window.  A frog is always made from a subclass that combines Frog
+    with a sprite class: GraphicsFrog (in graphics.py) with GSprite, or HeadlessFrog
+    (in standins.py) with a pure-data sprite.  The toolkit of the level says which
+    one to make (see Level), and it also makes the sounds of the frog.
 
     When you reach Task 3, you will discover that Frog needs to be a composite object,
     tracking both the frog animation and the death animation.  That will like caused
@@ -53,13 +57,21 @@ class Frog(GSprite):         # You will need to change this by Task 3
     # Invariant: _speed is an int or float
 
     # Attribute _jumpSound: The sound to play when the frog jumps
-    # Invariant: _jumpSound is a Sound object
+    # Invariant: _jumpSound is a sound made by _toolkit
 
     # Attribute _deathSound: The sound to play when the frog dies
-    # Invariant: _deathSound is a Sound object
+    # Invariant: _deathSound is a sound made by _toolkit
 
     # Attribute _exitSound: The sound to play when the frog reaches an exit
-    # Invariant: _exitSound is a Sound object
+    # Invariant: _exitSound is a sound made by _toolkit
+
+    # Attribute _toolkit: The toolkit that made this frog and its sounds
+    # Invariant: _toolkit is a toolkit class (see Level)
+
+    # Attribute _slide: The direction and start position (x, y) of the last
+    # slide
+    # Invariant: _slide is a tuple (direction, x, y), or None if the frog has
+    # not slid yet
 
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def getAnimator(self):
@@ -85,8 +97,38 @@ class Frog(GSprite):         # You will need to change this by Task 3
         """
         return self._jumpSound
 
+    def getSlide(self):
+        """
+        Returns (direction, x, y) for the slide the frog is in, or None.
+
+        The position (x, y) is where the slide started.  The frog is in a slide
+        while its animator is running.
+        """
+        return None if self._animator is None else self._slide
+
+    def setSlide(self, slide):
+        """
+        Puts the frog in the middle of the given slide, or stops its slide.
+
+        The frog keeps its current position, and the slide finishes as if it
+        had started at the position in slide.  This restores a slide from
+        getSlide (see Level.rewind).
+
+        Parameter slide: The slide, as returned by getSlide
+        Precondition: slide is None or a tuple (direction, x, y), where direction
+        is one of FROG_DIRECTIONS and x and y are numbers
+        """
+        if slide is None:
+            self._animator = None
+        else:
+            (x, y) = (self.x, self.y)
+            (self.x, self.y) = (slide[1], slide[2])
+            self._animator = self._animate_slide(slide[0])
+            next(self._animator)
+            (self.x, self.y) = (x, y)
+
     # INITIALIZER TO SET FROG POSITION
-    def __init__(self, x, y, format, source, hitboxes, hitboxjson):
+    def __init__(self, x, y, format, source, hitboxes, hitboxjson, toolkit):
         """
         Initializes the frog and all its attributes.
 
@@ -113,18 +155,63 @@ class Frog(GSprite):         # You will need to change this by Task 3
         Parameter hitboxjson: hitboxjson is the loaded 'objects.json' json file
         for the images and sprites which contain hitbox values.
         Precondition: hitboxjson is a loaded json file.
+
+        Parameter toolkit: The toolkit that makes the frog and its sounds
+        Precondition: toolkit is a toolkit class whose Frog is this class
         """
         super().__init__(x= x*GRID_SIZE + GRID_SIZE/2, y = y*GRID_SIZE + \
         GRID_SIZE/2,source= source, format = format, hitboxes = hitboxes)
         self.angle = FROG_NORTH
         self.frame = 0
         self._animator = None
+        self._slide = None
         self._speed = FROG_SPEED
-        self._jumpSound = Sound(CROAK_SOUND)
-        self._deathSound = Sound(SPLAT_SOUND)
-        self._exitSound = Sound(TRILL_SOUND)
+        self._toolkit = toolkit
+        self._jumpSound = toolkit.Sound(CROAK_SOUND)
+        self._deathSound = toolkit.Sound(SPLAT_SOUND)
+        self._exitSound = toolkit.Sound(TRILL_SOUND)
 
     # ADDITIONAL METHODS (DRAWING, COLLISIONS, MOVEMENT, ETC)
+    def reset(self, x, y):
+        """
+        Puts the frog back at the given grid position, as if it were new.
+
+        The frog faces north, stops any slide and gets its jump sound back.
+        This lets a level use the same frog for every life (see
+        Level.makeFrog), instead of making a new sprite and loading its
+        sounds again.
+
+        Parameter x: the x value for the frog's grid position
+        Precondition: x is an int or a float
+
+        Parameter y: the y value for the frog's grid position
+        Precondition: y is an int or a float
+        """
+        self.x = x*GRID_SIZE + GRID_SIZE/2
+        self.y = y*GRID_SIZE + GRID_SIZE/2
+        self.angle = FROG_NORTH
+        self.frame = 0
+        self._animator = None
+        self._slide = None
+        self._jumpSound.volume = 1.0
+
+    def fork(self):
+        """
+        Returns a new frog with the position, angle, frame and slide of this one.
+
+        The new frog shares the image and the loaded sounds (see Sound), but it
+        can be moved on its own (see Level.fork).
+        """
+        frog = self._toolkit.Frog(x=0, y=0, format=self.format, source=self.source,
+            hitboxes=self.hitboxes, hitboxjson=None, toolkit=self._toolkit)
+        frog.x = self.x
+        frog.y = self.y
+        frog.angle = self.angle
+        frog.frame = self.frame
+        frog.setSlide(self.getSlide())
+        frog.getJumpSound().volume = self._jumpSound.volume
+        return frog
+
     def update(self, input, dt, view):
         """
         Animates the frog.
@@ -204,6 +291,7 @@ class Frog(GSprite):         # You will need to change this by Task 3
             f_hor = self.x - GRID_SIZE
         else:
             f_hor = self.x + GRID_SIZE
+        self._slide = (direction, s_hor, s_vert)
 
         amt = GRID_SIZE/FROG_SPEED
         animating = True
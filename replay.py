@@ -0,0 +1,314 @@
+"""
+Input recording and replay for Froggit
+
+This module records the keys held down on every animation frame of a game, so that
+the game can be played again exactly as it was.  A recording is a bitmask of the keys
+in REPLAY_KEYS for each frame, plus the time step of that frame.  Recordings are saved
+in a small binary file (a few bytes a second of play), which can be replayed:
+
+    on screen, by starting the game with    python froggit --replay=run.frog
+    headless, as fast as possible, with     python replay.py run.frog
+
+To make a recording, start the game with --record=run.frog (see consts.py).
+
+This module never imports Kivy, so headless replays run on a machine with no display.
+A replay only matches the original game if it has the same level file and FROG_SPEED,
+and the game rules have not changed since it was recorded.  That makes a replay a good
+way to profile a real game, or to find the change that broke one.
+"""
+from consts import *
+from headless import *
+
+from array import array
+import struct
+import sys
+import time
+import zlib
+
+
+# The first bytes of a recording file
+RECORDING_MAGIC = b'FROG'
+# The version of the recording file format
+RECORDING_VERSION = 1
+# The header: magic, version, number of keys, ticks, FROG_SPEED, key and level name sizes
+RECORDING_HEADER = struct.Struct('<4sBBIdHH')
+
+
+class Recording(object):
+    """
+    A class representing the keys held down on every frame of a game.
+
+    Frames are numbered from 0, the frame that started the level.  The keys of each
+    frame are stored as a bitmask, where bit i is set if key i of getKeys() was held
+    down.  Keys that are not in getKeys() are not recorded.
+    """
+    # Attribute _level: The level file that was played
+    # Invariant: _level is a string
+
+    # Attribute _keys: The keys that are recorded, in bit order
+    # Invariant: _keys is a tuple of at most 16 strings
+
+    # Attribute _speed: The FROG_SPEED of the game that was recorded
+    # Invariant: _speed is a float > 0
+
+    # Attribute _masks: The key bitmask for each frame
+    # Invariant: _masks is an array of unsigned shorts
+
+    # Attribute _dts: The time step of each frame
+    # Invariant: _dts is an array of doubles, the same length as _masks
+
+    def getLevel(self):
+        """
+        Returns the level file that was played.
+        """
+        return self._level
+
+    def getKeys(self):
+        """
+        Returns the keys that are recorded, in bit order.
+        """
+        return self._keys
+
+    def getSpeed(self):
+        """
+        Returns the FROG_SPEED of the game that was recorded.
+        """
+        return self._speed
+
+    def getTime(self):
+        """
+        Returns the game time of the whole recording in seconds.
+        """
+        return sum(self._dts)
+
+    def __init__(self, level, keys=REPLAY_KEYS, speed=FROG_SPEED):
+        """
+        Initializes an empty recording.
+
+        Parameter level: The level file that is played
+        Precondition: level is a string
+
+        Parameter keys: The keys to record
+        Precondition: keys is a sequence of at most 16 strings
+
+        Parameter speed: The FROG_SPEED of the game
+        Precondition: speed is a number > 0
+        """
+        assert len(keys) <= 16, 'Recordings cannot have more than 16 keys'
+        self._level = level
+        self._keys = tuple(keys)
+        self._speed = float(speed)
+        self._masks = array('H')
+        self._dts = array('d')
+
+    def __len__(self):
+        """
+        Returns the number of frames in this recording.
+        """
+        return len(self._masks)
+
+    def record(self, input, dt):
+        """
+        Adds a frame with the keys held down in input.
+
+        Parameter input: The input for this frame
+        Precondition: input is a GInput or HeadlessInput
+
+        Parameter dt: The time step of this frame
+        Precondition: dt is a number (int or float)
+        """
+        mask = 0
+        for (bit, key) in enumerate(self._keys):
+            if input.is_key_down(key):
+                mask |= 1 << bit
+        self._masks.append(mask)
+        self._dts.append(dt)
+
+    def keysAt(self, tick):
+        """
+        Returns the tuple of keys held down at the given frame.
+
+        Parameter tick: The frame number
+        Precondition: tick is an int, 0 <= tick < len(self)
+        """
+        mask = self._masks[tick]
+        return tuple(key for (bit, key) in enumerate(self._keys) if mask & (1 << bit))
+
+    def dtAt(self, tick):
+        """
+        Returns the time step of the given frame.
+
+        Parameter tick: The frame number
+        Precondition: tick is an int, 0 <= tick < len(self)
+        """
+        return self._dts[tick]
+
+    def save(self, path):
+        """
+        Saves this recording to the given file.
+
+        The masks and time steps are stored little-endian and compressed, so a game
+        held at a fixed time step takes only a few bytes per second.
+
+        Parameter path: The file to write
+        Precondition: path is a string
+        """
+        keys = ','.join(self._keys).encode('utf-8')
+        level = self._level.encode('utf-8')
+        masks = array('H', self._masks)
+        dts = array('d', self._dts)
+        if sys.byteorder == 'big':
+            masks.byteswap()
+            dts.byteswap()
+        header = RECORDING_HEADER.pack(RECORDING_MAGIC, RECORDING_VERSION,
+            len(self._keys), len(self), self._speed, len(keys), len(level))
+        with open(path, 'wb') as f:
+            f.write(header+keys+level)
+            f.write(zlib.compress(masks.tobytes()+dts.tobytes()))
+
+
+def load_recording(path):
+    """
+    Returns the recording saved in the given file.
+
+    A ValueError is raised if the file is not a recording.
+
+    Parameter path: The file to read
+    Precondition: path is a string naming a file made by Recording.save
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    size = RECORDING_HEADER.size
+    if len(data) < size or data[:4] != RECORDING_MAGIC:
+        raise ValueError('%s is not a recording' % repr(path))
+    (magic, version, count, ticks, speed, keysize, levelsize) = \
+        RECORDING_HEADER.unpack(data[:size])
+    if version != RECORDING_VERSION:
+        raise ValueError('%s has unknown version %d' % (repr(path), version))
+
+    keys = data[size:size+keysize].decode('utf-8')
+    level = data[size+keysize:size+keysize+levelsize].decode('utf-8')
+    keys = tuple(keys.split(',')) if keys else ()
+    if len(keys) != count:
+        raise ValueError('%s is not a recording' % repr(path))
+    try:
+        payload = zlib.decompress(data[size+keysize+levelsize:])
+    except zlib.error:
+        raise ValueError('%s is not a recording' % repr(path))
+
+    result = Recording(level, keys, speed)
+    result._masks.frombytes(payload[:2*ticks])
+    result._dts.frombytes(payload[2*ticks:])
+    if sys.byteorder == 'big':
+        result._masks.byteswap()
+        result._dts.byteswap()
+    if len(result._masks) != ticks or len(result._dts) != ticks:
+        raise ValueError('%s is truncated' % repr(path))
+    return result
+
+
+class ReplayInput(HeadlessInput):
+    """
+    A scripted input that plays back a recording.
+
+    The keys held down are the keys of the current frame of the recording.  Each call
+    to refresh moves to the next frame, just like GInput moves to the next frame of
+    the keyboard.  After the last frame, no keys are held down.
+    """
+    # Attribute _recording: The recording being played
+    # Invariant: _recording is a Recording
+
+    # Attribute _tick: The current frame of the recording
+    # Invariant: _tick is an int >= 0
+
+    def getTick(self):
+        """
+        Returns the current frame of the recording.
+        """
+        return self._tick
+
+    def getDt(self, default):
+        """
+        Returns the time step of the current frame, or default if the recording is over.
+
+        Parameter default: The time step after the recording is over
+        Precondition: default is a number (int or float)
+        """
+        if self._tick < len(self._recording):
+            return self._recording.dtAt(self._tick)
+        return default
+
+    def isDone(self):
+        """
+        Returns True if every frame of the recording has been played.
+        """
+        return self._tick >= len(self._recording)
+
+    def __init__(self, recording):
+        """
+        Initializes the input at the first frame of the recording.
+
+        Parameter recording: The recording to play
+        Precondition: recording is a Recording
+        """
+        super().__init__()
+        self._recording = recording
+        self._tick = 0
+        self._setFrame()
+
+    def refresh(self):
+        """
+        Remembers the current keys as the keys from the previous frame, and moves
+        to the next frame of the recording.
+        """
+        super().refresh()
+        self._tick += 1
+        self._setFrame()
+
+    def _setFrame(self):
+        """
+        Holds down the keys of the current frame.
+        """
+        if self._tick < len(self._recording):
+            self.setKeys(self._recording.keysAt(self._tick))
+        else:
+            self.setKeys(())
+
+
+def replay(recording, hitboxjson):
+    """
+    Returns (game, seconds) after replaying a recording as fast as possible.
+
+    The recording is played in a HeadlessGame, with no time between frames, until
+    the recording is over or the game is complete.  A ValueError is raised if the
+    level cannot be loaded, or if the recording was made with a different FROG_SPEED.
+
+    Parameter recording: The recording to play
+    Precondition: recording is a Recording
+
+    Parameter hitboxjson: The loaded 'objects.json' json file
+    Precondition: hitboxjson is a loaded json file.
+    """
+    if recording.getSpeed() != FROG_SPEED:
+        raise ValueError('The recording has FROG_SPEED %s, not %s' %
+            (recording.getSpeed(), FROG_SPEED))
+    json_dict = load_json(recording.getLevel())
+    if json_dict is None:
+        raise ValueError('Level %s cannot be loaded' % repr(recording.getLevel()))
+
+    input = ReplayInput(recording)
+    start = time.perf_counter()
+    game = HeadlessGame(json_dict, hitboxjson, input, autocontinue=False)
+    while not input.isDone() and not game.isComplete():
+        game.update(input.getDt(0))
+    return (game, time.perf_counter()-start)
+
+
+# Application code
+if __name__ == '__main__':
+    recording = load_recording(sys.argv[1])
+    (game, secs) = replay(recording, load_json(OBJECT_DATA))
+    level = game.getLevel()
+    print('%s: %d of %d ticks (%.1f seconds of play) in %.3f seconds (%.0f ticks/sec), '
+        '%d lives left, win=%s' % (recording.getLevel(), game.getTicks(), len(recording),
+        recording.getTime(), secs, game.getTicks()/secs, level.getLives(), level.getWin()))
@@ -0,0 +1,191 @@
+"""
+Snapshot module for Froggit
+
+This module contains the ring buffer that a level uses to save its state every few
+frames (see Level.setSnapshots).  A snapshot is a row of numbers (the lane times, the
+frog position, the lives and so on) plus one object, the frog that was alive at the
+time.  All of the rows are allocated when the buffer is made, so taking a snapshot
+only writes numbers into a row that already exists.  When the buffer is full, a new
+snapshot replaces the oldest one.
+
+The buffer does not know what the numbers mean.  The level writes them and reads them
+back, so Level and HeadlessLevel can share this class.  This module never imports Kivy.
+
+This module also has the rolling state hash that every level keeps (see state_hash),
+and first_difference, which finds what differs between the states of two levels (see
+desync.py).
+"""
+import numpy as np
+import struct
+import zlib
+
+
+def state_hash(fields, previous=0):
+    """
+    Returns the rolling hash of the given state fields.
+
+    The hash is a CRC-32 of every value (as a double), continued from the previous
+    hash.  So the hash of a frame depends on the state of every frame before it, too.
+
+    Parameter fields: The state fields, as returned by Level.getStateFields
+    Precondition: fields is a list of (name, values) pairs, where values is a tuple
+    of numbers
+
+    Parameter previous: The hash of the previous frame
+    Precondition: previous is an int >= 0
+    """
+    numbers = []
+    for (name, values) in fields:
+        # The size comes first, so that a missing value cannot look like the next one
+        numbers.append(len(values))
+        numbers.extend(values)
+    return zlib.crc32(struct.pack('<%dd' % len(numbers), *numbers), previous)
+
+
+def first_difference(first, second):
+    """
+    Returns (name, index, value1, value2) for the first field value that differs.
+
+    The index is the position of the value in the field.  If one field has more
+    values than the other, the missing value is None.  This function returns None if
+    there is no difference.
+
+    Parameter first: The state fields of the first level
+    Precondition: first is a list of (name, values) pairs
+
+    Parameter second: The state fields of the second level
+    Precondition: second is a list of (name, values) pairs
+    """
+    for ((name1, values1), (name2, values2)) in zip(first, second):
+        if name1 != name2:
+            return (name1, 0, name1, name2)
+        values1 = list(values1)
+        values2 = list(values2)
+        for index in range(max(len(values1), len(values2))):
+            value1 = values1[index] if index < len(values1) else None
+            value2 = values2[index] if index < len(values2) else None
+            if value1 != value2:
+                return (name1, index, value1, value2)
+    if len(first) != len(second):
+        longer = first if len(first) > len(second) else second
+        name = longer[min(len(first), len(second))][0]
+        return (name, 0, None, None)
+    return None
+
+
+class SnapshotRing(object):
+    """
+    A class representing a fixed number of snapshots, from oldest to newest.
+
+    Snapshots are referred to by age, where age 0 is the newest snapshot.  Each
+    snapshot has the tick (the frame number) it was taken at.
+    """
+    # Attribute _rows: The numbers of every snapshot, in ring order
+    # Invariant: _rows is a capacity x width NumPy array of floats
+
+    # Attribute _objects: The object of every snapshot, in ring order
+    # Invariant: _objects is a list of length capacity
+
+    # Attribute _ticks: The tick of every snapshot, in ring order
+    # Invariant: _ticks is a NumPy array of capacity ints
+
+    # Attribute _next: The position in the ring of the next snapshot
+    # Invariant: _next is an int in 0..capacity-1
+
+    # Attribute _count: The number of snapshots in the ring
+    # Invariant: _count is an int in 0..capacity
+
+    def getCapacity(self):
+        """
+        Returns the most snapshots this buffer can hold.
+        """
+        return len(self._rows)
+
+    def getWidth(self):
+        """
+        Returns the number of numbers in each snapshot.
+        """
+        return self._rows.shape[1]
+
+    def getTicks(self):
+        """
+        Returns the list of snapshot ticks, from the oldest to the newest.
+        """
+        return [self.get(age)[0] for age in range(self._count-1, -1, -1)]
+
+    def __init__(self, capacity, width):
+        """
+        Initializes an empty buffer.
+
+        Parameter capacity: The most snapshots to hold
+        Precondition: capacity is an int > 0
+
+        Parameter width: The number of numbers in each snapshot
+        Precondition: width is an int >= 0
+        """
+        assert type(capacity) == int and capacity > 0, '%s is not a valid capacity' % repr(capacity)
+        self._rows = np.zeros((capacity, width))
+        self._objects = [None]*capacity
+        self._ticks = np.zeros(capacity, dtype=np.int64)
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        """
+        Returns the number of snapshots in this buffer.
+        """
+        return self._count
+
+    def push(self, tick, obj=None):
+        """
+        Returns the row for a new snapshot, replacing the oldest one if full.
+
+        The row is a view into the buffer, which the caller fills in.
+
+        Parameter tick: The tick of the snapshot
+        Precondition: tick is an int >= 0
+
+        Parameter obj: The object to keep with the snapshot
+        Precondition: None
+        """
+        pos = self._next
+        self._ticks[pos] = tick
+        self._objects[pos] = obj
+        self._next = (pos+1) % len(self._rows)
+        self._count = min(self._count+1, len(self._rows))
+        return self._rows[pos]
+
+    def get(self, age):
+        """
+        Returns (tick, row, obj) for the snapshot of the given age.
+
+        Parameter age: The age of the snapshot (0 is the newest)
+        Precondition: age is an int in 0..len(self)-1
+        """
+        assert 0 <= age < self._count, '%s is not a valid age' % repr(age)
+        pos = (self._next-1-age) % len(self._rows)
+        return (int(self._ticks[pos]), self._rows[pos], self._objects[pos])
+
+    def truncate(self, age):
+        """
+        Removes every snapshot newer than the given age.
+
+        The snapshot of that age becomes the newest one.
+
+        Parameter age: The age of the snapshot to keep as the newest
+        Precondition: age is an int in 0..len(self)-1
+        """
+        assert 0 <= age < self._count, '%s is not a valid age' % repr(age)
+        for ii in range(age):
+            self._next = (self._next-1) % len(self._rows)
+            self._objects[self._next] = None
+        self._count -= age
+
+    def clear(self):
+        """
+        Removes every snapshot.
+        """
+        for pos in range(len(self._objects)):
+            self._objects[pos] = None
+        self._next = 0
+        self._count = 0
@@ -0,0 +1,540 @@
+"""
+Stand-in module for Froggit
+
+This module contains pure-data stand-ins for the game2d classes that the game rules
+use.  The level, its lanes and its frog (level.py, lanes.py and models.py) never make
+a game2d object themselves.  They make every tile, image, sprite, label and sound with
+a toolkit (see Level), and StandIns is the toolkit that makes the classes in this
+module instead.  A level made with it follows exactly the same rules as the real game,
+but it never imports Kivy (or game2d), and so it can run on a machine with no display
+at all (see headless.py).
+
+The stand-ins only keep the geometry of an object (its center, size, angle and hitbox),
+which is all that the rules look at.  The view is just a width and height, the input
+is a scripted key dictionary, and the sounds count plays but do not make any noise.
+"""
+from consts import *
+from models import *
+
+import os.path
+import struct
+
+
+# The folder holding this module (and the JSON and Images folders)
+HEADLESS_PATH = os.path.dirname(os.path.abspath(__file__))
+
+# The cache of image sizes read from the PNG headers
+_IMAGE_SIZES = {}
+
+def image_size(name):
+    """
+    Returns the (width, height) of the given image file.
+
+    The size is read from the PNG header, so the image is never decoded. This is the
+    size that GImage uses when it is not given a width or a height.
+
+    Parameter name: The file name of an image in the Images folder
+    Precondition: name is a string naming a PNG file
+    """
+    if not name in _IMAGE_SIZES:
+        with open(os.path.join(HEADLESS_PATH, 'Images', name), 'rb') as f:
+            header = f.read(24)
+        assert header[:8] == b'\x89PNG\r\n\x1a\n', '%s is not a PNG file' % repr(name)
+        _IMAGE_SIZES[name] = struct.unpack('>II', header[16:24])
+    return _IMAGE_SIZES[name]
+
+
+class HeadlessInput(object):
+    """
+    A scripted replacement for GInput.
+
+    This class has the same key methods as GInput, but the keys are set by the
+    program instead of the keyboard.  Use press and release (or setKeys) to change
+    the keys that are held down.
+    """
+    # Attribute _keystate: The keys that are currently held down
+    # Invariant: _keystate is a dictionary mapping strings to bools
+
+    # Attribute _prvstate: The keys that were held down last frame
+    # Invariant: _prvstate is a dictionary mapping strings to bools
+
+    @property
+    def keys(self):
+        """
+        The list of keys that are currently held down.
+        """
+        return tuple(k for (k,v) in self._keystate.items() if v)
+
+    @property
+    def key_count(self):
+        """
+        The number of keys currently held down.
+        """
+        return len(self.keys)
+
+    def __init__(self, keys=()):
+        """
+        Initializes the input with the given keys held down.
+
+        Parameter keys: The keys to start held down
+        Precondition: keys is a sequence of strings
+        """
+        self._keystate = {}
+        self._prvstate = {}
+        self.setKeys(keys)
+
+    def press(self, key):
+        """
+        Holds down the given key.
+
+        Parameter key: The key to press
+        Precondition: key is a string
+        """
+        self._keystate[key] = True
+
+    def release(self, key):
+        """
+        Releases the given key.
+
+        Parameter key: The key to release
+        Precondition: key is a string
+        """
+        self._keystate[key] = False
+
+    def setKeys(self, keys):
+        """
+        Holds down exactly the given keys, releasing all others.
+
+        Parameter keys: The keys to hold down
+        Precondition: keys is a sequence of strings
+        """
+        for k in self._keystate:
+            self._keystate[k] = False
+        for k in keys:
+            self._keystate[k] = True
+
+    def refresh(self):
+        """
+        Remembers the current keys as the keys from the previous frame.
+        """
+        self._prvstate.clear()
+        self._prvstate.update(self._keystate)
+
+    def is_key_down(self, key):
+        """
+        Returns True if key is currently held down.
+
+        Parameter key: The key to test
+        Precondition: key is a string
+        """
+        return key in self._keystate and self._keystate[key]
+
+    def is_key_up(self, key):
+        """
+        Returns True if key is known, but not currently held down.
+
+        Parameter key: The key to test
+        Precondition: key is a string
+        """
+        return key in self._keystate and not self._keystate[key]
+
+    def is_key_pressed(self, key):
+        """
+        Returns True if key is held down this frame but not the previous frame.
+
+        Parameter key: The key to test
+        Precondition: key is a string
+        """
+        return self.is_key_down(key) and not self._prvstate.get(key,False)
+
+    def is_key_released(self, key):
+        """
+        Returns True if key was held down the previous frame but not this frame.
+
+        Parameter key: The key to test
+        Precondition: key is a string
+        """
+        return self.is_key_up(key) and self._prvstate.get(key,False)
+
+
+class HeadlessView(object):
+    """
+    A stub replacement for GView.
+
+    Level only reads the width and height of the view, so that is all this has.
+    """
+    # Attribute width: The view width
+    # Invariant: width is an int or float > 0
+
+    # Attribute height: The view height
+    # Invariant: height is an int or float > 0
+
+    def __init__(self, width, height):
+        """
+        Initializes a view of the given size.
+
+        Parameter width: The view width
+        Precondition: width is an int or float > 0
+
+        Parameter height: The view height
+        Precondition: height is an int or float > 0
+        """
+        self.width = width
+        self.height = height
+
+
+class HeadlessSound(object):
+    """
+    A silent replacement for Sound.
+
+    It remembers its volume and counts how often it is played.
+    """
+    # Attribute source: The sound file
+    # Invariant: source is a string
+
+    # Attribute volume: The sound volume
+    # Invariant: volume is a float in 0..1
+
+    # Attribute plays: The number of times the sound was played
+    # Invariant: plays is an int >= 0
+
+    def __init__(self, source):
+        """
+        Initializes a silent sound for the given file.
+
+        Parameter source: The sound file
+        Precondition: source is a string
+        """
+        self.source = source
+        self.volume = 1.0
+        self.plays = 0
+
+    def play(self, loop=False):
+        """
+        Counts a play of this sound.
+        """
+        self.plays += 1
+
+    def stop(self):
+        """
+        Does nothing (there is nothing to stop).
+        """
+        pass
+
+
+class HeadlessBox(object):
+    """
+    A pure-data replacement for GImage, GTile and GLabel.
+
+    This class has the geometry of a GObject (center, size, angle and hitbox) and
+    the same contains and collides methods.  Only rotations that are multiples of 90
+    degrees are supported, as those are the only ones that Froggit uses.  A label
+    has no size, as its text is never measured.
+    """
+    # Attribute x: The horizontal coordinate of the center
+    # Invariant: x is an int or float
+
+    # Attribute y: The vertical coordinate of the center
+    # Invariant: y is an int or float
+
+    # Attribute width: The width of the box
+    # Invariant: width is an int or float >= 0
+
+    # Attribute height: The height of the box
+    # Invariant: height is an int or float >= 0
+
+    # Attribute angle: The angle of rotation about the center
+    # Invariant: angle is an int or float that is a multiple of 90
+
+    # Attribute hitbox: The hitbox offsets (left, top, right, bottom)
+    # Invariant: hitbox is a tuple of 4 numbers
+
+    # Attribute source: The image file this box stands in for
+    # Invariant: source is a string or None
+
+    def __init__(self, x=0, y=0, width=0, height=0, angle=0, hitbox=None,
+            source=None, **keywords):
+        """
+        Initializes a box with the given geometry.
+
+        If width and height are 0 and there is a source, the size is taken from
+        the image file, just like GImage.  Any other keywords are set after the
+        geometry, in order.  These may be an edge (left, right, top or bottom) to
+        place the box by, as in GObject, or an attribute that the rules never
+        look at (such as the text of a label).
+
+        Parameter x: The horizontal coordinate of the center
+        Precondition: x is an int or float
+
+        Parameter y: The vertical coordinate of the center
+        Precondition: y is an int or float
+
+        Parameter width: The width of the box
+        Precondition: width is an int or float >= 0
+
+        Parameter height: The height of the box
+        Precondition: height is an int or float >= 0
+
+        Parameter angle: The angle of rotation
+        Precondition: angle is an int or float that is a multiple of 90
+
+        Parameter hitbox: The hitbox offsets
+        Precondition: hitbox is None or a sequence of 4 numbers
+
+        Parameter source: The image file
+        Precondition: source is None or a string naming an image file
+
+        Parameter keywords: The edges and other attributes
+        Precondition: keywords is a dictionary of attribute names and values
+        """
+        self.source = source
+        if (width == 0 or height == 0) and not source is None:
+            (width, height) = image_size(source)
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.angle = angle
+        self.hitbox = (0,0,0,0) if hitbox is None else tuple(hitbox)
+        for (key, value) in keywords.items():
+            setattr(self, key, value)
+
+    @property
+    def left(self):
+        """
+        The left edge of the hitbox.
+
+        Setting it moves the box so that this edge is at the new value.
+        """
+        return self._bbox()[0]
+
+    @left.setter
+    def left(self, value):
+        self.x += value-self.left
+
+    @property
+    def right(self):
+        """
+        The right edge of the hitbox.
+
+        Setting it moves the box so that this edge is at the new value.
+        """
+        return self._bbox()[2]
+
+    @right.setter
+    def right(self, value):
+        self.x += value-self.right
+
+    @property
+    def top(self):
+        """
+        The top edge of the hitbox.
+
+        Setting it moves the box so that this edge is at the new value.
+        """
+        return self._bbox()[1]
+
+    @top.setter
+    def top(self, value):
+        self.y += value-self.top
+
+    @property
+    def bottom(self):
+        """
+        The bottom edge of the hitbox.
+
+        Setting it moves the box so that this edge is at the new value.
+        """
+        return self._bbox()[3]
+
+    @bottom.setter
+    def bottom(self, value):
+        self.y += value-self.bottom
+
+    def contains(self, point):
+        """
+        Returns True if this box contains the point.
+
+        Parameter point: The point to check
+        Precondition: point is a pair of numbers
+        """
+        (l,t,r,b) = self._bbox()
+        return l <= point[0] <= r and b <= point[1] <= t
+
+    def collides(self, obj):
+        """
+        Returns True if this box collides with obj.
+
+        Parameter obj: The box to check for collision
+        Precondition: obj is a HeadlessBox
+        """
+        (l0,t0,r0,b0) = obj._bbox()
+        (l1,t1,r1,b1) = self._bbox()
+        isx = l1 <= l0 <= r1 or l0 <= l1 <= r0
+        isy = b1 <= b0 <= t1 or b0 <= b1 <= t0
+        return isx and isy
+
+    def draw(self, view):
+        """
+        Does nothing (a stand-in is never drawn).
+
+        Parameter view: The game view
+        Precondition: view is a HeadlessView
+        """
+        pass
+
+    def show(self, view):
+        """
+        Does nothing (a stand-in is never drawn).
+
+        Parameter view: The game view
+        Precondition: view is a HeadlessView
+        """
+        pass
+
+    def _bbox(self):
+        """
+        Returns the bounding box (l,t,r,b) of this box, taking the hitbox into account.
+
+        This is the same computation as GObject._bbox.
+        """
+        oangle = self.angle % 360
+        hit = self.hitbox
+        w = self.width/2
+        h = self.height/2
+        if oangle == 0:
+            l = self.x + hit[0] - w
+            r = self.x - hit[2] + w
+            t = self.y - hit[1] + h
+            b = self.y + hit[3] - h
+        elif oangle == 90:
+            t = self.y + hit[2] - w
+            b = self.y - hit[0] + w
+            r = self.x - hit[3] + h
+            l = self.x + hit[1] - h
+        elif oangle == 180:
+            l = self.x + hit[2] - w
+            r = self.x - hit[0] + w
+            t = self.y - hit[3] + h
+            b = self.y + hit[1] - h
+        else:
+            assert oangle == 270, '%s is not a multiple of 90' % repr(self.angle)
+            t = self.y + hit[0] - w
+            b = self.y - hit[2] + w
+            r = self.x - hit[1] + h
+            l = self.x + hit[3] - h
+        return (l,t,r,b)
+
+
+class HeadlessSprite(HeadlessBox):
+    """
+    A pure-data replacement for GSprite.
+
+    The sprite size is the size of a single frame, and the hitbox follows the frame
+    when there is a list of hitboxes.
+    """
+    # Attribute _format: The sprite sheet format (rows, columns)
+    # Invariant: _format is a tuple of two ints > 0
+
+    # Attribute _hitboxes: The hitbox for each frame
+    # Invariant: _hitboxes is None or a tuple of count 4-element tuples
+
+    # Attribute _frame: The current animation frame
+    # Invariant: _frame is an int in 0..count-1
+
+    @property
+    def count(self):
+        """
+        The number of frames in this sprite.
+        """
+        return self._format[0]*self._format[1]
+
+    @property
+    def format(self):
+        """
+        The sprite sheet format (rows, columns).
+        """
+        return self._format
+
+    @property
+    def hitboxes(self):
+        """
+        The hitbox for each frame, or None if the hitbox never changes.
+        """
+        return self._hitboxes
+
+    @property
+    def frame(self):
+        """
+        The current animation frame.
+
+        This has the same precondition as GSprite.frame, so a frame out of range
+        fails the same way it does in the real game.
+        """
+        return self._frame
+
+    @frame.setter
+    def frame(self, value):
+        assert type(value) == int, '%s is not an int' % repr(value)
+        assert value >= 0 and value < self.count, '%s is out of range' % repr(value)
+        self._frame = value
+        if not self._hitboxes is None:
+            self.hitbox = self._hitboxes[value]
+
+    def __init__(self, x, y, format, source, hitboxes=None):
+        """
+        Initializes a sprite from a sprite sheet.
+
+        Parameter x: The horizontal coordinate of the center
+        Precondition: x is an int or float
+
+        Parameter y: The vertical coordinate of the center
+        Precondition: y is an int or float
+
+        Parameter format: The sprite sheet format (rows, columns)
+        Precondition: format is a sequence of two ints > 0
+
+        Parameter source: The sprite sheet file
+        Precondition: source is a string naming an image file
+
+        Parameter hitboxes: The hitbox for each frame
+        Precondition: hitboxes is None or a sequence of count 4-element sequences
+        """
+        (width, height) = image_size(source)
+        self._format = tuple(format)
+        super().__init__(x=x, y=y, width=width/self._format[1],
+            height=height/self._format[0], source=source)
+        self._hitboxes = None if hitboxes is None else tuple(map(tuple,hitboxes))
+        self.frame = 0
+
+
+class HeadlessFrog(Frog, HeadlessSprite):
+    """
+    A frog made of stand-ins: the rules in Frog, with the geometry of a HeadlessSprite.
+    """
+    pass
+
+
+class StandIns(object):
+    """
+    The toolkit that makes pure-data stand-ins instead of game2d objects.
+
+    A level made with this toolkit (see HeadlessLevel) has no layer and no atlas, so
+    its lanes never make a batch.  It cannot be drawn.
+    """
+    # The classes for the lane tiles, the obstacles and the lives
+    Tile = HeadlessBox
+    Image = HeadlessBox
+
+    # The class for the death sprite, and the one for the lives title
+    Sprite = HeadlessSprite
+    Label = HeadlessBox
+
+    # The classes for the sounds and for the frog
+    Sound = HeadlessSound
+    Frog = HeadlessFrog
+
+    # There is nothing to pre-render or to batch
+    Layer = None
+    Atlas = None
+    Batch = None
@@ -0,0 +1,11 @@
+"""
+Test configuration for the Froggit game.
+
+This puts the application directory on the path, so the tests can import game2d and
+the game modules, and keeps Kivy from reading the pytest command line arguments.
+"""
+import os
+import sys
+
+os.environ.setdefault('KIVY_NO_ARGS','1')
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,92 @@
+"""
+Tests for the frame regions cut by GSprite.
+
+The tests use a stand-in for a Kivy texture, so they do not need a window.  The
+sprite sheets of the game are checked with the sizes read from their PNG files.
+"""
+from game2d.gsprite import GSprite
+from compiler import JSON_PATH
+import os.path
+import json
+import struct
+
+
+class FakeTexture(object):
+    """
+    A stand-in for a Kivy texture that records the regions cut from it.
+    """
+
+    def __init__(self,width,height):
+        self.width = width
+        self.height = height
+
+    def get_region(self,x,y,width,height):
+        return (x,y,width,height)
+
+
+def make_sprite(source,format):
+    """
+    Returns a sprite with the given source and format, without loading the image.
+    """
+    sprite = GSprite.__new__(GSprite)
+    sprite._source = source
+    sprite._format = format
+    return sprite
+
+
+def test_frames_are_distinct_and_in_order():
+    # A 3x2 sheet of 10x10 frames, 20 pixels wide and 30 pixels high
+    sprite = make_sprite('sheet-3x2.png',(3,2))
+    frames = sprite._frames(FakeTexture(20,30))
+
+    # Left-to-right, top-to-bottom, where texture rows count up from the bottom
+    assert frames == ((0,20,10,10),(10,20,10,10),
+                      (0,10,10,10),(10,10,10,10),
+                      (0,0,10,10),(10,0,10,10))
+    assert len(set(frames)) == 6
+
+
+def test_frames_are_shared_for_the_same_texture():
+    texture = FakeTexture(20,30)
+    first  = make_sprite('shared-3x2.png',(3,2))._frames(texture)
+    second = make_sprite('shared-3x2.png',(3,2))._frames(texture)
+    assert second is first
+
+    reloaded = make_sprite('shared-3x2.png',(3,2))._frames(FakeTexture(20,30))
+    assert not reloaded is first
+    assert reloaded == first
+
+
+def image_size(name):
+    """
+    Returns the (width, height) of an image in the Images folder, from its PNG header.
+    """
+    with open(os.path.join(os.path.dirname(JSON_PATH),'Images',name),'rb') as f:
+        return struct.unpack('>II',f.read(24)[16:24])
+
+
+def check_sheet(name):
+    """
+    Checks the frames cut from the real sprite sheet for the given objects.json sprite.
+    """
+    with open(os.path.join(JSON_PATH,'objects.json')) as f:
+        sprite = json.load(f)['sprites'][name]
+    (rows,columns) = sprite['format']
+    (width,height) = sprite['size']
+    texture = FakeTexture(*image_size(sprite['file']))
+    frames = make_sprite(sprite['file'],(rows,columns))._frames(texture)
+
+    assert len(frames) == rows*columns
+    assert len(set(frames)) == rows*columns
+    assert all(frame[2:] == (width,height) for frame in frames)
+    # The first frame is the top left corner, and the last is the bottom right
+    assert frames[0] == (0,(rows-1)*height,width,height)
+    assert frames[-1] == ((columns-1)*width,0,width,height)
+
+
+def test_frames_of_the_skulls_sheet():
+    check_sheet('skulls')
+
+
+def test_frames_of_the_turtle_sheet():
+    check_sheet('turtle')
@@ -0,0 +1,347 @@
+"""
+Obstacle track module for Froggit
+
+This module contains the position data for the obstacles (cars, logs, exits) in a
+single lane. The lane classes in lanes.py use GImage objects to draw their obstacles,
+but the positions and hitboxes live here. That way the lanes and the headless
+simulation (headless.py) share exactly the same movement and collision code, and this
+module never needs to import Kivy.
+
+Obstacles are not moved a little bit each frame.  An obstacle that starts at x0 in a
+lane with speed s is at
+
+    ((x0 + s*t - low) mod period) + low
+
+at time t, where low is the left edge of the offscreen buffer and period is the width
+of the lane plus both buffers.  So the track only stores the level time, and works out
+positions when they are needed.  This means that moving the lane costs the same no
+matter how many obstacles it has, that rounding errors do not build up over time, and
+that the lane can jump to any time (forwards or backwards) without replaying frames.
+
+All obstacles in a lane move at the same speed, so they never pass one another. The
+only thing that changes their order from left to right is the wraparound at the edge
+of the screen.  So the track keeps the obstacles in a cyclic sorted order, and finds
+the obstacles under a point with a binary search, instead of checking every obstacle
+in the lane.
+"""
+from consts import *
+
+import numpy as np
+
+
+def hitbox_extent(width, height, angle, hitbox):
+    """
+    Returns the bounding box (l,t,r,b) of an object relative to its center.
+
+    This is the same box that GObject.contains uses (see GObject._bbox), for an
+    object rotated by a multiple of 90 degrees.  Adding the object center to each
+    value gives the bounding box of the object.
+
+    Parameter width: The object width
+    Precondition: width is an int or float >= 0
+
+    Parameter height: The object height
+    Precondition: height is an int or float >= 0
+
+    Parameter angle: The object angle of rotation
+    Precondition: angle is an int or float that is a multiple of 90
+
+    Parameter hitbox: The object hitbox (as inset from the left, top, right, bottom)
+    Precondition: hitbox is None or a sequence of four numbers
+    """
+    oangle = angle % 360
+    hit = (0,0,0,0) if hitbox is None else hitbox
+    w = width/2
+    h = height/2
+    if oangle == 0:
+        return (hit[0]-w, h-hit[1], w-hit[2], hit[3]-h)
+    elif oangle == 90:
+        return (hit[1]-h, hit[2]-w, h-hit[3], w-hit[0])
+    elif oangle == 180:
+        return (hit[2]-w, h-hit[3], w-hit[0], hit[1]-h)
+    assert oangle == 270, '%s is not a multiple of 90' % repr(angle)
+    return (hit[3]-h, hit[0]-w, h-hit[1], w-hit[2])
+
+
+class ObstacleTrack(object):
+    """
+    A class representing the obstacles in a single lane.
+
+    Obstacles are referred to by their index, which is their position in the list
+    given to the initializer (and in the json for the level).  Each obstacle has a
+    center, a width and a hitbox extent, which is its bounding box relative to its
+    center (taking both the hitbox and the rotation into account).
+
+    Internally, the obstacles are stored by rank, which is their position when sorted
+    by phase (their distance from the left end of the offscreen buffer at time 0).
+    At any time, the obstacles at ranks _first..n-1 have wrapped around once more
+    than the obstacles at ranks 0.._first-1.  So reading the ranks from _first (and
+    wrapping around to rank 0) gives the obstacles from left to right.
+    """
+    # Attribute _phases: The distance of each obstacle from the left end of the
+    # offscreen buffer at time 0, by rank
+    # Invariant: _phases is a sorted float array, one entry per obstacle. If the
+    # lane moves, every entry is in [0, _period)
+
+    # Attribute _ys: The vertical coordinate of each obstacle center, by rank
+    # Invariant: _ys is a list of floats the same length as _phases
+
+    # Attribute _extents: The bounding box of each obstacle relative to its center
+    # Invariant: _extents is a list of (left, top, right, bottom) tuples of floats,
+    # one per obstacle by rank
+
+    # Attribute _order: The obstacle index at each rank
+    # Invariant: _order is a list of ints that is a permutation of 0..n-1
+
+    # Attribute _rank: The rank of each obstacle index (the inverse of _order)
+    # Invariant: _rank is an int array with _order[_rank[i]] == i for every index i
+
+    # Attribute _speed: The lane speed in pixels per second
+    # Invariant: _speed is an int or float
+
+    # Attribute _width: The width of the lane
+    # Invariant: _width is an int or float > 0
+
+    # Attribute _low: The left end of the offscreen buffer
+    # Invariant: _low is a float <= 0
+
+    # Attribute _period: The distance an obstacle travels before it is back where it
+    # started (the width of the lane plus both offscreen buffers)
+    # Invariant: _period is a float > 0
+
+    # Attribute _time: The level time in seconds
+    # Invariant: _time is a float
+
+    # Attribute _shift: How far the obstacles have moved at _time, modulo _period
+    # Invariant: _shift is a float in [0, _period) (always 0 if the lane is still)
+
+    # Attribute _first: The rank of the left-most obstacle at _time
+    # Invariant: _first is an int in 0..n, where n means no obstacle has wrapped
+
+    # Attribute _reach: How far from an obstacle center its hitbox can reach
+    # Invariant: _reach is a pair (left, right) of floats, where left is the smallest
+    # left extent and right is the largest right extent
+
+    # Attribute _halfwidth: Half of the widest obstacle
+    # Invariant: _halfwidth is a float >= 0
+
+    # GETTERS AND SETTERS
+    def getX(self, index):
+        """
+        Returns the horizontal coordinate of the obstacle center at index.
+
+        Parameter index: The obstacle index
+        Precondition: index is an int in 0..len(self)-1
+        """
+        rank = self._rank[index]
+        x = self._phases.item(rank) + self._shift
+        if rank >= self._first:
+            x -= self._period
+        return x + self._low
+
+    def getY(self, index):
+        """
+        Returns the vertical coordinate of the obstacle center at index.
+
+        Parameter index: The obstacle index
+        Precondition: index is an int in 0..len(self)-1
+        """
+        return self._ys[self._rank[index]]
+
+    def getPositions(self):
+        """
+        Returns a new NumPy array of the obstacle centers, in index order.
+        """
+        xs = self._phases + self._shift
+        xs[self._first:] -= self._period
+        xs += self._low
+        return xs[self._rank]
+
+    def getSpeed(self):
+        """
+        Returns the lane speed in pixels per second.
+        """
+        return self._speed
+
+    def getTime(self):
+        """
+        Returns the level time in seconds.
+        """
+        return self._time
+
+    def setTime(self, value):
+        """
+        Sets the level time in seconds, moving every obstacle to match.
+
+        The time can be set to any value, including one in the past.
+
+        Parameter value: The new level time
+        Precondition: value is an int or float
+        """
+        self._time = float(value)
+        if self._speed == 0:
+            self._shift = 0.0
+            self._first = len(self._order)
+            return
+        self._shift = (self._speed * self._time) % self._period
+        if self._shift >= self._period:
+            self._shift = 0.0
+        self._first = int(np.searchsorted(self._phases, self._period-self._shift))
+
+    # INITIALIZER
+    def __init__(self, xs, ys, widths, extents, speed, width, buffer):
+        """
+        Initializes a track with the given obstacles at time 0.
+
+        Parameter xs: The horizontal coordinate of each obstacle center
+        Precondition: xs is a list of ints or floats
+
+        Parameter ys: The vertical coordinate of each obstacle center
+        Precondition: ys is a list of ints or floats, the same length as xs
+
+        Parameter widths: The width of each obstacle
+        Precondition: widths is a list of ints or floats, the same length as xs
+
+        Parameter extents: The bounding box of each obstacle relative to its center
+        Precondition: extents is a list of (left, top, right, bottom) tuples of
+        numbers, the same length as xs
+
+        Parameter speed: The lane speed in pixels per second
+        Precondition: speed is an int or float
+
+        Parameter width: The width of the lane
+        Precondition: width is an int or float > 0
+
+        Parameter buffer: The number of offscreen grid squares on each side
+        Precondition: buffer is an int or float >= 0
+        """
+        self._speed = speed
+        self._width = width
+        self._low = float(-buffer * GRID_SIZE)
+        self._period = float(width + 2 * buffer * GRID_SIZE)
+
+        phases = np.array(xs, dtype=float) - self._low
+        if speed != 0:
+            phases %= self._period
+        order = np.argsort(phases, kind='stable')
+        self._phases = phases[order]
+        self._order = order.tolist()
+        self._rank = np.empty_like(order)
+        self._rank[order] = np.arange(len(order))
+        self._ys = np.array(ys, dtype=float)[order].tolist()
+        extents = np.array(extents, dtype=float).reshape(-1,4)[order]
+        self._extents = [tuple(e) for e in extents.tolist()]
+
+        if len(order):
+            self._reach = (float(extents[:,0].min()), float(extents[:,2].max()))
+            self._halfwidth = max(widths)/2
+        else:
+            self._reach = (0.0, 0.0)
+            self._halfwidth = 0.0
+        self.setTime(0)
+
+    def __len__(self):
+        """
+        Returns the number of obstacles in the track.
+        """
+        return len(self._order)
+
+    # ADDITIONAL METHODS
+    def fork(self):
+        """
+        Returns a new track with the same obstacles, at the same time as this one.
+
+        The obstacle arrays never change once the track is made, so the new track
+        shares them.  Only the time belongs to each track, so the two tracks can be
+        moved separately, and a fork costs no more than setTime.
+        """
+        # Copying the attributes directly is several times faster than copy.copy
+        track = ObstacleTrack.__new__(ObstacleTrack)
+        track.__dict__.update(self.__dict__)
+        return track
+
+    def update(self, dt):
+        """
+        Moves every obstacle by the lane speed, with a wraparound.
+
+        An obstacle that moves past the offscreen buffer on one side of the lane
+        reappears the same distance into the buffer on the other side.  This only
+        advances the level time, so it does not depend on the number of obstacles.
+
+        Parameter dt: The time since the last animation frame.
+        Precondition: dt is a float.
+        """
+        self.setTime(self._time + dt)
+
+    def containing(self, point):
+        """
+        Returns the list of obstacle indices whose hitbox contains point.
+
+        The obstacles are listed from left to right.  This uses a binary search on
+        the obstacle centers, so it only looks at the obstacles near the point.
+
+        Parameter point: The point to check
+        Precondition: point is a pair of numbers
+        """
+        (px, py) = point
+        result = []
+        for rank in self._between(px - self._reach[1], px - self._reach[0]):
+            x = self._phases.item(rank) + self._shift
+            if rank >= self._first:
+                x -= self._period
+            x += self._low
+            (l,t,r,b) = self._extents[rank]
+            y = self._ys[rank]
+            if x+l <= px <= x+r and y+b <= py <= y+t:
+                result.append(self._order[rank])
+        return result
+
+    def visible(self):
+        """
+        Returns the sorted list of obstacle indices that are (at least partly) on
+        screen.
+
+        Only these obstacles need to be moved and drawn.
+        """
+        ranks = self._between(-self._halfwidth, self._width + self._halfwidth)
+        return sorted(self._order[rank] for rank in ranks)
+
+    def _between(self, lo, hi):
+        """
+        Returns an iterator over the ranks of every obstacle with center in [lo, hi].
+
+        The ranks come from left to right.  As positions are computed from the
+        phases, the search is a pixel wider on each side to be safe from rounding,
+        so callers must still check each obstacle.
+
+        Parameter lo: The smallest center to include
+        Precondition: lo is an int or float
+
+        Parameter hi: The largest center to include
+        Precondition: hi is an int or float >= lo
+        """
+        n = len(self._order)
+        a = self._search(lo-1, 'left')
+        b = self._search(hi+1, 'right')
+        return (rank % n for rank in range(self._first+a, self._first+b))
+
+    def _search(self, value, side):
+        """
+        Returns the position of value in the ring of centers, read from _first.
+
+        This is like np.searchsorted, except that it searches the obstacles from
+        left to right at the current time.  Positions 0..n-_first-1 are the wrapped
+        ranks _first..n-1, and the remaining positions are the ranks 0.._first-1.
+
+        Parameter value: The center to look for
+        Precondition: value is an int or float
+
+        Parameter side: The side to return if value is a center
+        Precondition: side is 'left' or 'right'
+        """
+        phase = value - self._low - self._shift
+        wrapped = self._phases[self._first:]
+        pos = int(np.searchsorted(wrapped, phase + self._period, side))
+        if pos < len(wrapped):
+            return pos
+        return pos + int(np.searchsorted(self._phases[:self._first], phase, side))